@@ -8,7 +8,8 @@ Uses:
 - PnP for camera pose
 - Pre-aligned Library → Campus transform
 
-Called by backend API
+Called by backend API; building_registry.py runs the same
+pipeline on other buildings' banks through localize_with_bank
 """
 
 import cv2
@@ -20,14 +21,14 @@ from pathlib import Path
 # PATH SETUP (matches YOUR project structure)
 # =========================================================
 
-THIS_DIR = Path(__file__).resolve().parent  # Backend/Localization/Library
+THIS_DIR = Path(__file__).resolve().parent  # backend/Library
 
 # 3D feature bank (Library only)
 KEYPOINTS_3D_PATH = THIS_DIR / "keypoints_3d.npy"
 DESCRIPTORS_3D_PATH = THIS_DIR / "descriptors_3d.npy"
 
 # Alignment data: Library → Campus map (use relative path)
-TRANSFORM_PATH = THIS_DIR.parent.parent / "transform_library.json"
+TRANSFORM_PATH = THIS_DIR.parent / "transform_library.json"
 
 # =========================================================
 # CAMERA INTRINSICS (TEMP — replace with real calibration)
@@ -41,17 +42,35 @@ CAMERA_MATRIX = np.array([
 DIST_COEFFS = np.zeros((4, 1))
 
 # =========================================================
-# LOAD STATIC DATA (ONCE)
+# MATCHING / PnP SETTINGS
 # =========================================================
-points_3d = np.load(KEYPOINTS_3D_PATH)        # (N, 3)
-descriptors_3d = np.load(DESCRIPTORS_3D_PATH) # (N, 32) ORB
+ORB_FEATURES = 4000
+MIN_KEYPOINTS = 30
+MIN_MATCHES = 25
+MAX_MATCHES = 200
+MIN_INLIERS = 15
+FULL_CONFIDENCE_INLIERS = 120
 
-# Load Library → Campus transform
-with open(TRANSFORM_PATH, "r") as f:
-    T = json.load(f)
+# =========================================================
+# LOAD STATIC DATA (ONCE, ON FIRST USE)
+# =========================================================
+_library_bank = None
+
+def load_library_bank():
+    """(points_3d, descriptors_3d, transform_matrix) of the Library, loaded once"""
+    global _library_bank
+    if _library_bank is None:
+        points_3d = np.load(KEYPOINTS_3D_PATH)        # (N, 3)
+        descriptors_3d = np.load(DESCRIPTORS_3D_PATH) # (N, 32) ORB
 
-# Transform matrix from JSON
-transform_matrix = np.array(T["transform_matrix"])  # 2x3 affine matrix
+        # Load Library → Campus transform
+        with open(TRANSFORM_PATH, "r") as f:
+            T = json.load(f)
+
+        # Transform matrix from JSON
+        transform_matrix = np.array(T["transform_matrix"])  # 2x3 affine matrix
+        _library_bank = (points_3d, descriptors_3d, transform_matrix)
+    return _library_bank
 
 # =========================================================
 # CORE LOCALIZATION FUNCTION
@@ -65,6 +84,29 @@ def localize_library(image_path: str) -> dict:
     Output:
         dict with campus map coordinates
     """
+    points_3d, descriptors_3d, transform_matrix = load_library_bank()
+    return localize_with_bank(image_path, points_3d, descriptors_3d, transform_matrix)
+
+
+def localize_with_bank(
+    image_path: str,
+    points_3d: np.ndarray,
+    descriptors_3d: np.ndarray,
+    transform_matrix: np.ndarray,
+    camera_matrix: np.ndarray = CAMERA_MATRIX,
+    dist_coeffs: np.ndarray = DIST_COEFFS,
+    matcher=None,
+    building: str = "Library"
+) -> dict:
+    """
+    Localizes against any building's 3D feature bank
+    Input:
+        points_3d, descriptors_3d - the building's bank
+        transform_matrix - building frame -> campus map (2x3 affine)
+        matcher - optional reusable cv2.BFMatcher (Hamming, crossCheck)
+    Output:
+        dict with campus map coordinates
+    """
 
     # -----------------------------
     # 1. Load image
@@ -78,23 +120,24 @@ def localize_library(image_path: str) -> dict:
     # -----------------------------
     # 2. Extract 2D features
     # -----------------------------
-    orb = cv2.ORB_create(nfeatures=4000)
+    orb = cv2.ORB_create(nfeatures=ORB_FEATURES)
     kp2d, des2d = orb.detectAndCompute(gray, None)
 
-    if des2d is None or len(kp2d) < 30:
+    if des2d is None or len(kp2d) < MIN_KEYPOINTS:
         return {"success": False, "reason": "Insufficient features"}
 
     # -----------------------------
     # 3. Match with 3D descriptors
     # -----------------------------
-    matcher = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
+    if matcher is None:
+        matcher = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
     matches = matcher.match(des2d, descriptors_3d)
 
-    if len(matches) < 25:
+    if len(matches) < MIN_MATCHES:
         return {"success": False, "reason": "Not enough matches"}
 
     # Sort by quality
-    matches = sorted(matches, key=lambda x: x.distance)[:200]
+    matches = sorted(matches, key=lambda x: x.distance)[:MAX_MATCHES]
 
     # -----------------------------
     # 4. Build 2D–3D correspondences
@@ -114,18 +157,18 @@ def localize_library(image_path: str) -> dict:
     ok, rvec, tvec, inliers = cv2.solvePnPRansac(
         pts_3d,
         pts_2d,
-        CAMERA_MATRIX,
-        DIST_COEFFS,
+        camera_matrix,
+        dist_coeffs,
         reprojectionError=8.0,
         confidence=0.99,
         iterationsCount=100
     )
 
-    if not ok or inliers is None or len(inliers) < 15:
+    if not ok or inliers is None or len(inliers) < MIN_INLIERS:
         return {"success": False, "reason": "PnP failed"}
 
     # -----------------------------
-    # 6. Camera position in Library frame
+    # 6. Camera position in building frame
     # -----------------------------
     R_cam, _ = cv2.Rodrigues(rvec)
     cam_pos = -R_cam.T @ tvec
@@ -144,11 +187,11 @@ def localize_library(image_path: str) -> dict:
     # -----------------------------
     # 8. Confidence score
     # -----------------------------
-    confidence = min(1.0, len(inliers) / 120)
+    confidence = min(1.0, len(inliers) / FULL_CONFIDENCE_INLIERS)
 
     return {
         "success": True,
-        "building": "Library",
+        "building": building,
         "map_x": float(cam_map[0]),
         "map_y": float(cam_map[1]),
         "confidence": float(confidence)
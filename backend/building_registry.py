@@ -0,0 +1,196 @@
+"""
+building_registry.py
+---------------------------------
+Lazy-loading registry of building localization bundles
+A bundle is any directory under the data directory holding a
+3D feature bank:
+    <Name>/keypoints_3d.npy     (N, 3) points in the building frame
+    <Name>/descriptors_3d.npy   (N, 32) ORB descriptors
+    <Name>/bundle.json          optional: {"name", "aliases", "transform", "camera_matrix"}
+The building -> campus map transform is <Name>/transform.json, the
+bundle.json "transform" path, or transform_<name>.json next to the
+bundle directory (the original Library layout)
+
+Bundles are only listed at startup. A bank (arrays, transform and
+matcher) is loaded on its first request and the least recently used
+banks are evicted once the resident banks exceed the memory ceiling,
+so one server can cover dozens of buildings
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from Library.LC_Lib import CAMERA_MATRIX as LC_CAMERA_MATRIX, localize_with_bank
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# ================= CONFIGURATION =================
+# Where bundles are discovered (override with MAPMATE_BUNDLE_DIR)
+BUNDLE_DIR = Path(os.environ.get("MAPMATE_BUNDLE_DIR", BASE_DIR))
+
+# Resident bank memory before least-recently-used banks are evicted
+MAX_BANK_BYTES = 256 * 1024 * 1024
+
+# Camera intrinsics (LC_Lib's; bundle.json can override)
+CAMERA_MATRIX = LC_CAMERA_MATRIX.tolist()
+
+KEYPOINTS_FILE = "keypoints_3d.npy"
+DESCRIPTORS_FILE = "descriptors_3d.npy"
+BUNDLE_FILE = "bundle.json"
+
+
+def _find_transform(path, name, meta):
+    candidates = []
+    if meta.get("transform"):
+        candidates.append(path / meta["transform"])
+    candidates += [path / "transform.json", path.parent / f"transform_{name}.json"]
+    for candidate in candidates:
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def discover_bundles(data_dir):
+    """{name: bundle info} for every bundle directory directly under data_dir"""
+    bundles = {}
+    for path in sorted(Path(data_dir).iterdir()):
+        if not path.is_dir() or not (path / KEYPOINTS_FILE).exists() or not (path / DESCRIPTORS_FILE).exists():
+            continue
+        meta = {}
+        if (path / BUNDLE_FILE).exists():
+            with open(path / BUNDLE_FILE, "r") as f:
+                meta = json.load(f)
+        name = meta.get("name", path.name).lower()
+        transform = _find_transform(path, name, meta)
+        if transform is None:
+            print(f"⚠️ Skipping bundle {path.name}: no transform file")
+            continue
+        bundles[name] = {
+            "name": name,
+            "display_name": meta.get("display_name", path.name),
+            "path": path,
+            "transform": transform,
+            "aliases": [a.lower() for a in meta.get("aliases", [])],
+            "camera_matrix": meta.get("camera_matrix", CAMERA_MATRIX),
+        }
+    return bundles
+
+
+class Bank:
+    """One building's loaded bank: 3D points, descriptors, transform and matcher"""
+
+    def __init__(self, bundle):
+        self.name = bundle["name"]
+        self.display_name = bundle["display_name"]
+        self.points_3d = np.load(bundle["path"] / KEYPOINTS_FILE)
+        self.descriptors = np.load(bundle["path"] / DESCRIPTORS_FILE)
+        with open(bundle["transform"], "r") as f:
+            self.transform = np.array(json.load(f)["transform_matrix"])
+        self.camera_matrix = np.array(bundle["camera_matrix"], dtype=np.float32)
+        self.dist_coeffs = np.zeros((4, 1))
+        self.matcher = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=True)
+        self.nbytes = self.points_3d.nbytes + self.descriptors.nbytes
+
+    def localize(self, image_path):
+        """LC_Lib's pipeline (ORB -> 2D-3D matches -> PnP -> campus map) on this bank"""
+        return localize_with_bank(
+            image_path,
+            self.points_3d,
+            self.descriptors,
+            self.transform,
+            camera_matrix=self.camera_matrix,
+            dist_coeffs=self.dist_coeffs,
+            matcher=self.matcher,
+            building=self.display_name
+        )
+
+
+class BuildingRegistry:
+    def __init__(self, data_dir=BUNDLE_DIR, max_bytes=MAX_BANK_BYTES):
+        self.data_dir = Path(data_dir)
+        self.max_bytes = max_bytes
+        self.bundles = discover_bundles(self.data_dir) if self.data_dir.is_dir() else {}
+        self._aliases = {alias: name for name, b in self.bundles.items() for alias in [name] + b["aliases"]}
+
+        self._banks = OrderedDict()  # name -> Bank, least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._loading = {}           # name -> Lock, so a bank is only loaded once at a time
+
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+
+    def resolve(self, name):
+        """Bundle name for a building name or alias, or None"""
+        return self._aliases.get(str(name).lower()) if name is not None else None
+
+    def __contains__(self, name):
+        return self.resolve(name) is not None
+
+    def get(self, name):
+        """Loaded bank for a building name or alias (loading it if needed), or None"""
+        name = self.resolve(name)
+        if name is None:
+            return None
+
+        with self._lock:
+            bank = self._banks.get(name)
+            if bank is not None:
+                self._banks.move_to_end(name)
+                self.hits += 1
+                return bank
+            loading = self._loading.setdefault(name, threading.Lock())
+
+        with loading:
+            # Another request may have loaded it while we waited
+            with self._lock:
+                bank = self._banks.get(name)
+                if bank is not None:
+                    self._banks.move_to_end(name)
+                    self.hits += 1
+                    return bank
+
+            start = time.perf_counter()
+            bank = Bank(self.bundles[name])
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self.loads += 1
+                self.load_seconds += elapsed
+                self._banks[name] = bank
+                self._bytes += bank.nbytes
+                # Evict least recently used banks, never the one just loaded
+                while self._bytes > self.max_bytes and len(self._banks) > 1:
+                    _, old = self._banks.popitem(last=False)
+                    self._bytes -= old.nbytes
+                    self.evictions += 1
+        print(f"📦 Loaded bank '{name}' ({bank.nbytes / 1e6:.1f} MB) in {elapsed * 1000:.0f} ms")
+        return bank
+
+    def localize(self, name, image_path):
+        bank = self.get(name)
+        if bank is None:
+            return {"success": False, "reason": f"Unknown building '{name}'"}
+        return bank.localize(image_path)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "bundles": len(self.bundles),
+                "resident": list(self._banks),
+                "resident_bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "loads": self.loads,
+                "hits": self.hits,
+                "evictions": self.evictions,
+                "load_ms_total": round(self.load_seconds * 1000, 1),
+            }
@@ -1,7 +1,8 @@
 from fastapi import FastAPI
-from routes import localize, navigate
+from routes import localize, navigate, tiles
 
 app = FastAPI()
 
 app.include_router(localize.router)
 app.include_router(navigate.router)
+app.include_router(tiles.router)
@@ -1,8 +1,18 @@
 import json
 import math
 import heapq
-import matplotlib.pyplot as plt
+import hashlib
+import numpy as np
 import os
+import time
+from types import SimpleNamespace
+
+try:
+    from maps.polyline import decode_polyline
+    from maps.graph_binary import BINARY_EXT, read_graph_binary
+except ImportError:  # Run as a script from inside maps/
+    from polyline import decode_polyline
+    from graph_binary import BINARY_EXT, read_graph_binary
 
 # =========================
 # 1. CONFIGURATION
@@ -14,10 +24,11 @@ def get_graph_path():
     if os.path.exists(graph_path):
         return graph_path
     
-    # Fallback to giki_graph.json
-    graph_path = os.path.join(os.path.dirname(__file__), 'giki_graph.json')
-    if os.path.exists(graph_path):
-        return graph_path
+    # Fallback to giki_graph (binary export first, it loads faster)
+    for name in ('giki_graph' + BINARY_EXT, 'giki_graph.json'):
+        graph_path = os.path.join(os.path.dirname(__file__), name)
+        if os.path.exists(graph_path):
+            return graph_path
     
     print("Warning: No campus graph file found")
     return None
@@ -34,6 +45,15 @@ def get_map_path():
 GRAPH_PATH = get_graph_path()
 IMG_PATH = get_map_path()
 
+# Map scale: 1px = 0.5m
+METERS_PER_PIXEL = 0.5
+
+# Average walking speed used for ETAs
+WALKING_SPEED_MPS = 1.4
+
+# Heading change (degrees) below which a node counts as "straight on"
+TURN_THRESHOLD_DEG = 25
+
 # YOUR GROUND TRUTH
 LOCATIONS = {
     "Admin": "N55",
@@ -48,66 +68,763 @@ LOCATIONS = {
     # "Main Gate": "N194" 
 }
 
+# Building groups for "nearest of type X" queries (names from LOCATIONS)
+LOCATION_CATEGORIES = {
+    "academic": ["FCSE", "FBS", "ACB", "Materials", "Mechanical"],
+    "admin": ["Admin"],
+    "library": ["Library"],
+}
+
+# Search strategies accepted by CampusNavigator.get_path
+SEARCH_MODES = ("astar", "bidirectional", "alt")
+
+# ALT heuristic: number of landmarks precomputed at load (0 disables)
+NUM_LANDMARKS = 8
+
+# =========================
+# 2. GRAPH LOADING
+# =========================
+# Bump when the compiled cache layout changes
+GRAPH_CACHE_VERSION = 2
+
+def _file_sha1(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def parse_graph_json(data):
+    """
+    Normalize either graph schema into arrays
+    - campus_graph.json:  {"nodes": {id: [x, y]}, "edges": [[u, v], ...]}
+    - script_second.py:   {"nodes": [{"id", "x", "y", "lat", "lon"}], "edges": [{"from", "to", "cost"}]}
+      (contracted edges may add "geometry", an encoded pixel polyline from -> to)
+    Node IDs are always returned as strings
+    Returns (ids, xy, latlon, edge_u, edge_v, cost, geometry); latlon and cost are
+    NaN where unknown, geometry is a per-edge list of interior shape points from
+    u to v (None if straight)
+    """
+    nodes = data.get("nodes", {})
+    edges = data.get("edges", [])
+
+    if isinstance(nodes, dict):
+        ids = [str(nid) for nid in nodes]
+        xy = np.array(list(nodes.values()), dtype=np.float64).reshape(-1, 2)
+        latlon = np.full((len(ids), 2), np.nan)
+    else:
+        ids = [str(n["id"]) for n in nodes]
+        xy = np.array([(n["x"], n["y"]) for n in nodes], dtype=np.float64).reshape(-1, 2)
+        latlon = np.array(
+            [(np.nan if n.get("lat") is None else n["lat"], np.nan if n.get("lon") is None else n["lon"]) for n in nodes],
+            dtype=np.float64
+        ).reshape(-1, 2)
+
+    index = {nid: i for i, nid in enumerate(ids)}
+    eu, ev, cost, geometry = [], [], [], []
+    for e in edges:
+        if isinstance(e, dict):
+            u, v, c, g = str(e["from"]), str(e["to"]), e.get("cost"), e.get("geometry")
+        else:
+            u, v, c, g = str(e[0]), str(e[1]), None, None
+        if u in index and v in index:
+            eu.append(index[u])
+            ev.append(index[v])
+            cost.append(np.nan if c is None else c)
+            geometry.append(None if not g else np.array(decode_polyline(g)[1:-1], dtype=np.float64).reshape(-1, 2))
+
+    return (
+        ids, xy, latlon,
+        np.array(eu, dtype=np.int64), np.array(ev, dtype=np.int64), np.array(cost, dtype=np.float64),
+        geometry
+    )
+
+def compile_graph(ids, xy, latlon, edge_u, edge_v, cost, geometry=None):
+    """
+    Build the arrays CampusNavigator needs: undirected edges (duplicates and
+    self-loops dropped, cheapest kept), both-direction CSR adjacency with
+    weights, lengths, start/end bearings and edge ids, the interior shape
+    points of contracted edges, and connected-component labels
+    """
+    n = len(ids)
+    # Widen here, not in the readers: .gbin arrays arrive as float32 / uint32 views
+    xy = np.asarray(xy, dtype=np.float64)
+    edge_u = np.asarray(edge_u, dtype=np.int64)
+    edge_v = np.asarray(edge_v, dtype=np.int64)
+    cost = np.asarray(cost, dtype=np.float64)
+
+    # Undirected, deduplicated edge list (cheapest copy of each pair wins)
+    a = np.minimum(edge_u, edge_v)
+    b = np.maximum(edge_u, edge_v)
+    length = np.hypot(xy[b, 0] - xy[a, 0], xy[b, 1] - xy[a, 1])
+    for r, pts in enumerate(geometry or ()):
+        if pts is not None and len(pts):
+            pts = np.vstack((xy[edge_u[r]], pts, xy[edge_v[r]]))
+            length[r] = np.hypot(*np.diff(pts, axis=0).T).sum()
+    weight = np.where(np.isnan(cost), length, cost)
+    raw = np.arange(len(a))
+    keep = a != b
+    a, b, length, weight, raw = a[keep], b[keep], length[keep], weight[keep], raw[keep]
+
+    order = np.lexsort((weight, b, a))
+    a, b, length, weight, raw = a[order], b[order], length[order], weight[order], raw[order]
+    first = np.ones(len(a), dtype=bool)
+    first[1:] = (a[1:] != a[:-1]) | (b[1:] != b[:-1])
+    a, b, length, weight, raw = a[first], b[first], length[first], weight[first], raw[first]
+
+    # Interior shape points of each kept edge, stored in a -> b order
+    interior = []
+    for r, lo in zip(raw.tolist(), a.tolist()):
+        pts = geometry[r] if geometry else None
+        if pts is None or not len(pts):
+            interior.append(np.empty((0, 2)))
+        else:
+            interior.append(pts if edge_u[r] == lo else pts[::-1])
+    counts = np.array([len(p) for p in interior], dtype=np.int64)
+    geom_indptr = np.concatenate(([0], np.cumsum(counts)))
+    geom_xy = np.vstack(interior).astype(np.float64, copy=False) if interior else np.empty((0, 2))
+
+    # First point after a and last point before b along each edge (for bearings)
+    has = counts > 0
+    first_pt, last_pt = xy[b].copy(), xy[a].copy()
+    first_pt[has] = geom_xy[geom_indptr[:-1][has]]
+    last_pt[has] = geom_xy[geom_indptr[1:][has] - 1]
+
+    def heading(p, q):
+        return np.degrees(np.arctan2(q[:, 1] - p[:, 1], q[:, 0] - p[:, 0]))
+
+    # Both directions, grouped by source node (CSR)
+    src = np.concatenate((a, b))
+    dst = np.concatenate((b, a))
+    bearing = np.concatenate((heading(xy[a], first_pt), heading(xy[b], last_pt)))
+    end_bearing = np.concatenate((heading(last_pt, xy[b]), heading(first_pt, xy[a])))
+    edge_id = np.concatenate((np.arange(len(a)), np.arange(len(a))))
+    order = np.argsort(src, kind="stable")
+    src, dst, bearing, end_bearing, edge_id = src[order], dst[order], bearing[order], end_bearing[order], edge_id[order]
+    both_length = np.concatenate((length, length))[order]
+    both_weight = np.concatenate((weight, weight))[order]
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(src, minlength=n))))
+
+    # Connected components (union-find over the edge list)
+    parent = list(range(n))
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    for u, v in zip(a.tolist(), b.tolist()):
+        ru, rv = find(u), find(v)
+        if ru != rv:
+            parent[ru] = rv
+    roots = [find(i) for i in range(n)]
+    labels = {}
+    component = np.array([labels.setdefault(r, len(labels)) for r in roots], dtype=np.int64)
+
+    return {
+        "ids": np.array(ids, dtype=str),
+        "xy": xy,
+        "latlon": latlon,
+        "indptr": indptr,
+        "dst": dst,
+        "weight": both_weight,
+        "length": both_length,
+        "bearing": bearing,
+        "end_bearing": end_bearing,
+        "edge_id": edge_id,
+        "geom_indptr": geom_indptr,
+        "geom_xy": geom_xy,
+        "component": component,
+    }
+
+def load_graph(graph_file):
+    """
+    Load a graph in either JSON schema or the .gbin binary export, through a
+    compiled binary cache (<graph file>.cache.npz, e.g. giki_graph.json.cache.npz,
+    so a .json and a .gbin export of one graph keep separate caches) that is
+    reused while the source file's mtime and SHA-1 are unchanged
+    Returns (compiled arrays, source SHA-1)
+    """
+    stat = os.stat(graph_file)
+    cache_path = str(graph_file) + ".cache.npz"
+
+    sha1 = None
+    if os.path.exists(cache_path):
+        try:
+            with np.load(cache_path) as cached:
+                meta_ok = int(cached["cache_version"]) == GRAPH_CACHE_VERSION
+                same_mtime = meta_ok and int(cached["source_mtime_ns"]) == stat.st_mtime_ns \
+                    and int(cached["source_size"]) == stat.st_size
+                cached_sha1 = str(cached["source_sha1"])
+                if meta_ok and not same_mtime:
+                    # Touched but maybe not changed (checkout, copy): fall back to the hash
+                    sha1 = _file_sha1(graph_file)
+                if same_mtime or (meta_ok and sha1 == cached_sha1):
+                    compiled = {k: cached[k] for k in cached.files}
+                    if not same_mtime:
+                        _save_graph_cache(cache_path, compiled, stat, cached_sha1)
+                    return compiled, cached_sha1
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: Ignoring graph cache {cache_path}: {e}")
+
+    if str(graph_file).endswith(BINARY_EXT):
+        compiled = compile_graph(*read_graph_binary(graph_file))
+    else:
+        with open(graph_file, "r") as f:
+            compiled = compile_graph(*parse_graph_json(json.load(f)))
+    sha1 = sha1 or _file_sha1(graph_file)
+    _save_graph_cache(cache_path, compiled, stat, sha1)
+    return compiled, sha1
+
+def _save_graph_cache(cache_path, compiled, stat, sha1):
+    arrays = {k: v for k, v in compiled.items() if not k.startswith("source_") and k != "cache_version"}
+    tmp_path = cache_path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                cache_version=GRAPH_CACHE_VERSION,
+                source_mtime_ns=stat.st_mtime_ns,
+                source_size=stat.st_size,
+                source_sha1=sha1,
+                **arrays
+            )
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Warning: Could not save graph cache {cache_path}: {e}")
+
+def _extend_graph_cache(graph_file, sha1, arrays):
+    """Add arrays (e.g. landmark tables) to the graph's cache, if it is still the cache of sha1"""
+    cache_path = str(graph_file) + ".cache.npz"
+    try:
+        with np.load(cache_path) as cached:
+            if str(cached["source_sha1"]) != sha1:
+                return
+            compiled = {k: cached[k] for k in cached.files}
+    except (OSError, ValueError, KeyError):
+        return
+    source = SimpleNamespace(st_mtime_ns=int(compiled["source_mtime_ns"]), st_size=int(compiled["source_size"]))
+    _save_graph_cache(cache_path, {**compiled, **arrays}, source, sha1)
+
 # =========================
-# 2. THE PATHFINDER (A*)
+# 3. THE PATHFINDER (A*)
 # =========================
+class _LazyRows(dict):
+    """
+    Node ID -> per-node value, built from the compiled arrays on first access
+    (so start-up does not create Python objects for every node); iteration,
+    len and membership cover every node. Lookups of built rows are plain dict hits
+    build(i) makes one row; build_all() yields every (id, row) in one pass for full scans
+    """
+
+    def __init__(self, index, build, build_all):
+        super().__init__()
+        self._index = index
+        self._build = build
+        self._build_all = build_all
+        self._full = False
+
+    def __missing__(self, key):
+        # setdefault: a row assigned meanwhile (edge update) wins over the compiled one
+        return self.setdefault(key, self._build(self._index[key]))
+
+    def _fill(self):
+        if not self._full:
+            setdefault = self.setdefault
+            for key, value in self._build_all():
+                setdefault(key, value)
+            self._full = True
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def get(self, key, default=None):
+        return self[key] if key in self._index else default
+
+    def keys(self):
+        return self._index.keys()
+
+    def values(self):
+        self._fill()
+        return (self[key] for key in self._index)
+
+    def items(self):
+        self._fill()
+        return ((key, self[key]) for key in self._index)
+
+
 class CampusNavigator:
-    def __init__(self, graph_file):
-        self.data = self._load_campus_graph()
-        
-        self.nodes = self.data["nodes"]
-        self.adj = {nid: [] for nid in self.nodes}
-        
-        # Build adjacency list
-        for u, v in self.data["edges"]:
-            if u in self.nodes and v in self.nodes:
-                dist = self._dist(u, v)
-                self.adj[u].append((v, dist))
-                self.adj[v].append((u, dist))
-
-    def _load_campus_graph(self) -> dict:
-        """Load campus graph from JSON file"""
-        graph_path = os.path.join(os.path.dirname(__file__), 'campus_graph.json')
-        
+    def __init__(self, graph_file=GRAPH_PATH, num_landmarks=NUM_LANDMARKS, meters_per_pixel=METERS_PER_PIXEL):
+        self.graph_path = graph_file
+        self.meters_per_pixel = meters_per_pixel
+        self.graph_signature = None
+        compiled = self._load_campus_graph(graph_file)
+
+        # Per-node tables are views over the compiled arrays, filled in as nodes are touched
+        ids = compiled["ids"].tolist()
+        self._ids = ids
+        self.index = dict(zip(ids, range(len(ids))))
+        xy, latlon = compiled["xy"], compiled["latlon"]
+        self.nodes = _LazyRows(self.index, lambda i: xy[i].tolist(), lambda: zip(ids, xy.tolist()))
+        # [lat, lon], NaN where the source graph had none
+        self.latlon = _LazyRows(self.index, lambda i: latlon[i].tolist(), lambda: zip(ids, latlon.tolist()))
+
+        # Adjacency: CSR arrays -> per-node list of (neighbor, weight), built per node on first use
+        # (the CSR index itself stays as flat lists: one C call each, and fast to scan per edge)
+        self._indptr = compiled["indptr"].tolist()
+        self._dst = compiled["dst"].tolist()
+        weight = compiled["weight"]
+
+        def adjacency_row(i):
+            a, b = self._indptr[i], self._indptr[i + 1]
+            return list(zip([ids[j] for j in self._dst[a:b]], weight[a:b].tolist()))
+
+        def adjacency_rows():
+            pairs = list(zip(np.array(ids, dtype=object)[compiled["dst"]].tolist(), weight.tolist()))
+            return ((nid, pairs[a:b]) for nid, a, b in zip(ids, self._indptr, self._indptr[1:]))
+
+        self.adj = _LazyRows(self.index, adjacency_row, adjacency_rows)
+
+        # Per-edge geometry in CSR order, both directions: length (px) and
+        # bearing (degrees) leaving the source / arriving at the destination
+        self._edge_length = compiled["length"]
+        self._edge_bearing = compiled["bearing"]
+        self._edge_end_bearing = compiled["end_bearing"]
+
+        # Shape points of contracted (polyline) edges, per undirected edge id
+        self._edge_id = compiled["edge_id"]
+        self._geom_indptr = compiled["geom_indptr"]
+        self._geom_xy = compiled["geom_xy"]
+        self.has_edge_geometry = len(self._geom_xy) > 0
+
+        # Weights as loaded, and runtime overrides: (u, v) with u <= v -> {"penalty", "closed"}
+        self._base_weight = weight
+        self.edge_overrides = {}
+
+        component = compiled["component"].tolist()
+        self.component = _LazyRows(self.index, component.__getitem__, lambda: zip(ids, component))
+        self.num_components = int(compiled["component"].max()) + 1 if ids else 0
+
+        # Bumped whenever edge weights change, so caches keyed on it go stale
+        self.version = 0
+        # Odd while an edge update is being published (see consistent())
+        self._seq = 0
+
+        self._load_or_build_landmarks(num_landmarks, compiled)
+
+    def _label_components(self):
+        """
+        Recompute connected-component labels from the live adjacency
+        (the compiled graph already carries labels for the graph as loaded)
+        Returns (labels, count) without touching the live ones
+        """
+        component = {}
+        label = 0
+        for root in self.nodes:
+            if root in component:
+                continue
+            component[root] = label
+            stack = [root]
+            while stack:
+                current = stack.pop()
+                for neighbor, _ in self.adj[current]:
+                    if neighbor not in component:
+                        component[neighbor] = label
+                        stack.append(neighbor)
+            label += 1
+        return component, label
+
+    def _load_campus_graph(self, graph_file) -> dict:
+        """Load campus graph (either JSON schema) through the compiled cache"""
         try:
-            with open(graph_path, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            print(f"Warning: Campus graph file not found at {graph_path}")
-            return {"nodes": [], "edges": []}
+            compiled, self.graph_signature = load_graph(graph_file)
+            return compiled
+        except (FileNotFoundError, TypeError):
+            print(f"Warning: Campus graph file not found at {graph_file}")
         except json.JSONDecodeError as e:
             print(f"Error parsing campus graph: {e}")
-            return {"nodes": [], "edges": []}
+        except (KeyError, ValueError) as e:
+            print(f"Error reading campus graph: {e}")
+        return compile_graph(*parse_graph_json({"nodes": {}, "edges": []}))
+
+    # --- DYNAMIC EDGE WEIGHTS ---
+    @staticmethod
+    def _edge_key(u, v):
+        return (u, v) if u <= v else (v, u)
+
+    def edge_weight(self, u, v):
+        """Current weight of edge u -> v, or None if it is closed or does not exist"""
+        for neighbor, weight in self.adj.get(u, ()):
+            if neighbor == v:
+                return weight
+        return None
+
+    def is_closed(self, u, v):
+        override = self.edge_overrides.get(self._edge_key(u, v))
+        return override is not None and override["closed"]
+
+    def set_edge_state(self, u, v, penalty=1.0, closed=False):
+        """
+        Close/reopen an edge or scale its weight by penalty (>= 1) at runtime
+        Penalties never go below the loaded weight, so the Euclidean and ALT
+        heuristics stay admissible without recomputing landmark tables
+        Returns (changes, status); changes lists the directed edges as
+        (u, v, old_weight, new_weight) with inf meaning closed, for caches to repair from
+        """
+        if u not in self.nodes or v not in self.nodes:
+            return None, "Invalid Edge Node ID"
+        slot = self._edge_slot(u, v)
+        if slot is None:
+            return None, f"No edge between {u} and {v}"
+        if not penalty >= 1:
+            return None, "Penalty must be >= 1"
+
+        key = self._edge_key(u, v)
+        was_closed = self.is_closed(u, v)
+        old_weight = self.edge_weight(u, v)
+        old_weight = math.inf if old_weight is None else old_weight
+        new_weight = math.inf if closed else float(self._base_weight[slot]) * penalty
+
+        # Build the new state on copies, then publish it in one step: searches
+        # running on worker threads iterate the old rows / dicts undisturbed
+        rows = {}
+        for a, b in ((u, v), (v, u)):
+            row = list(self.adj[a])
+            for i, (neighbor, _) in enumerate(row):
+                if neighbor == b:
+                    if closed:
+                        del row[i]
+                    else:
+                        row[i] = (b, new_weight)
+                    break
+            else:
+                if not closed:
+                    row.append((b, new_weight))
+            rows[a] = row
+
+        overrides = dict(self.edge_overrides)
+        if penalty == 1 and not closed:
+            overrides.pop(key, None)
+        else:
+            overrides[key] = {"penalty": penalty, "closed": closed}
+
+        self._seq += 1
+        try:
+            self.adj.update(rows)
+            self.edge_overrides = overrides
+            # Closing/reopening can split or join components
+            if closed != was_closed:
+                self.component, self.num_components = self._label_components()
+            self.version += 1
+        finally:
+            self._seq += 1
+
+        return [(u, v, old_weight, new_weight), (v, u, old_weight, new_weight)], "Success"
+
+    def consistent(self, fn, *args):
+        """
+        fn(*args) for code running off the event loop (worker pool): re-run
+        if an edge update was published meanwhile, so one search never mixes
+        old and new weights. Edge updates themselves run on the event loop,
+        so searches there need no guard
+        """
+        while True:
+            seq = self._seq
+            if not seq & 1:
+                result = fn(*args)
+                if self._seq == seq:
+                    return result
+            time.sleep(0)
+
+    # --- ALT LANDMARKS ---
+    def _load_or_build_landmarks(self, k, compiled):
+        """
+        Landmark distance tables, stored in the graph's compiled cache
+        (landmark_nodes / landmark_dist) and rebuilt only when the graph changes
+        """
+        self.landmarks = []
+        self.landmark_dist = {}
+        if k <= 0 or not self.nodes:
+            return
+
+        k = min(k, len(self.nodes))
+        if "landmark_dist" in compiled and len(compiled["landmark_nodes"]) == k:
+            nodes, table = compiled["landmark_nodes"], compiled["landmark_dist"]
+        else:
+            self._build_landmarks(k)
+            nodes = np.array([self.index[n] for n in self.landmarks], dtype=np.int64)
+            table = np.array([self.landmark_dist[n] for n in self._ids], dtype=np.float64).reshape(-1, len(nodes))
+            if self.graph_signature:
+                _extend_graph_cache(self.graph_path, self.graph_signature, {"landmark_nodes": nodes, "landmark_dist": table})
+
+        self.landmarks = [self._ids[i] for i in nodes.tolist()]
+        self.landmark_dist = _LazyRows(
+            self.index, lambda i: tuple(table[i].tolist()), lambda: zip(self._ids, map(tuple, table.tolist()))
+        )
+
+    def _build_landmarks(self, k):
+        """
+        Farthest-landmark selection: each new landmark is the node furthest
+        (by graph distance) from all landmarks chosen so far, so they end up
+        spread around the edge of the graph where triangle bounds are tightest
+        """
+        k = min(k, len(self.nodes))
+        tables = []
+
+        # Start from the node furthest from an arbitrary seed
+        seed = next(iter(self.nodes))
+        dist, _ = self._dijkstra({seed: 0})
+        current = max(dist, key=dist.get)
+
+        # Running minimum distance to the chosen landmarks (inf = not yet covered)
+        closest = {nid: math.inf for nid in self.nodes}
+
+        while len(self.landmarks) < k:
+            self.landmarks.append(current)
+            dist, _ = self._dijkstra({current: 0})
+            tables.append(dist)
+
+            for nid, d in dist.items():
+                closest[nid] = min(closest[nid], d)
+
+            # Prefer nodes no landmark can reach yet (other components), then the furthest
+            chosen = set(self.landmarks)
+            candidates = [n for n in self.nodes if n not in chosen]
+            if not candidates:
+                break
+            current = max(candidates, key=lambda n: closest[n])
+
+        self.landmark_dist = {
+            nid: tuple(table.get(nid, math.inf) for table in tables)
+            for nid in self.nodes
+        }
+
+    def _alt_heuristic(self, goal_id):
+        """
+        Max triangle-inequality bound |d(L, goal) - d(L, n)| over all landmarks,
+        combined with the straight-line distance (both are admissible)
+        """
+        goal_dists = self.landmark_dist[goal_id]
+
+        def heuristic(node):
+            best = self._dist(node, goal_id)
+            for a, b in zip(self.landmark_dist[node], goal_dists):
+                if a != math.inf and b != math.inf:
+                    bound = a - b if a > b else b - a
+                    if bound > best:
+                        best = bound
+            return best
+
+        return heuristic
+
+    def _dijkstra(self, sources, targets=None, cutoff=math.inf):
+        """
+        Plain Dijkstra from one or more seeded sources
+        Stops once every node in targets is settled, or costs pass cutoff
+        Returns (dist, parent) for all settled nodes
+        """
+        dist = {}
+        parent = {}
+        best = dict(sources)
+        pq = [(cost, node) for node, cost in sources.items()]
+        heapq.heapify(pq)
+        remaining = set(targets) if targets is not None else None
+
+        while pq:
+            cost, current = heapq.heappop(pq)
+            if current in dist:
+                continue
+            if cost > cutoff:
+                break
+            dist[current] = cost
+
+            if remaining is not None:
+                remaining.discard(current)
+                if not remaining:
+                    break
+
+            for neighbor, weight in self.adj[current]:
+                if neighbor in dist:
+                    continue
+                new_cost = cost + weight
+                if new_cost < best.get(neighbor, math.inf):
+                    best[neighbor] = new_cost
+                    parent[neighbor] = current
+                    heapq.heappush(pq, (new_cost, neighbor))
+
+        return dist, {n: p for n, p in parent.items() if n in dist}
 
     def _dist(self, n1, n2):
         x1, y1 = self.nodes[n1]
         x2, y2 = self.nodes[n2]
         return math.hypot(x2 - x1, y2 - y1)
 
-    def get_path(self, start_id, goal_id):
+    def get_path(self, start_id, goal_id, mode="astar", stats=None):
+        """
+        mode  - one of SEARCH_MODES
+        stats - optional dict, filled with the mode and expanded-node count
+        """
+        if stats is None:
+            stats = {}
+        stats.update(mode=mode, expanded=0)
+
         if start_id not in self.nodes or goal_id not in self.nodes:
             return None, "Invalid Start or Goal Node ID"
+        if mode not in SEARCH_MODES:
+            return None, f"Unknown search mode '{mode}'"
+        if self.component[start_id] != self.component[goal_id]:
+            return None, "No path found (Start and Goal are not connected)"
+
+        if mode == "bidirectional":
+            return self._bidirectional_astar(start_id, goal_id, stats)
+        if mode == "alt" and self.landmarks:
+            return self._astar({start_id: 0}, goal_id, stats, self._alt_heuristic(goal_id))
+        return self._astar({start_id: 0}, goal_id, stats)
+
+    def get_path_from_edge(self, u, v, t, goal_id, stats=None):
+        """
+        Route from a point part-way along edge (u, v)
+        t = 0 is at u, t = 1 is at v (as returned by GraphSpatialIndex.snap_to_edge)
+        The search is seeded from both endpoints with the partial edge cost,
+        so the returned path starts at whichever endpoint is cheaper to leave by
+        """
+        if stats is None:
+            stats = {}
+        stats.update(mode="astar", expanded=0)
 
-        pq = [(0, start_id)]
+        if u not in self.nodes or v not in self.nodes or goal_id not in self.nodes:
+            return None, "Invalid Edge or Goal Node ID"
+        weight = self.edge_weight(u, v)
+        if weight is None:
+            return None, "Edge is closed or does not exist"
+        if goal_id not in (u, v) and self.component[goal_id] not in (self.component[u], self.component[v]):
+            return None, "No path found (Start and Goal are not connected)"
+
+        return self._astar({u: t * weight, v: (1 - t) * weight}, goal_id, stats)
+
+    def get_paths_to_many(self, start_id, targets, cutoff=math.inf, stats=None):
+        """
+        One-to-many query: a single Dijkstra pass from start_id that stops once
+        every target is settled or the cost passes cutoff (pixels)
+        Returns {target: (distance_px, path)} for the reachable targets
+        """
+        if stats is None:
+            stats = {}
+        stats.update(mode="dijkstra", expanded=0)
+
+        if start_id not in self.nodes:
+            return {}
+        # Targets in another component can never be settled, don't wait for them
+        targets = {t for t in targets if t in self.nodes and self.component[t] == self.component[start_id]}
+        if not targets:
+            return {}
+
+        dist, parent = self._dijkstra({start_id: 0}, targets, cutoff)
+        stats["expanded"] = len(dist)
+
+        return {
+            t: (dist[t], self._reconstruct_path(parent, t))
+            for t in targets if t in dist
+        }
+
+    def _astar(self, sources, goal_id, stats, heuristic=None):
+        if heuristic is None:
+            heuristic = lambda node: self._dist(node, goal_id)
+
+        pq = [(cost + heuristic(node), node) for node, cost in sources.items()]
+        heapq.heapify(pq)
         came_from = {}
-        cost_so_far = {start_id: 0}
+        cost_so_far = dict(sources)
+        closed = set()
 
         while pq:
             _, current = heapq.heappop(pq)
 
+            # Stale heap entry (node already settled with a lower cost)
+            if current in closed:
+                continue
+            closed.add(current)
+            stats["expanded"] += 1
+
             if current == goal_id:
                 return self._reconstruct_path(came_from, current), "Success"
 
             for neighbor, weight in self.adj[current]:
+                if neighbor in closed:
+                    continue
                 new_cost = cost_so_far[current] + weight
                 if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
                     cost_so_far[neighbor] = new_cost
-                    priority = new_cost + self._dist(neighbor, goal_id)
+                    priority = new_cost + heuristic(neighbor)
                     heapq.heappush(pq, (priority, neighbor))
                     came_from[neighbor] = current
         
         return None, "No path found (Graph might be disconnected)"
 
+    def _bidirectional_astar(self, start_id, goal_id, stats):
+        """
+        Bidirectional A* with average potentials:
+        forward uses p(n) = (h(n, goal) - h(n, start)) / 2, reverse uses -p(n).
+        Both are consistent, so each side keeps a proper closed set, and the
+        search stops once the two queue minimums together reach the best meeting cost.
+        """
+        if start_id == goal_id:
+            stats["expanded"] = 1
+            return [start_id], "Success"
+
+        def potential(n):
+            return 0.5 * (self._dist(n, goal_id) - self._dist(n, start_id))
+
+        # Index 0 = forward from start, 1 = reverse from goal (graph is undirected)
+        sign = (1, -1)
+        cost = ({start_id: 0}, {goal_id: 0})
+        parent = ({}, {})
+        closed = (set(), set())
+        pq = ([(potential(start_id), start_id)], [(-potential(goal_id), goal_id)])
+
+        best, meet = math.inf, None
+
+        while pq[0] and pq[1]:
+            if pq[0][0][0] + pq[1][0][0] >= best:
+                break
+
+            side = 0 if pq[0][0][0] <= pq[1][0][0] else 1
+            other = 1 - side
+            _, current = heapq.heappop(pq[side])
+
+            if current in closed[side]:
+                continue
+            closed[side].add(current)
+            stats["expanded"] += 1
+
+            for neighbor, weight in self.adj[current]:
+                if neighbor in closed[side]:
+                    continue
+                new_cost = cost[side][current] + weight
+                if neighbor not in cost[side] or new_cost < cost[side][neighbor]:
+                    cost[side][neighbor] = new_cost
+                    parent[side][neighbor] = current
+                    heapq.heappush(pq[side], (new_cost + sign[side] * potential(neighbor), neighbor))
+
+                    if neighbor in cost[other] and new_cost + cost[other][neighbor] < best:
+                        best = new_cost + cost[other][neighbor]
+                        meet = neighbor
+
+        if meet is None:
+            return None, "No path found (Graph might be disconnected)"
+
+        path = self._reconstruct_path(parent[0], meet)
+        current = meet
+        while current in parent[1]:
+            current = parent[1][current]
+            path.append(current)
+        return path, "Success"
+
     def _reconstruct_path(self, came_from, current):
         path = [current]
         while current in came_from:
@@ -149,57 +866,162 @@ class CampusNavigator:
         else:
             return "Turn RIGHT"
 
-    def get_readable_instructions(self, path):
+    def _edge_slot(self, u, v):
+        """Position of directed edge u -> v in the CSR edge tables, or None"""
+        j = self.index[v]
+        i = self.index[u]
+        for k in range(self._indptr[i], self._indptr[i + 1]):
+            if self._dst[k] == j:
+                return k
+        return None
+
+    def edge_length(self, u, v):
+        """Walking length (px) of edge u -> v along its geometry"""
+        k = self._edge_slot(u, v)
+        return float(self._edge_length[k]) if k is not None else self._dist(u, v)
+
+    def path_length(self, path):
+        """Walking length (px) of a path, without edge penalties (search costs include them)"""
+        if not path or len(path) < 2:
+            return 0.0
+        return float(self._path_geometry(path)[0].sum())
+
+    def edge_points(self, u, v):
+        """Points of edge u -> v from u to v, including the shape points of contracted edges"""
+        k = self._edge_slot(u, v) if self.has_edge_geometry else None
+        if k is None:
+            return [self.nodes[u], self.nodes[v]]
+        e = self._edge_id[k]
+        interior = self._geom_xy[self._geom_indptr[e]:self._geom_indptr[e + 1]]
+        if self.index[u] > self.index[v]:
+            interior = interior[::-1]
+        return [self.nodes[u]] + interior.tolist() + [self.nodes[v]]
+
+    def expand_geometry(self, path):
+        """Full drawable polyline of a node path (contracted edges expanded)"""
+        if not path:
+            return []
+        points = [self.nodes[path[0]]]
+        for u, v in zip(path, path[1:]):
+            points.extend(self.edge_points(u, v)[1:])
+        return points
+
+    def _path_geometry(self, path):
+        """
+        Segment lengths (px) and bearings (degrees) along a path, from the precomputed edge tables
+        Returns (lengths, bearing leaving each segment's start, bearing arriving at its end)
+        """
+        lengths = np.empty(len(path) - 1)
+        bearings = np.empty(len(path) - 1)
+        end_bearings = np.empty(len(path) - 1)
+        for i, (u, v) in enumerate(zip(path, path[1:])):
+            k = self._edge_slot(u, v)
+            if k is not None:
+                lengths[i] = self._edge_length[k]
+                bearings[i] = self._edge_bearing[k]
+                end_bearings[i] = self._edge_end_bearing[k]
+            else:
+                (x1, y1), (x2, y2) = self.nodes[u], self.nodes[v]
+                lengths[i] = math.hypot(x2 - x1, y2 - y1)
+                bearings[i] = end_bearings[i] = math.degrees(math.atan2(y2 - y1, x2 - x1))
+        return lengths, bearings, end_bearings
+
+    def get_maneuvers(self, path):
+        """
+        Structured turn-by-turn list for a path
+        Turns are classified for the whole path at once, and runs of
+        "straight on" nodes are merged into the preceding maneuver
+        Each maneuver: type (depart / left / right / arrive), node, towards,
+        distance_m and path_index (position of node in path)
+        """
         if not path or len(path) < 2:
+            return []
+
+        lengths, bearings, end_bearings = self._path_geometry(path)
+
+        # Heading change at every interior node, normalized to (-180, 180]
+        diff = (bearings[1:] - end_bearings[:-1] + 180) % 360 - 180
+        diff[diff == -180] = 180
+
+        # Note: In Image Coords (Y-down), Negative Diff is LEFT, Positive is RIGHT
+        turn = np.zeros(len(diff), dtype=np.int8)
+        turn[diff <= -TURN_THRESHOLD_DEG] = -1
+        turn[diff >= TURN_THRESHOLD_DEG] = 1
+
+        # A new maneuver starts at segment 0 and after every real turn
+        starts = np.concatenate(([0], np.flatnonzero(turn) + 1))
+        ends = np.append(starts[1:], len(lengths))
+        cumulative = np.concatenate(([0.0], np.cumsum(lengths))) * self.meters_per_pixel
+        distances = cumulative[ends] - cumulative[starts]
+
+        maneuvers = []
+        for i, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+            if i == 0:
+                kind = "depart"
+            else:
+                kind = "left" if turn[start - 1] < 0 else "right"
+            maneuvers.append({
+                "type": kind,
+                "node": path[start],
+                "towards": path[end],
+                "distance_m": round(float(distances[i]), 1),
+                "path_index": start
+            })
+
+        maneuvers.append({
+            "type": "arrive",
+            "node": path[-1],
+            "towards": None,
+            "distance_m": round(float(cumulative[-1]), 1),
+            "path_index": len(path) - 1
+        })
+        return maneuvers
+
+    def format_instructions(self, maneuvers):
+        """English strings for a maneuver list from get_maneuvers"""
+        if not maneuvers:
             return ["You are already there."]
-        
+
         instructions = []
-        total_dist = 0
-        
-        # First Step (Always "Head towards...")
-        first_dist = self._dist(path[0], path[1]) * 0.5 # Scale: 1px = 0.5m
-        instructions.append(f"• Start at {path[0]}, head towards {path[1]} ({int(first_dist)}m)")
-        total_dist += first_dist
-
-        # Subsequent Steps (Check turns)
-        for i in range(1, len(path) - 1):
-            prev = path[i-1]
-            curr = path[i]
-            nxt = path[i+1]
-            
-            dist = self._dist(curr, nxt) * 0.5
-            total_dist += dist
-            
-            turn = self.get_turn_direction(prev, curr, nxt)
-            
-            if turn == "Straight":
-                instructions.append(f"• Continue straight to {nxt} ({int(dist)}m)")
+        for m in maneuvers:
+            if m["type"] == "depart":
+                instructions.append(f"• Start at {m['node']}, head towards {m['towards']} ({int(m['distance_m'])}m)")
+            elif m["type"] == "arrive":
+                instructions.append(f"🏁 Arrived! Total Distance: {int(m['distance_m'])}m")
             else:
-                instructions.append(f"• {turn} towards {nxt} ({int(dist)}m)")
-            
-        instructions.append(f"🏁 Arrived! Total Distance: {int(total_dist)}m")
+                turn = "Turn LEFT" if m["type"] == "left" else "Turn RIGHT"
+                instructions.append(f"• {turn} towards {m['towards']} ({int(m['distance_m'])}m)")
         return instructions
 
+    def get_readable_instructions(self, path):
+        return self.format_instructions(self.get_maneuvers(path))
+
 # =========================
-# 3. VISUALIZATION
+# 4. VISUALIZATION
 # =========================
+# Interactive preview for local use; the server renders with maps/route_renderer.py
 def visualize_path(nav, path, start_name, end_name):
+    # Imported here so the API server doesn't need matplotlib
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+
     img = plt.imread(IMG_PATH)
     plt.figure(figsize=(12, 8))
     plt.imshow(img, cmap='gray')
     
-    # Plot edges
-    for u, neighbors in nav.adj.items():
-        for v, _ in neighbors:
-            x1, y1 = nav.nodes[u]
-            x2, y2 = nav.nodes[v]
-            plt.plot([x1, x2], [y1, y2], 'cyan', alpha=0.3, linewidth=1)
+    # Plot edges (one collection instead of a plot call per edge)
+    segments = [
+        nav.edge_points(u, v)
+        for u, neighbors in nav.adj.items() for v, _ in neighbors if u < v
+    ]
+    plt.gca().add_collection(LineCollection(segments, colors='cyan', alpha=0.3, linewidths=1))
 
     # Plot path
     if path:
+        route = nav.expand_geometry(path)
+        plt.plot([p[0] for p in route], [p[1] for p in route], 'r-', linewidth=3, label='Route')
         path_x = [nav.nodes[n][0] for n in path]
         path_y = [nav.nodes[n][1] for n in path]
-        plt.plot(path_x, path_y, 'r-', linewidth=3, label='Route')
         plt.scatter(path_x, path_y, c='yellow', s=30, zorder=5)
         
         plt.text(path_x[0], path_y[0], start_name, color='lime', fontsize=12, fontweight='bold', bbox=dict(facecolor='black', alpha=0.7))
@@ -211,7 +1033,7 @@ def visualize_path(nav, path, start_name, end_name):
     plt.show()
 
 # =========================
-# 4. MAIN INTERFACE
+# 5. MAIN INTERFACE
 # =========================
 if __name__ == "__main__":
     nav = CampusNavigator(GRAPH_PATH)
@@ -0,0 +1,176 @@
+"""
+alternatives.py
+---------------------------------
+K alternative routes (Yen's k-shortest loopless paths)
+All spur searches share the destination's reverse shortest-path
+tree (RerouteCache.get_tree), which gives exact remaining costs on
+the unrestricted graph:
+    - the tree distance is the A* heuristic for every spur search
+      (admissible: removing edges only makes paths longer)
+    - a spur search stops as soon as it settles a node whose tree
+      path to the goal avoids the removed nodes, so most spurs
+      finish after a handful of expansions, or with none at all
+
+Diversity: routes sharing more than max_overlap of their length
+with an already returned route are skipped (Yen's keeps using them
+to generate further candidates)
+"""
+
+import heapq
+import itertools
+import math
+import time
+
+# Yen's paths examined per requested route before giving up on diversity
+MAX_CANDIDATES_PER_ROUTE = 10
+
+
+def path_cost(nav, path):
+    return sum(nav.edge_weight(a, b) for a, b in zip(path, path[1:]))
+
+
+def overlap_ratio(nav, path, other_edges):
+    """Share of path's length on edges in other_edges (a set of _edge_key pairs)"""
+    total = shared = 0.0
+    for a, b in zip(path, path[1:]):
+        weight = nav.edge_weight(a, b)
+        total += weight
+        if nav._edge_key(a, b) in other_edges:
+            shared += weight
+    return shared / total if total > 0 else 1.0
+
+
+def _edge_set(nav, path):
+    return {nav._edge_key(a, b) for a, b in zip(path, path[1:])}
+
+
+def _tree_path(parent, goal, node):
+    path = [node]
+    while node != goal:
+        node = parent[node]
+        path.append(node)
+    return path
+
+
+def _spur(nav, spur, goal, removed_nodes, removed_edges, dist, parent, stats):
+    """
+    Cheapest spur -> goal path avoiding removed_nodes and the edges
+    spur -> n for n in removed_edges; (cost, path) or None
+    """
+    blocked = removed_nodes | {spur}
+    clean = {goal: True}
+
+    def tree_is_clean(node):
+        # Does node's tree path reach the goal without touching a blocked node?
+        walk = []
+        while node not in clean:
+            if node in blocked:
+                clean[node] = False
+                break
+            walk.append(node)
+            node = parent[node]
+        result = clean[node]
+        for n in walk:
+            clean[n] = result
+        return result
+
+    # Shortcut: the tree path itself is allowed
+    first = parent.get(spur)
+    if spur == goal or (first is not None and first not in removed_edges and tree_is_clean(first)):
+        stats["tree_shortcuts"] += 1
+        return dist[spur], _tree_path(parent, goal, spur)
+
+    stats["spur_searches"] += 1
+    g = {spur: 0.0}
+    came_from = {}
+    closed = set()
+    pq = [(dist[spur], spur)]
+    while pq:
+        _, current = heapq.heappop(pq)
+        if current in closed:
+            continue
+        closed.add(current)
+        stats["expanded"] += 1
+
+        # h is exact from here on, so this completion is optimal
+        if current != spur and tree_is_clean(current):
+            path = []
+            node = current
+            while node != spur:
+                path.append(node)
+                node = came_from[node]
+            path.append(spur)
+            path.reverse()
+            return g[current] + dist[current], path + _tree_path(parent, goal, current)[1:]
+
+        for neighbor, weight in nav.adj[current]:
+            if neighbor in closed or neighbor in removed_nodes or neighbor not in dist:
+                continue
+            if current == spur and neighbor in removed_edges:
+                continue
+            new_cost = g[current] + weight
+            if new_cost < g.get(neighbor, math.inf):
+                g[neighbor] = new_cost
+                came_from[neighbor] = current
+                heapq.heappush(pq, (new_cost + dist[neighbor], neighbor))
+    return None
+
+
+def k_alternatives(nav, tree, start, goal, k, max_overlap=1.0, time_budget_s=0.2):
+    """
+    Up to k routes from start to goal ranked by cost
+    tree - (dist, parent) reverse shortest-path tree rooted at goal
+    Returns (routes, stats); each route is (cost_px, path, overlap with
+    the best route); stats counts spur searches, tree shortcuts and
+    expansions, and complete = False if the time budget ran out
+    """
+    dist, parent = tree
+    stats = {"spur_searches": 0, "tree_shortcuts": 0, "expanded": 0, "candidates": 0, "complete": True}
+    if start not in dist:
+        return [], stats
+
+    deadline = time.perf_counter() + time_budget_s
+    best_path = _tree_path(parent, goal, start)
+    found = [best_path]                # Yen's A list, diverse or not
+    routes = [(dist[start], best_path, 1.0)]
+    accepted_edges = [_edge_set(nav, best_path)]
+    best_edges = accepted_edges[0]
+
+    candidates = []                    # heap of (cost, tiebreak, path)
+    seen = {tuple(best_path)}
+    counter = itertools.count()
+
+    while len(routes) < k and len(found) < k * MAX_CANDIDATES_PER_ROUTE:
+        last = found[-1]
+        prefix_cost = [0.0]
+        for a, b in zip(last, last[1:]):
+            prefix_cost.append(prefix_cost[-1] + nav.edge_weight(a, b))
+
+        for i in range(len(last) - 1):
+            if time.perf_counter() > deadline:
+                stats["complete"] = False
+                break
+            spur = last[i]
+            root = last[:i + 1]
+            removed_edges = {p[i + 1] for p in found if len(p) > i + 1 and p[:i + 1] == root}
+            result = _spur(nav, spur, goal, set(root[:-1]), removed_edges, dist, parent, stats)
+            if result is None:
+                continue
+            cost, spur_path = result
+            path = root[:-1] + spur_path
+            if tuple(path) not in seen:
+                seen.add(tuple(path))
+                heapq.heappush(candidates, (prefix_cost[i] + cost, next(counter), path))
+                stats["candidates"] += 1
+
+        if not stats["complete"] or not candidates:
+            break
+
+        cost, _, path = heapq.heappop(candidates)
+        found.append(path)
+        edges = _edge_set(nav, path)
+        if all(overlap_ratio(nav, path, other) <= max_overlap for other in accepted_edges):
+            routes.append((cost, path, overlap_ratio(nav, path, best_edges)))
+            accepted_edges.append(edges)
+
+    return routes, stats
@@ -0,0 +1,88 @@
+"""
+bench_search.py
+---------------------------------
+Compares CampusNavigator search modes on random node pairs
+Reports average expanded nodes and query time per mode,
+relative to the plain Euclidean A* baseline
+
+With several graph files (e.g. an OSM export with and without
+degree-2 contraction) the same pairs, drawn from nodes present in
+every graph, are timed on each and node counts are reported side by side
+
+Usage (from backend/):
+    python -m maps.bench_search [num_pairs] [graph.json ...]
+"""
+
+import random
+import sys
+import time
+
+from maps.Maps_campus import CampusNavigator, GRAPH_PATH, SEARCH_MODES
+
+BASELINE = "astar"
+
+
+def random_pairs(ids, num_pairs=500, seed=0):
+    rng = random.Random(seed)
+    return [(rng.choice(ids), rng.choice(ids)) for _ in range(num_pairs)]
+
+
+def run_benchmark(nav, num_pairs=500, seed=0, pairs=None):
+    pairs = pairs or random_pairs(list(nav.nodes), num_pairs, seed)
+    num_pairs = len(pairs)
+
+    results = {}
+    for mode in SEARCH_MODES:
+        expanded = 0
+        found = 0
+        start = time.perf_counter()
+        for s, t in pairs:
+            stats = {}
+            path, _ = nav.get_path(s, t, mode=mode, stats=stats)
+            expanded += stats["expanded"]
+            found += path is not None
+        elapsed = time.perf_counter() - start
+
+        results[mode] = {
+            "expanded": expanded / num_pairs,
+            "ms": elapsed * 1000 / num_pairs,
+            "found": found,
+        }
+    return results
+
+
+def print_report(nav, results):
+    print(f"📊 Graph: {len(nav.nodes)} nodes, {nav.num_components} component(s), {len(nav.landmarks)} landmarks")
+    base = results[BASELINE]["expanded"] or 1
+    print(f"{'mode':<15}{'expanded':>10}{'vs ' + BASELINE:>12}{'ms/query':>10}{'found':>8}")
+    for mode, r in results.items():
+        print(f"{mode:<15}{r['expanded']:>10.1f}{r['expanded'] / base:>11.2f}x{r['ms']:>10.3f}{r['found']:>8}")
+
+
+def compare_graphs(graph_files, num_pairs=500, seed=0):
+    """Same node pairs on every graph: node/edge counts and per-mode search cost"""
+    navs = [CampusNavigator(path) for path in graph_files]
+    common = set(navs[0].nodes)
+    for nav in navs[1:]:
+        common &= set(nav.nodes)
+    if not common:
+        print("❌ The graphs share no node IDs")
+        return
+    pairs = random_pairs(sorted(common), num_pairs, seed)
+    print(f"🔁 {len(pairs)} pairs over {len(common)} nodes shared by all graphs\n")
+
+    for path, nav in zip(graph_files, navs):
+        edges = sum(len(neighbors) for neighbors in nav.adj.values()) // 2
+        print(f"📄 {path}: {edges} edges")
+        print_report(nav, run_benchmark(nav, pairs=pairs))
+        print()
+
+
+if __name__ == "__main__":
+    num_pairs = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    graph_files = sys.argv[2:]
+    if len(graph_files) > 1:
+        compare_graphs(graph_files, num_pairs)
+    else:
+        nav = CampusNavigator(graph_files[0] if graph_files else GRAPH_PATH)
+        print_report(nav, run_benchmark(nav, num_pairs))
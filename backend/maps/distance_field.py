@@ -0,0 +1,282 @@
+"""
+distance_field.py
+---------------------------------
+Off-graph routing on the map image itself
+Lawns and plazas have no graph edges, so a walkability grid is
+derived from giki_map_fixed.png (script.py colors: roads light gray,
+buildings dark gray, everything else open ground) and a per-destination
+distance field is computed over it. Routing from any pixel is then a
+steepest descent on the field, O(path length), no search
+
+Fields are exact 8-connected shortest paths, built with alternating
+downward / upward raster passes (numpy per row, min-plus prefix scans
+along the row) until nothing improves. A pass covers any path that
+only moves one way vertically, so campus maps settle in a handful of
+sweeps (~0.5s on the 1743x685 cell grid) instead of a per-pixel
+heap Dijkstra in Python
+
+Stored as uint16 (FIELD_QUANTUM px steps, 65535 = unreachable) .npy
+files on a CELL_PX grid and opened memory-mapped: a descent only
+touches the pages along its path, so many destinations stay cheap
+"""
+
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+# ================= CONFIGURATION =================
+# Grid cell size in map pixels
+CELL_PX = 2
+
+# Walking cost per pixel: walkways are preferred over open ground
+ROAD_COST = 1.0
+OPEN_COST = 1.5
+
+# Grayscale classes from script.py's colors (#E0E0E0 roads, #404040 buildings)
+ROAD_MIN_GRAY = 160
+BUILDING_GRAY = (40, 100)
+
+# Field storage: px per stored unit, and the "unreachable" marker
+FIELD_QUANTUM = 0.25
+UNREACHABLE = np.iinfo(np.uint16).max
+
+# Down + up sweeps before giving up on convergence; converged once no
+# cell improves by more than SWEEP_TOLERANCE px (prefix sums jitter in the last bits)
+MAX_SWEEPS = 50
+SWEEP_TOLERANCE = 1e-3
+
+# Memory-mapped fields kept open
+MAX_OPEN_FIELDS = 32
+
+# Start cells inside a building look this far (cells) for walkable ground
+START_SEARCH_CELLS = 15
+
+# Bump when the mask or sweep changes, so stored fields are rebuilt
+FIELD_VERSION = 1
+
+# Cost of stepping through a blocked cell; anything above BIG / 2 is unreachable
+BIG = 1e6
+
+_NEIGHBORS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+
+def walk_cost_grid(img):
+    """Per-cell walking cost from a BGR map image, inf where blocked"""
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    road = (gray >= ROAD_MIN_GRAY).astype(np.float32)
+    building = ((gray >= BUILDING_GRAY[0]) & (gray <= BUILDING_GRAY[1])).astype(np.float32)
+
+    h, w = gray.shape[0] // CELL_PX, gray.shape[1] // CELL_PX
+    road = cv2.resize(road[:h * CELL_PX, :w * CELL_PX], (w, h), interpolation=cv2.INTER_AREA)
+    building = cv2.resize(building[:h * CELL_PX, :w * CELL_PX], (w, h), interpolation=cv2.INTER_AREA)
+
+    cost = np.full((h, w), OPEN_COST)
+    cost[building > 0.5] = np.inf
+    # Any walkway in a cell keeps it open, so narrow paths between buildings survive
+    cost[road > 0] = ROAD_COST
+    return cost
+
+
+def _row_pass(dist, step):
+    """
+    One top-to-bottom Gauss-Seidel pass, in place: each row takes the
+    previous row's values (straight and diagonal moves), then a min-plus
+    prefix scan each way along the row. Covers every path that never
+    moves up, whatever its sideways moves
+    """
+    half = 0.5 * CELL_PX
+    diag = half * math.sqrt(2)
+    prefix = np.zeros(dist.shape[1])
+    for i in range(1, dist.shape[0]):
+        above, s_above, s_row, row = dist[i - 1], step[i - 1], step[i], dist[i]
+        cand = above + (s_above + s_row) * half
+        np.minimum(cand[1:], above[:-1] + (s_above[:-1] + s_row[1:]) * diag, out=cand[1:])
+        np.minimum(cand[:-1], above[1:] + (s_above[1:] + s_row[:-1]) * diag, out=cand[:-1])
+        np.minimum(row, cand, out=row)
+
+        # d[j] = P[j] + min_{k<=j}(d[k] - P[k]), and mirrored
+        np.cumsum((s_row[1:] + s_row[:-1]) * half, out=prefix[1:])
+        np.minimum(row, prefix + np.minimum.accumulate(row - prefix), out=row)
+        np.minimum(row, np.minimum.accumulate((row + prefix)[::-1])[::-1] - prefix, out=row)
+
+
+def compute_field(cost, sources):
+    """
+    Shortest walking cost (px) from every cell to the nearest source cell
+    (8-connected, step cost = mean of the two cells' costs x step length)
+    cost - walk_cost_grid output; sources - list of (row, col)
+    Returns (field, sweeps); unreachable cells are inf
+    """
+    blocked = np.isinf(cost)
+    step = np.where(blocked, BIG, cost)
+    dist = np.full(cost.shape, np.inf)
+    for r, c in sources:
+        dist[r, c] = 0.0
+
+    sweeps = 0
+    for sweeps in range(1, MAX_SWEEPS + 1):
+        before = dist.copy()
+        for d_view, s_view in ((dist, step), (dist[::-1], step[::-1])):
+            _row_pass(d_view, s_view)
+            dist[blocked] = np.inf
+        with np.errstate(invalid="ignore"):
+            if not np.any(before - dist > SWEEP_TOLERANCE):
+                break
+
+    dist[dist > BIG / 2] = np.inf
+    return dist, sweeps
+
+
+def quantize(field):
+    q = np.full(field.shape, UNREACHABLE, dtype=np.uint16)
+    finite = np.isfinite(field) & (field < (UNREACHABLE - 1) * FIELD_QUANTUM)
+    q[finite] = np.round(field[finite] / FIELD_QUANTUM).astype(np.uint16)
+    return q
+
+
+def descend(field, row, col, max_steps=None):
+    """Cells from (row, col) down the field to a source, or None if unreachable"""
+    h, w = field.shape
+    if field[row, col] == UNREACHABLE:
+        return None
+    cells = [(row, col)]
+    current = int(field[row, col])
+    for _ in range(max_steps or h * w):
+        if current == 0:
+            return cells
+        best = None
+        for dr, dc in _NEIGHBORS:
+            r, c = row + dr, col + dc
+            if 0 <= r < h and 0 <= c < w:
+                value = int(field[r, c])
+                if value < current and (best is None or value < best[0]):
+                    best = (value, r, c)
+        if best is None:
+            return None
+        current, row, col = best
+        cells.append((row, col))
+    return None
+
+
+class DistanceFieldRouter:
+    """
+    Per-destination distance fields over the map image, stored under
+    field_dir and memory-mapped on use
+    """
+
+    def __init__(self, img_path, field_dir, max_open=MAX_OPEN_FIELDS):
+        self.img_path = img_path
+        self.field_dir = field_dir
+        self.max_open = max_open
+
+        self._cost = None
+        self._key = None
+        self._open = OrderedDict()  # destination -> memmap
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+
+        self.hits = 0
+        self.loads = 0
+        self.builds = 0
+
+    def _grid(self):
+        """Cost grid and a key over the image + settings, built on first use"""
+        if self._cost is None:
+            with open(self.img_path, "rb") as f:
+                data = f.read()
+            img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if img is None:
+                raise ValueError(f"Could not read map image {self.img_path}")
+            settings = f"{FIELD_VERSION}:{CELL_PX}:{ROAD_COST}:{OPEN_COST}:{ROAD_MIN_GRAY}:{BUILDING_GRAY}:{FIELD_QUANTUM}"
+            self._key = hashlib.sha1(data + settings.encode()).hexdigest()[:12]
+            self._cost = walk_cost_grid(img)
+        return self._cost
+
+    def walkable_cell(self, x, y, radius=START_SEARCH_CELLS):
+        """Grid cell for map pixel (x, y), moved to the nearest walkable cell if needed"""
+        cost = self._grid()
+        h, w = cost.shape
+        row = min(max(int(y // CELL_PX), 0), h - 1)
+        col = min(max(int(x // CELL_PX), 0), w - 1)
+        if np.isfinite(cost[row, col]):
+            return row, col
+        r0, c0 = max(row - radius, 0), max(col - radius, 0)
+        window = np.isfinite(cost[r0:row + radius + 1, c0:col + radius + 1])
+        rs, cs = np.nonzero(window)
+        if not len(rs):
+            return None
+        i = np.argmin((rs + r0 - row) ** 2 + (cs + c0 - col) ** 2)
+        return int(rs[i] + r0), int(cs[i] + c0)
+
+    def _path(self, name):
+        safe = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in str(name))
+        return os.path.join(self.field_dir, f"{safe}-{self._key}.npy")
+
+    def field(self, name, x, y):
+        """
+        Memory-mapped field for destination name at map pixel (x, y),
+        built and stored on first use. Returns (field, cached)
+        """
+        self._grid()
+        with self._lock:
+            field = self._open.get(name)
+            if field is not None:
+                self._open.move_to_end(name)
+                self.hits += 1
+                return field, True
+
+        path = self._path(name)
+        cached = True
+        with self._build_lock:
+            if not os.path.exists(path):
+                target = self.walkable_cell(x, y)
+                if target is None:
+                    raise ValueError(f"Destination {name} is not near walkable ground")
+                start = time.perf_counter()
+                values, sweeps = compute_field(self._cost, [target])
+                os.makedirs(self.field_dir, exist_ok=True)
+                tmp_path = path + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    np.save(f, quantize(values))
+                os.replace(tmp_path, path)
+                print(f"🗺️ Distance field for {name}: {sweeps} sweeps in {time.perf_counter() - start:.2f}s")
+                self.builds += 1
+                cached = False
+
+        field = np.load(path, mmap_mode="r")
+        with self._lock:
+            self.loads += 1
+            self._open[name] = field
+            self._open.move_to_end(name)
+            while len(self._open) > self.max_open:
+                self._open.popitem(last=False)
+        return field, cached
+
+    def route(self, field, x, y):
+        """
+        Walk from map pixel (x, y) down a field
+        Returns (points [[x, y], ...] in map pixels, distance_px) or None
+        """
+        start = self.walkable_cell(x, y)
+        if start is None:
+            return None
+        cells = descend(field, *start)
+        if cells is None:
+            return None
+
+        centers = np.array([[(c + 0.5) * CELL_PX, (r + 0.5) * CELL_PX] for r, c in cells], dtype=np.float32)
+        if len(centers) > 2:
+            centers = cv2.approxPolyDP(centers.reshape(-1, 1, 2), CELL_PX, False).reshape(-1, 2)
+        points = [[float(x), float(y)]] + centers.tolist()
+        walk_in = math.hypot(points[1][0] - x, points[1][1] - y)
+        return points, field[start] * FIELD_QUANTUM + walk_in
+
+    def stats(self):
+        with self._lock:
+            return {"open": len(self._open), "hits": self.hits, "loads": self.loads, "builds": self.builds}
@@ -0,0 +1,169 @@
+"""
+footprint_index.py
+---------------------------------
+Building footprints around a GPS fix
+Footprints exported by script.py (building_footprints.json) are
+projected to local meters and bulk-loaded into a static R-tree
+(Sort-Tile-Recursive packing: bounding boxes sorted into full
+nodes, NODE_CAPACITY children each). A query walks only the nodes
+within the search radius, then measures the exact distance to each
+nearby outline, so a lookup stays in the microseconds range even for
+thousands of buildings
+
+Footprint file:
+    {"footprints": [{"id": "way/123", "name": "Library", "bank": "library",
+                     "rings": [[[lon, lat], ...], ...]}, ...]}
+    (first ring is the outline, the rest are holes; bank names the
+    localization bank for that building, if it has one)
+"""
+
+import json
+import math
+
+import numpy as np
+
+# Children per R-tree node
+NODE_CAPACITY = 16
+
+# Meters per degree of latitude (WGS84, mid-latitudes)
+METERS_PER_DEG_LAT = 110_574.0
+
+# Always search at least this far past the fix's accuracy radius
+SEARCH_MARGIN_M = 25.0
+
+
+def _point_polygon_distance(x, y, rings):
+    """
+    Meters from (x, y) to a polygon (0 if inside), rings as lists of (x, y)
+    Plain Python: building outlines are a handful of vertices, too few for numpy to pay off
+    """
+    inside = False
+    best = math.inf
+    for ring in rings:
+        ax, ay = ring[-1]
+        for bx, by in ring:
+            # Even-odd rule over all rings handles holes
+            if (ay > y) != (by > y) and x < (bx - ax) * (y - ay) / (by - ay) + ax:
+                inside = not inside
+            dx, dy = bx - ax, by - ay
+            seg2 = dx * dx + dy * dy
+            t = 0.0 if seg2 == 0 else min(1.0, max(0.0, ((x - ax) * dx + (y - ay) * dy) / seg2))
+            px, py = ax + t * dx - x, ay + t * dy - y
+            d2 = px * px + py * py
+            if d2 < best:
+                best = d2
+            ax, ay = bx, by
+    return 0.0 if inside else math.sqrt(best)
+
+
+class FootprintIndex:
+    def __init__(self, footprints):
+        """footprints: list of dicts as in the footprint file"""
+        self.records = [
+            {k: fp.get(k) for k in ("id", "name", "bank")}
+            for fp in footprints if fp.get("rings") and len(fp["rings"][0]) >= 3
+        ]
+        rings_ll = [fp["rings"] for fp in footprints if fp.get("rings") and len(fp["rings"][0]) >= 3]
+
+        # Local equirectangular projection around the data's center
+        if rings_ll:
+            outlines = np.vstack([np.asarray(r[0], dtype=np.float64) for r in rings_ll])
+            self.lon0, self.lat0 = outlines.mean(axis=0)
+        else:
+            self.lon0 = self.lat0 = 0.0
+        self._mx = METERS_PER_DEG_LAT * math.cos(math.radians(self.lat0))
+
+        projected = [[self._project(np.asarray(r, dtype=np.float64)) for r in rings] for rings in rings_ll]
+        boxes = np.array([[*r[0].min(axis=0), *r[0].max(axis=0)] for r in projected]).reshape(-1, 4)
+        self.rings = [[[tuple(p) for p in r.tolist()] for r in rings] for rings in projected]
+        self._build(boxes)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f).get("footprints", []))
+
+    def __len__(self):
+        return len(self.records)
+
+    def _project(self, lonlat):
+        xy = np.empty_like(lonlat)
+        xy[:, 0] = (lonlat[:, 0] - self.lon0) * self._mx
+        xy[:, 1] = (lonlat[:, 1] - self.lat0) * METERS_PER_DEG_LAT
+        return xy
+
+    def _build(self, boxes):
+        """
+        STR bulk load. Levels are stored bottom-up as (boxes, child ranges);
+        level 0 children are footprint indices
+        """
+        self.levels = []
+        items = np.arange(len(boxes))
+        while True:
+            n = len(boxes)
+            leaves = max(1, math.ceil(n / NODE_CAPACITY))
+            slices = max(1, math.ceil(math.sqrt(leaves)))
+            per_slice = slices * NODE_CAPACITY
+
+            # Sort by x center into vertical slices, each slice by y center
+            cx = (boxes[:, 0] + boxes[:, 2]) / 2
+            cy = (boxes[:, 1] + boxes[:, 3]) / 2
+            order = np.argsort(cx, kind="stable")
+            for s in range(0, n, per_slice):
+                part = order[s:s + per_slice]
+                order[s:s + per_slice] = part[np.argsort(cy[part], kind="stable")]
+
+            boxes, items = boxes[order], items[order]
+            starts = np.arange(0, n, NODE_CAPACITY)
+            node_boxes = np.array([
+                [*boxes[a:a + NODE_CAPACITY, :2].min(axis=0), *boxes[a:a + NODE_CAPACITY, 2:].max(axis=0)]
+                for a in starts
+            ]).reshape(-1, 4)
+            self.levels.append((boxes, items, starts))
+            if len(node_boxes) <= 1:
+                self.root = node_boxes
+                break
+            boxes, items = node_boxes, np.arange(len(node_boxes))
+
+        # Plain lists are faster than numpy scalars for the tiny per-node loops
+        self._levels = [(b.tolist(), i.tolist(), s.tolist()) for b, i, s in self.levels]
+
+    def candidates(self, lat, lon, accuracy_m=0.0, max_results=5, search_m=None):
+        """
+        Buildings around a fix, nearest first: [(record, distance_m)]
+        distance_m is 0 when the fix is inside the footprint. Buildings
+        farther than search_m (default accuracy_m + SEARCH_MARGIN_M) are left out
+        """
+        if not self.records:
+            return []
+        radius = search_m if search_m is not None else accuracy_m + SEARCH_MARGIN_M
+        x = (lon - self.lon0) * self._mx
+        y = (lat - self.lat0) * METERS_PER_DEG_LAT
+        r2 = radius * radius
+
+        # Top-down: (level, node) pairs whose boxes are within the radius
+        top = len(self._levels) - 1
+        stack = [(top, 0)]
+        found = []
+        while stack:
+            level, node = stack.pop()
+            boxes, items, starts = self._levels[level]
+            a = starts[node]
+            for k in range(a, min(a + NODE_CAPACITY, len(boxes))):
+                x1, y1, x2, y2 = boxes[k]
+                dx = x1 - x if x < x1 else (x - x2 if x > x2 else 0.0)
+                dy = y1 - y if y < y1 else (y - y2 if y > y2 else 0.0)
+                if dx * dx + dy * dy > r2:
+                    continue
+                if level == 0:
+                    found.append(items[k])
+                else:
+                    stack.append((level - 1, items[k]))
+
+        results = []
+        for i in found:
+            dist = _point_polygon_distance(x, y, self.rings[i])
+            if dist <= radius:
+                results.append((self.records[i], round(dist, 1)))
+        results.sort(key=lambda r: r[1])
+        return results[:max_results]
@@ -0,0 +1,176 @@
+"""
+graph_binary.py
+---------------------------------
+Compact binary graph format (.gbin), an alternative to the
+indented giki_graph.json export
+
+Layout:
+    8 bytes   magic b"MMGRAPH1"
+    4 bytes   header length (little-endian uint32)
+    header    JSON: {"compressed": bool, "arrays": {name: {dtype, shape, offset, size}}}
+    arrays    raw little-endian arrays, each starting on a 64-byte boundary
+
+Arrays:
+    id_offsets (n+1 uint32) + id_bytes (uint8)  - UTF-8 string table of node IDs
+    xy        (n, 2) float32  pixel coordinates
+    latlon    (n, 2) float64  NaN where unknown
+    edge_u/v  (m,)   uint32   endpoint indices
+    cost      (m,)   float32  NaN where unknown
+    geom_indptr (m+1 uint32) + geom_xy (k, 2) float32 - interior shape points of contracted edges
+
+Uncompressed files are memory-mapped and every array is returned as a
+read-only view on the mapping in its on-disk dtype (no parsing, no copy;
+pages are shared by every process mapping the file). Consumers widen
+only what their arithmetic needs. Compressed files inflate each array with zlib
+"""
+
+import json
+import mmap
+import struct
+import zlib
+
+import numpy as np
+
+MAGIC = b"MMGRAPH1"
+ALIGN = 64
+BINARY_EXT = ".gbin"
+
+
+def write_graph_binary(path, ids, xy, latlon, edge_u, edge_v, cost, geometry=None, compress=False):
+    """
+    Same fields as the parse_graph_json tuple
+    ids - node IDs (any type, stored as strings)
+    geometry - optional per-edge (k, 2) interior shape points from u to v,
+               or None for straight edges
+    """
+    encoded = [str(i).encode("utf-8") for i in ids]
+    id_offsets = np.concatenate(([0], np.cumsum([len(e) for e in encoded]))).astype("<u4")
+
+    counts = np.zeros(len(edge_u), dtype=np.int64)
+    interior = []
+    for i, pts in enumerate(geometry or ()):
+        if pts is not None and len(pts):
+            interior.append(np.asarray(pts, dtype=np.float64).reshape(-1, 2))
+            counts[i] = len(pts)
+    geom_xy = np.vstack(interior) if interior else np.empty((0, 2))
+
+    arrays = {
+        "id_offsets": id_offsets,
+        "id_bytes": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        "xy": np.asarray(xy, dtype="<f4").reshape(-1, 2),
+        "latlon": np.asarray(latlon, dtype="<f8").reshape(-1, 2),
+        "edge_u": np.asarray(edge_u, dtype="<u4"),
+        "edge_v": np.asarray(edge_v, dtype="<u4"),
+        "cost": np.asarray(cost, dtype="<f4"),
+        "geom_indptr": np.concatenate(([0], np.cumsum(counts))).astype("<u4"),
+        "geom_xy": geom_xy.astype("<f4"),
+    }
+
+    blobs, meta = [], {}
+    for name, arr in arrays.items():
+        data = np.ascontiguousarray(arr).tobytes()
+        if compress:
+            data = zlib.compress(data, 6)
+        meta[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "size": len(data)}
+        blobs.append((name, data))
+
+    # Offsets depend on the header length, which depends on the offsets: pad the header
+    def header_bytes(start):
+        offset = start
+        for name, data in blobs:
+            offset = -(-offset // ALIGN) * ALIGN
+            meta[name]["offset"] = offset
+            offset += len(data)
+        return json.dumps({"compressed": compress, "arrays": meta}).encode("utf-8")
+
+    start = 0
+    while True:
+        header = header_bytes(start)
+        needed = -(-(len(MAGIC) + 4 + len(header)) // ALIGN) * ALIGN
+        if needed <= start:
+            break
+        start = needed
+    header = header.ljust(start - len(MAGIC) - 4, b" ")
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for name, data in blobs:
+            f.seek(meta[name]["offset"])
+            f.write(data)
+
+
+def read_graph_binary(path):
+    """
+    Returns the parse_graph_json tuple (ids, xy, latlon, edge_u, edge_v, cost, geometry)
+    in the on-disk dtypes (xy / cost / geometry float32, edge_u / edge_v uint32);
+    for an uncompressed file every array is a read-only view on the memory map
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a binary graph file")
+        (header_len,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(header_len))
+
+        if header["compressed"]:
+            def array(name):
+                m = header["arrays"][name]
+                f.seek(m["offset"])
+                data = zlib.decompress(f.read(m["size"]))
+                return np.frombuffer(data, dtype=m["dtype"]).reshape(m["shape"])
+        else:
+            # The mapping stays alive as long as any array view references it
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            def array(name):
+                m = header["arrays"][name]
+                count = int(np.prod(m["shape"]))
+                if count == 0:
+                    return np.empty(m["shape"], dtype=m["dtype"])
+                return np.frombuffer(buf, dtype=m["dtype"], count=count, offset=m["offset"]).reshape(m["shape"])
+
+        arrays = {name: array(name) for name in header["arrays"]}
+
+    id_bytes = arrays["id_bytes"].tobytes()
+    bounds = arrays["id_offsets"].tolist()
+    ids = [id_bytes[a:b].decode("utf-8") for a, b in zip(bounds, bounds[1:])]
+
+    # Shape points as slices (views) of one array, only for edges that have them
+    geometry = [None] * len(arrays["edge_u"])
+    bounds = arrays["geom_indptr"].tolist()
+    geom_xy = arrays["geom_xy"]
+    for i in np.flatnonzero(np.diff(arrays["geom_indptr"])).tolist():
+        geometry[i] = geom_xy[bounds[i]:bounds[i + 1]]
+
+    return ids, arrays["xy"], arrays["latlon"], arrays["edge_u"], arrays["edge_v"], arrays["cost"], geometry
+
+
+if __name__ == "__main__":
+    # Convert a JSON graph and compare size / load time: python graph_binary.py graph.json [out.gbin] [--compress]
+    import os
+    import sys
+    import time
+
+    from Maps_campus import parse_graph_json
+
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    json_path = args[0]
+    out_path = args[1] if len(args) > 1 else os.path.splitext(json_path)[0] + BINARY_EXT
+
+    t0 = time.perf_counter()
+    with open(json_path, "r") as f:
+        parsed = parse_graph_json(json.load(f))
+    json_s = time.perf_counter() - t0
+
+    write_graph_binary(out_path, *parsed, compress="--compress" in sys.argv)
+
+    t0 = time.perf_counter()
+    read_graph_binary(out_path)
+    bin_s = time.perf_counter() - t0
+
+    json_kb = os.path.getsize(json_path) / 1024
+    bin_kb = os.path.getsize(out_path) / 1024
+    print(f"📄 {json_path}: {json_kb:,.1f} KB, parsed in {json_s * 1000:.1f} ms")
+    print(f"📦 {out_path}: {bin_kb:,.1f} KB, read in {bin_s * 1000:.1f} ms")
+    print(f"📊 {json_kb / max(bin_kb, 1e-9):.1f}x smaller, {json_s / max(bin_s, 1e-9):.1f}x faster to load")
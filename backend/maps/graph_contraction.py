@@ -0,0 +1,134 @@
+"""
+graph_contraction.py
+---------------------------------
+Degree-2 node contraction for exported routing graphs
+Chains of shape nodes (exactly two neighbours) between junctions
+are collapsed into a single edge whose cost is the chain's summed
+cost and whose geometry keeps every shape point, so the route can
+still be drawn exactly while the search touches far fewer nodes
+
+Used by osm_graph_builder.py at export time
+"""
+
+import numpy as np
+
+
+def contract_degree2(xy, edge_u, edge_v, cost, keep=None):
+    """
+    xy      - (n, 2) node coordinates
+    edge_u, edge_v, cost - undirected edge list (indices into xy)
+    keep    - optional boolean mask of nodes that must survive (e.g. named buildings)
+
+    Returns (kept, new_u, new_v, new_cost, geometry):
+        kept     - sorted indices of surviving nodes
+        new_u/v  - edge endpoints as indices into kept
+        new_cost - summed chain cost per edge
+        geometry - per edge, (m, 2) array of points from u to v
+                   (endpoints included), or None for an uncontracted edge
+    """
+    n = len(xy)
+
+    # Undirected, deduplicated (cheapest copy wins), no self-loops
+    a = np.minimum(edge_u, edge_v)
+    b = np.maximum(edge_u, edge_v)
+    mask = a != b
+    a, b, cost = a[mask], b[mask], np.asarray(cost, dtype=np.float64)[mask]
+    order = np.lexsort((cost, b, a))
+    a, b, cost = a[order], b[order], cost[order]
+    first = np.ones(len(a), dtype=bool)
+    first[1:] = (a[1:] != a[:-1]) | (b[1:] != b[:-1])
+    a, b, cost = a[first], b[first], cost[first]
+
+    # Both-direction CSR adjacency as flat lists for the chain walk
+    src = np.concatenate((a, b))
+    order = np.argsort(src, kind="stable")
+    nbr = np.concatenate((b, a))[order].tolist()
+    nbr_cost = np.concatenate((cost, cost))[order].tolist()
+    degree = np.bincount(src, minlength=n)
+    indptr = np.concatenate(([0], np.cumsum(degree))).tolist()
+
+    junction = degree != 2
+    if keep is not None:
+        junction |= np.asarray(keep, dtype=bool)
+    junction = junction.tolist()
+    visited = [False] * n
+
+    walks = []  # (node chain, cost of each step) from one junction to the next
+
+    def walk_from(s):
+        for k in range(indptr[s], indptr[s + 1]):
+            cur = nbr[k]
+            if junction[cur]:
+                if s < cur:
+                    walks.append(([s, cur], [nbr_cost[k]]))
+                continue
+            if visited[cur]:
+                continue  # Chain already walked from its other end
+
+            prev, chain, steps = s, [s], [nbr_cost[k]]
+            while not junction[cur]:
+                visited[cur] = True
+                chain.append(cur)
+                i = indptr[cur]
+                # Step to whichever of the two neighbours we did not come from
+                step = i if nbr[i] != prev else i + 1
+                prev, cur = cur, nbr[step]
+                steps.append(nbr_cost[step])
+            chain.append(cur)
+            walks.append((chain, steps))
+
+    for s in range(n):
+        if junction[s]:
+            walk_from(s)
+    # Isolated degree-2 cycles have no junction: promote one node of each
+    for s in range(n):
+        if not junction[s] and not visited[s]:
+            junction[s] = True
+            walk_from(s)
+
+    # One edge per junction pair. A second chain between the same pair, or a
+    # loop back to its own junction, keeps interior nodes as junctions so its
+    # pieces get distinct endpoints (nothing but degree-2 nodes is dropped)
+    used = np.array(junction, dtype=bool)
+    edges = {}   # (u, v) with u < v -> (node chain, step costs)
+    pieces = []
+
+    def split(chain, steps, cuts):
+        for a, b in zip([0] + cuts, cuts + [len(chain) - 1]):
+            pieces.append((chain[a:b + 1], steps[a:b]))
+        used[[chain[c] for c in cuts]] = True
+
+    for chain, steps in walks:
+        last = len(chain) - 1
+        if chain[0] == chain[-1]:
+            # At least two interior nodes, since parallel edges were merged above
+            split(chain, steps, [max(1, last // 3), max(2, 2 * last // 3)])
+            continue
+        key = (min(chain[0], chain[-1]), max(chain[0], chain[-1]))
+        if key not in edges:
+            edges[key] = (chain, steps)
+            continue
+        if len(chain) == 2:
+            # The direct edge keeps the pair; the chain it displaces has interior nodes
+            chain, steps, edges[key] = *edges[key], (chain, steps)
+            last = len(chain) - 1
+        split(chain, steps, [last // 2])
+
+    kept = np.flatnonzero(used)
+    remap = np.full(n, -1, dtype=np.int64)
+    remap[kept] = np.arange(len(kept))
+
+    new_u, new_v, new_cost, geometry = [], [], [], []
+    for chain, steps in list(edges.values()) + pieces:
+        new_u.append(remap[chain[0]])
+        new_v.append(remap[chain[-1]])
+        new_cost.append(sum(steps))
+        geometry.append(None if len(chain) == 2 else xy[chain])
+
+    return (
+        kept,
+        np.array(new_u, dtype=np.int64),
+        np.array(new_v, dtype=np.int64),
+        np.array(new_cost, dtype=np.float64),
+        geometry,
+    )
@@ -0,0 +1,535 @@
+"""
+graph_tiles.py
+---------------------------------
+Tiled routing graphs for maps too large to keep in Python dicts
+build_tiles() cuts a compiled graph into a grid of TILE_PX square
+tiles on disk (<graph>.tiles/):
+    manifest.json          grid, counts, source SHA-1
+    ids.npy, xy.npy,       per-node tables, opened memory-mapped, so an
+    tile.npy, component.npy  ID lookup or heuristic only touches its pages
+    sorted_ids.npy, sorted_index.npy   ID -> node index (binary search)
+    tile_<k>.npz           one tile: its nodes' edges, including the cut
+                           edges leaving the tile, with weights and shape
+    overlay.npz            boundary graph: boundary nodes (nodes with a cut
+                           edge), each tile's boundary-to-boundary shortest
+                           costs inside the tile, and the cut edges
+
+TiledNavigator loads tiles lazily (least recently used ones dropped):
+    - short routes: A* whose frontier loads tiles as it reaches them
+    - long routes:  search from the start to its tile's boundary, A* over
+      the overlay, search from the goal's tile boundary, then unpack only
+      the overlay edges on the result (one in-tile search each)
+Both are exact. Memory grows with the tiles a query touches, plus the
+overlay (boundary nodes only). Edge closures are not supported
+
+Usage (from backend/):
+    python -m maps.graph_tiles <graph.json | graph.gbin> [tile_px]
+"""
+
+import heapq
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    from maps.Maps_campus import CampusNavigator, load_graph, METERS_PER_PIXEL
+except ImportError:  # Run as a script from inside maps/
+    from Maps_campus import CampusNavigator, load_graph, METERS_PER_PIXEL
+
+# ================= CONFIGURATION =================
+# Tile side in map pixels
+TILE_PX = 512
+
+# Tiles kept loaded per navigator
+MAX_RESIDENT_TILES = 64
+
+# Routes whose end tiles are at least this many tiles apart use the overlay
+OVERLAY_MIN_TILES = 2
+
+# Bump when the tile layout changes
+TILES_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+OVERLAY_FILE = "overlay.npz"
+
+
+def tiles_dir_for(graph_file):
+    return os.path.splitext(graph_file)[0] + ".tiles"
+
+
+def _tile_file(k):
+    return f"tile_{k}.npz"
+
+
+def _restricted_dijkstra(adj, source, inside):
+    """Costs from source to nodes reachable without leaving the `inside` set"""
+    dist = {source: 0.0}
+    pq = [(0.0, source)]
+    done = set()
+    while pq:
+        d, node = heapq.heappop(pq)
+        if node in done:
+            continue
+        done.add(node)
+        for nbr, w in adj[node]:
+            if nbr in inside and d + w < dist.get(nbr, math.inf):
+                dist[nbr] = d + w
+                heapq.heappush(pq, (d + w, nbr))
+    return dist
+
+
+def build_tiles(graph_file, out_dir=None, tile_px=TILE_PX):
+    """Partition graph_file into tiles + overlay under out_dir (default <graph>.tiles). Returns the manifest"""
+    out_dir = out_dir or tiles_dir_for(graph_file)
+    compiled, sha1 = load_graph(graph_file)
+    xy = compiled["xy"]
+    n = len(xy)
+    indptr, dst = compiled["indptr"], compiled["dst"]
+    src = np.repeat(np.arange(n), np.diff(indptr))
+
+    # Grid over the graph's extent
+    origin = xy.min(axis=0) if n else np.zeros(2)
+    cells = np.floor((xy - origin) / tile_px).astype(np.int64)
+    cols = int(cells[:, 0].max()) + 1 if n else 1
+    rows = int(cells[:, 1].max()) + 1 if n else 1
+    tile = (cells[:, 1] * cols + cells[:, 0]).astype(np.int32)
+
+    cut = tile[src] != tile[dst]
+    boundary = np.zeros(n, dtype=bool)
+    boundary[src[cut]] = True
+
+    # Interior shape points per directed edge, oriented src -> dst
+    geom_indptr, geom_xy, edge_id = compiled["geom_indptr"], compiled["geom_xy"], compiled["edge_id"]
+    reverse = src > dst
+
+    os.makedirs(out_dir, exist_ok=True)
+    ids = compiled["ids"]
+    order = np.argsort(ids, kind="stable")
+    for name, array in (
+        ("ids", ids), ("xy", xy), ("tile", tile), ("component", compiled["component"].astype(np.int32)),
+        ("sorted_ids", ids[order]), ("sorted_index", order.astype(np.int64)),
+    ):
+        np.save(os.path.join(out_dir, f"{name}.npy"), array)
+
+    weight = compiled["weight"]
+    overlay_src, overlay_dst, overlay_w = [], [], []
+    manifest_tiles = {}
+    by_tile = np.argsort(tile, kind="stable")
+    bounds = np.searchsorted(tile[by_tile], np.arange(rows * cols + 1))
+    start = time.perf_counter()
+    for k in range(rows * cols):
+        nodes = np.sort(by_tile[bounds[k]:bounds[k + 1]])
+        if not len(nodes):
+            continue
+        slots = np.concatenate([np.arange(indptr[u], indptr[u + 1]) for u in nodes])
+        local_indptr = np.concatenate(([0], np.cumsum(np.diff(indptr)[nodes])))
+
+        pieces, counts = [], []
+        for s in slots.tolist():
+            e = edge_id[s]
+            pts = geom_xy[geom_indptr[e]:geom_indptr[e + 1]]
+            pieces.append(pts[::-1] if reverse[s] else pts)
+            counts.append(len(pts))
+        np.savez(
+            os.path.join(out_dir, _tile_file(k)),
+            nodes=nodes,
+            indptr=local_indptr,
+            dst=dst[slots],
+            weight=weight[slots],
+            length=compiled["length"][slots],
+            bearing=compiled["bearing"][slots],
+            end_bearing=compiled["end_bearing"][slots],
+            geom_indptr=np.concatenate(([0], np.cumsum(counts))).astype(np.int64),
+            geom_xy=np.vstack(pieces) if pieces else np.empty((0, 2)),
+        )
+
+        # Boundary-to-boundary costs inside the tile (overlay clique)
+        inside = set(nodes.tolist())
+        adj = {u: list(zip(dst[indptr[u]:indptr[u + 1]].tolist(), weight[indptr[u]:indptr[u + 1]].tolist()))
+               for u in inside}
+        tile_boundary = nodes[boundary[nodes]].tolist()
+        for b in tile_boundary:
+            dist = _restricted_dijkstra(adj, b, inside)
+            for other in tile_boundary:
+                if other != b and other in dist:
+                    overlay_src.append(b)
+                    overlay_dst.append(other)
+                    overlay_w.append(dist[other])
+        manifest_tiles[str(k)] = {"nodes": len(nodes), "boundary": len(tile_boundary)}
+
+    # Cut edges join the cliques into one overlay graph
+    overlay_src = np.concatenate((np.array(overlay_src, dtype=np.int64), src[cut]))
+    overlay_dst = np.concatenate((np.array(overlay_dst, dtype=np.int64), dst[cut]))
+    overlay_w = np.concatenate((np.array(overlay_w, dtype=np.float64), weight[cut]))
+    o = np.argsort(overlay_src, kind="stable")
+    overlay_nodes = np.flatnonzero(boundary)
+    np.savez(
+        os.path.join(out_dir, OVERLAY_FILE),
+        nodes=overlay_nodes,
+        indptr=np.searchsorted(overlay_src[o], np.append(overlay_nodes, n)),
+        dst=overlay_dst[o],
+        weight=overlay_w[o],
+    )
+
+    manifest = {
+        "version": TILES_VERSION,
+        "source": os.path.basename(graph_file),
+        "source_sha1": sha1,
+        "tile_px": tile_px,
+        "origin": origin.tolist(),
+        "grid": [cols, rows],
+        "nodes": n,
+        "edges": int(len(dst)),
+        "overlay": {"nodes": int(len(overlay_nodes)), "edges": int(len(overlay_dst))},
+        "tiles": manifest_tiles,
+    }
+    with open(os.path.join(out_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"🧩 {len(manifest_tiles)} tiles, {len(overlay_nodes)} boundary nodes in {time.perf_counter() - start:.1f}s")
+    return manifest
+
+
+# Rough resident cost of a loaded tile / overlay, per directed edge
+BYTES_PER_TILE_EDGE = 350
+BYTES_PER_OVERLAY_EDGE = 150
+
+
+class _NodeView:
+    """nav.nodes for a tiled graph: ID -> [x, y] through the memory-mapped tables"""
+
+    def __init__(self, nav):
+        self._nav = nav
+
+    def __contains__(self, node_id):
+        return self._nav._index(node_id) is not None
+
+    def __getitem__(self, node_id):
+        i = self._nav._index(node_id)
+        if i is None:
+            raise KeyError(node_id)
+        return self._nav._xy[i].tolist()
+
+    def __len__(self):
+        return self._nav.num_nodes
+
+
+class _Tile:
+    """One loaded tile: adjacency of its nodes (global node indices) and per-edge geometry"""
+
+    def __init__(self, path):
+        with np.load(path) as data:
+            nodes = data["nodes"].tolist()
+            indptr = data["indptr"].tolist()
+            dst = data["dst"].tolist()
+            weight = data["weight"].tolist()
+            self.length = data["length"].tolist()
+            self.bearing = data["bearing"].tolist()
+            self.end_bearing = data["end_bearing"].tolist()
+            self.geom_indptr = data["geom_indptr"]
+            self.geom_xy = data["geom_xy"]
+        pairs = list(zip(dst, weight))
+        self.adj = {u: pairs[a:b] for u, a, b in zip(nodes, indptr, indptr[1:])}
+        self.slot = {
+            (u, dst[k]): k for u, a, b in zip(nodes, indptr, indptr[1:]) for k in range(a, b)
+        }
+        self.nbytes = BYTES_PER_TILE_EDGE * len(dst) + self.geom_xy.nbytes
+
+
+class TiledNavigator:
+    """
+    Routing on a build_tiles() directory with tiles loaded on demand
+    Offers the CampusNavigator calls /navigate needs: nodes (lookup only),
+    get_path, get_maneuvers, format_instructions, expand_geometry
+    """
+
+    get_maneuvers = CampusNavigator.get_maneuvers
+    format_instructions = CampusNavigator.format_instructions
+    get_readable_instructions = CampusNavigator.get_readable_instructions
+    path_length = CampusNavigator.path_length
+
+    def __init__(self, tiles_dir, meters_per_pixel=METERS_PER_PIXEL, max_tiles=MAX_RESIDENT_TILES):
+        self.tiles_dir = tiles_dir
+        self.meters_per_pixel = meters_per_pixel
+        self.max_tiles = max_tiles
+        with open(os.path.join(tiles_dir, MANIFEST_FILE), "r") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != TILES_VERSION:
+            raise ValueError(f"Tiles in {tiles_dir} are version {self.manifest.get('version')}, rebuild with graph_tiles.py")
+
+        def table(name):
+            return np.load(os.path.join(tiles_dir, f"{name}.npy"), mmap_mode="r")
+
+        self._ids = table("ids")
+        self._xy = table("xy")
+        self._tile_of = table("tile")
+        self._component = table("component")
+        self._sorted_ids = table("sorted_ids")
+        self._sorted_index = table("sorted_index")
+        self.num_nodes = self.manifest["nodes"]
+        self._cols = self.manifest["grid"][0]
+        self.nodes = _NodeView(self)
+
+        # Tiled graphs are read-only: no closures, so the version never moves
+        self.version = 0
+        self.edge_overrides = {}
+
+        with np.load(os.path.join(tiles_dir, OVERLAY_FILE)) as data:
+            overlay_nodes = data["nodes"].tolist()
+            indptr = data["indptr"].tolist()
+            pairs = list(zip(data["dst"].tolist(), data["weight"].tolist()))
+        self._overlay = {u: pairs[a:b] for u, a, b in zip(overlay_nodes, indptr, indptr[1:])}
+        self._overlay_bytes = BYTES_PER_OVERLAY_EDGE * len(pairs)
+
+        self._tiles = OrderedDict()  # tile number -> _Tile, least recently used first
+        self._lock = threading.Lock()
+        self.tile_loads = 0
+        self.tile_hits = 0
+        self.tile_evictions = 0
+
+    # --- LOOKUPS ---
+    def _index(self, node_id):
+        """Node index for an ID (binary search on the memory-mapped sorted IDs), or None"""
+        key = str(node_id)
+        i = int(np.searchsorted(self._sorted_ids, key))
+        if i < len(self._sorted_ids) and self._sorted_ids[i] == key:
+            return int(self._sorted_index[i])
+        return None
+
+    def _tile(self, k):
+        with self._lock:
+            tile = self._tiles.get(k)
+            if tile is not None:
+                self._tiles.move_to_end(k)
+                self.tile_hits += 1
+                return tile
+        tile = _Tile(os.path.join(self.tiles_dir, _tile_file(k)))
+        with self._lock:
+            self.tile_loads += 1
+            self._tiles[k] = tile
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+                self.tile_evictions += 1
+        return tile
+
+    def _tile_for(self, i):
+        return self._tile(int(self._tile_of[i]))
+
+    def _heuristic(self, goal):
+        gx, gy = self._xy[goal].tolist()
+        xy = self._xy
+
+        def h(node):
+            x, y = xy[node].tolist()
+            return math.hypot(gx - x, gy - y)
+        return h
+
+    # --- SEARCH ---
+    def _astar(self, start, goal, stats):
+        """A* over the full graph, loading tiles as the frontier reaches them"""
+        h = self._heuristic(goal)
+        pq = [(h(start), start)]
+        g = {start: 0.0}
+        came_from = {}
+        closed = set()
+        while pq:
+            _, current = heapq.heappop(pq)
+            if current in closed:
+                continue
+            closed.add(current)
+            stats["expanded"] += 1
+            if current == goal:
+                return self._walk_back(came_from, current)
+            for nbr, w in self._tile_for(current).adj[current]:
+                if nbr in closed:
+                    continue
+                cost = g[current] + w
+                if cost < g.get(nbr, math.inf):
+                    g[nbr] = cost
+                    came_from[nbr] = current
+                    heapq.heappush(pq, (cost + h(nbr), nbr))
+        return None
+
+    @staticmethod
+    def _walk_back(came_from, node):
+        path = [node]
+        while node in came_from:
+            node = came_from[node]
+            path.append(node)
+        return path[::-1]
+
+    def _tile_search(self, source, target=None):
+        """Dijkstra from source without leaving its tile; (dist, parent), stopping at target if given"""
+        tile = self._tile_for(source)
+        dist = {source: 0.0}
+        parent = {}
+        pq = [(0.0, source)]
+        done = set()
+        while pq:
+            d, node = heapq.heappop(pq)
+            if node in done:
+                continue
+            done.add(node)
+            if node == target:
+                break
+            for nbr, w in tile.adj[node]:
+                if nbr in tile.adj and d + w < dist.get(nbr, math.inf):
+                    dist[nbr] = d + w
+                    parent[nbr] = node
+                    heapq.heappush(pq, (d + w, nbr))
+        return dist, parent
+
+    def _overlay_route(self, start, goal, stats):
+        """Start tile -> overlay A* -> goal tile, then unpack the overlay edges used"""
+        dist_s, parent_s = self._tile_search(start)
+        dist_t, parent_t = self._tile_search(goal)  # undirected: costs from goal = costs to goal
+        h = self._heuristic(goal)
+
+        best, via = dist_s.get(goal, math.inf), None
+        g = {b: d for b, d in dist_s.items() if b in self._overlay}
+        pq = [(d + h(b), b) for b, d in g.items()]
+        heapq.heapify(pq)
+        came_from = {}
+        closed = set()
+        while pq:
+            f, current = heapq.heappop(pq)
+            if f >= best:
+                break
+            if current in closed:
+                continue
+            closed.add(current)
+            stats["expanded"] += 1
+            if current in dist_t and g[current] + dist_t[current] < best:
+                best, via = g[current] + dist_t[current], current
+            for nbr, w in self._overlay.get(current, ()):
+                cost = g[current] + w
+                if nbr not in closed and cost < g.get(nbr, math.inf):
+                    g[nbr] = cost
+                    came_from[nbr] = current
+                    heapq.heappush(pq, (cost + h(nbr), nbr))
+
+        if best == math.inf:
+            return None
+        if via is None:
+            return self._walk_back(parent_s, goal)
+
+        # start -> first boundary node, overlay edges, last boundary node -> goal
+        overlay_path = self._walk_back(came_from, via)
+        path = self._walk_back(parent_s, overlay_path[0])
+        for a, b in zip(overlay_path, overlay_path[1:]):
+            if self._tile_of[a] == self._tile_of[b]:
+                _, parent = self._tile_search(a, target=b)
+                path.extend(self._walk_back(parent, b)[1:])
+            else:
+                path.append(b)
+        node = via
+        while node != goal:
+            node = parent_t[node]
+            path.append(node)
+        stats["overlay_edges"] = len(overlay_path) - 1
+        return path
+
+    def get_path(self, start_id, goal_id, mode="astar", stats=None):
+        """
+        Same contract as CampusNavigator.get_path; mode is accepted for
+        compatibility, the search is picked by distance (stats["search"])
+        """
+        if stats is None:
+            stats = {}
+        stats.update(mode=mode, expanded=0)
+        start, goal = self._index(start_id), self._index(goal_id)
+        if start is None or goal is None:
+            return None, "Invalid Start or Goal Node ID"
+        if self._component[start] != self._component[goal]:
+            return None, "No path found (Start and Goal are not connected)"
+
+        ks, kg = int(self._tile_of[start]), int(self._tile_of[goal])
+        apart = max(abs(ks % self._cols - kg % self._cols), abs(ks // self._cols - kg // self._cols))
+        loads = self.tile_loads
+        if apart >= OVERLAY_MIN_TILES:
+            stats["search"] = "overlay"
+            path = self._overlay_route(start, goal, stats)
+        else:
+            stats["search"] = "tiles"
+            path = self._astar(start, goal, stats)
+        stats["tiles_loaded"] = self.tile_loads - loads
+        if path is None:
+            return None, "No path found (Graph might be disconnected)"
+        return [str(self._ids[i]) for i in path], "Success"
+
+    # --- GEOMETRY ---
+    def _edge(self, u, v):
+        """(tile, slot) of directed edge u -> v given node IDs, or (None, None)"""
+        i, j = self._index(u), self._index(v)
+        tile = self._tile_for(i)
+        return tile, tile.slot.get((i, j))
+
+    def edge_points(self, u, v):
+        tile, k = self._edge(u, v)
+        if k is None:
+            return [self.nodes[u], self.nodes[v]]
+        interior = tile.geom_xy[tile.geom_indptr[k]:tile.geom_indptr[k + 1]]
+        return [self.nodes[u]] + interior.tolist() + [self.nodes[v]]
+
+    def edge_length(self, u, v):
+        tile, k = self._edge(u, v)
+        if k is None:
+            (x1, y1), (x2, y2) = self.nodes[u], self.nodes[v]
+            return math.hypot(x2 - x1, y2 - y1)
+        return tile.length[k]
+
+    def expand_geometry(self, path):
+        if not path:
+            return []
+        points = [self.nodes[path[0]]]
+        for u, v in zip(path, path[1:]):
+            points.extend(self.edge_points(u, v)[1:])
+        return points
+
+    def _path_geometry(self, path):
+        """Segment lengths and bearings for get_maneuvers, from the tiles' edge tables"""
+        lengths = np.empty(len(path) - 1)
+        bearings = np.empty(len(path) - 1)
+        end_bearings = np.empty(len(path) - 1)
+        for i, (u, v) in enumerate(zip(path, path[1:])):
+            tile, k = self._edge(u, v)
+            if k is not None:
+                lengths[i] = tile.length[k]
+                bearings[i] = tile.bearing[k]
+                end_bearings[i] = tile.end_bearing[k]
+            else:
+                (x1, y1), (x2, y2) = self.nodes[u], self.nodes[v]
+                lengths[i] = math.hypot(x2 - x1, y2 - y1)
+                bearings[i] = end_bearings[i] = math.degrees(math.atan2(y2 - y1, x2 - x1))
+        return lengths, bearings, end_bearings
+
+    def estimate_bytes(self):
+        with self._lock:
+            return self._overlay_bytes + sum(tile.nbytes for tile in self._tiles.values())
+
+    def stats(self):
+        with self._lock:
+            return {
+                "tiles": len(self.manifest["tiles"]),
+                "resident_tiles": len(self._tiles),
+                "overlay_nodes": len(self._overlay),
+                "tile_loads": self.tile_loads,
+                "tile_hits": self.tile_hits,
+                "tile_evictions": self.tile_evictions,
+            }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    graph_file = sys.argv[1]
+    tile_px = int(sys.argv[2]) if len(sys.argv) > 2 else TILE_PX
+    print(f"📦 Tiling {graph_file} ({tile_px}px tiles) ...")
+    manifest = build_tiles(graph_file, tile_px=tile_px)
+    print(f"✅ {manifest['nodes']} nodes -> {tiles_dir_for(graph_file)}")
@@ -0,0 +1,145 @@
+"""
+isochrone.py
+---------------------------------
+"Everything reachable within N minutes" from one node
+A single Dijkstra bounded by the cost cutoff gives the reachable
+nodes; edges leaving that set are cut where the budget runs out
+
+Results are cached per (node, cutoff, graph version). The search
+tree with the largest cutoff seen per (node, graph version) is kept
+too, so moving a time slider down is a filter, not a new search
+"""
+
+import threading
+from collections import OrderedDict
+
+# Defaults for the server-wide cache
+MAX_RESULTS = 128
+MAX_TREES = 16
+
+
+def _point_along(points, fraction):
+    """Point at fraction (0-1) of a polyline's length"""
+    lengths = [((b[0] - a[0]) ** 2 + (b[1] - a[1]) ** 2) ** 0.5 for a, b in zip(points, points[1:])]
+    remaining = fraction * sum(lengths)
+    for (a, b), seg in zip(zip(points, points[1:]), lengths):
+        if remaining <= seg and seg > 0:
+            t = remaining / seg
+            return [a[0] + t * (b[0] - a[0]), a[1] + t * (b[1] - a[1])]
+        remaining -= seg
+    return list(points[-1])
+
+
+def convex_hull(points):
+    """Convex hull of 2D points (Andrew's monotone chain) as a list of [x, y], first point not repeated"""
+    pts = sorted(set((float(x), float(y)) for x, y in points))
+    if len(pts) < 3:
+        return [list(p) for p in pts]
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower, upper = [], []
+    for p in pts:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    for p in reversed(pts):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return [list(p) for p in lower[:-1] + upper[:-1]]
+
+
+class IsochroneCache:
+    def __init__(self, nav, max_results=MAX_RESULTS, max_trees=MAX_TREES):
+        self.nav = nav
+        self.max_results = max_results
+        self.max_trees = max_trees
+
+        self._results = OrderedDict()  # (start, cutoff, version, hull) -> result
+        self._trees = OrderedDict()    # (start, version) -> (cutoff, dist)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.searches = 0
+
+    def _reachable(self, start, cutoff):
+        """Settled distances within cutoff, reusing a wider cached search if there is one"""
+        key = (start, self.nav.version)
+        with self._lock:
+            tree = self._trees.get(key)
+            if tree is not None:
+                self._trees.move_to_end(key)
+        if tree is not None and tree[0] >= cutoff:
+            if tree[0] == cutoff:
+                return tree[1]
+            return {n: d for n, d in tree[1].items() if d <= cutoff}
+
+        dist, _ = self.nav._dijkstra({start: 0}, cutoff=cutoff)
+        with self._lock:
+            self.searches += 1
+            for old in [k for k in self._trees if k[0] == start and k != key]:
+                del self._trees[old]
+            self._trees[key] = (cutoff, dist)
+            self._trees.move_to_end(key)
+            while len(self._trees) > self.max_trees:
+                self._trees.popitem(last=False)
+        return dist
+
+    def get(self, start, cutoff, hull=False):
+        """
+        Reachable set from start within cutoff (pixel cost units)
+        Returns (result, hit); result has:
+            nodes   - {node: cost}
+            edges   - [(u, v)] edges walkable end to end
+            partial - [(u, v, fraction, [x, y])] edges entered from u and left
+                      unfinished after fraction of their length
+            hull    - convex hull of everything reached, or None
+        """
+        key = (start, round(cutoff, 2), self.nav.version, hull)
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return result, True
+            self.misses += 1
+
+        dist = self._reachable(start, cutoff)
+
+        edges, partial = [], []
+        for u, d_u in dist.items():
+            for v, w in self.nav.adj[u]:
+                d_v = dist.get(v)
+                if d_v is not None and (cutoff - d_u) + (cutoff - d_v) >= w:
+                    if u < v:
+                        edges.append((u, v))
+                    continue
+                # Budget left at u runs out part way along the edge
+                fraction = (cutoff - d_u) / w if w > 0 else 1.0
+                if fraction > 0:
+                    end = _point_along(self.nav.edge_points(u, v), fraction)
+                    partial.append((u, v, fraction, end))
+
+        outline = None
+        if hull:
+            outline = convex_hull([self.nav.nodes[n] for n in dist] + [p[3] for p in partial])
+
+        result = {"nodes": dist, "edges": edges, "partial": partial, "hull": outline}
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        return result, False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "results": len(self._results),
+                "trees": len(self._trees),
+                "hits": self.hits,
+                "misses": self.misses,
+                "searches": self.searches,
+            }
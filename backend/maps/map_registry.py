@@ -0,0 +1,252 @@
+"""
+map_registry.py
+---------------------------------
+Named maps (campuses / sites) served from one deployment
+Maps are listed in maps.json next to this file:
+    {"default": "campus",
+     "maps": {"campus": {"name": "GIKI Campus",
+                         "graph": "campus_graph.json",
+                         "image": "giki_map_fixed.png",
+                         "meters_per_pixel": 0.5,
+                         "locations": {"Library": "N64", ...},
+                         "categories": {"library": ["Library"], ...}}}}
+    (paths are relative to maps.json; without the file the only map is
+    "campus", built from the Maps_campus.py constants)
+A map with "tiles" (a graph_tiles.py directory) instead of "graph" is
+routed with tiles loaded on demand; only /navigate serves it
+
+A map's navigator and everything derived from it (spatial index,
+reroute / isochrone caches, route tracker, renderer, distance fields)
+is built on its first request. Least recently used maps are dropped
+once the resident maps' estimated size exceeds the memory budget;
+their edge closures are kept and re-applied when they come back,
+active tracked routes are not
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+try:
+    from maps.Maps_campus import (
+        CampusNavigator, LOCATIONS, LOCATION_CATEGORIES, METERS_PER_PIXEL, WALKING_SPEED_MPS, IMG_PATH
+    )
+    from maps.spatial_index import GraphSpatialIndex
+    from maps.route_cache import RerouteCache
+    from maps.route_renderer import RouteRenderer
+    from maps.isochrone import IsochroneCache
+    from maps.route_tracker import RouteTracker
+    from maps.distance_field import DistanceFieldRouter
+    from maps.graph_tiles import TiledNavigator
+except ImportError:  # Run as a script from inside maps/
+    from Maps_campus import (
+        CampusNavigator, LOCATIONS, LOCATION_CATEGORIES, METERS_PER_PIXEL, WALKING_SPEED_MPS, IMG_PATH
+    )
+    from spatial_index import GraphSpatialIndex
+    from route_cache import RerouteCache
+    from route_renderer import RouteRenderer
+    from isochrone import IsochroneCache
+    from route_tracker import RouteTracker
+    from distance_field import DistanceFieldRouter
+    from graph_tiles import TiledNavigator
+
+MAPS_DIR = Path(__file__).resolve().parent
+
+# ================= CONFIGURATION =================
+MAPS_FILE = MAPS_DIR / "maps.json"
+DEFAULT_MAP = "campus"
+
+# Estimated resident size of all loaded maps before the least recently
+# used ones are dropped (override with MAPMATE_MAX_MAP_BYTES)
+MAX_MAP_BYTES = int(os.environ.get("MAPMATE_MAX_MAP_BYTES", 512 * 1024 * 1024))
+
+# Distance fields are stored per map under this directory
+FIELD_DIR = MAPS_DIR / "fields"
+
+# Rough Python-object cost of the navigator + spatial index, per node and
+# per directed edge (measured with tracemalloc on OSM-sized graphs)
+BYTES_PER_NODE = 800
+BYTES_PER_EDGE = 450
+
+
+def load_map_configs(maps_file=MAPS_FILE):
+    """(configs {map_id: config}, default map_id) from maps.json, or the built-in campus map"""
+    maps_file = Path(maps_file)
+    if not maps_file.exists():
+        return {
+            DEFAULT_MAP: {
+                "name": "GIKI Campus",
+                "graph": str(MAPS_DIR / "campus_graph.json"),
+                "tiles": None,
+                "image": IMG_PATH,
+                "meters_per_pixel": METERS_PER_PIXEL,
+                "locations": dict(LOCATIONS),
+                "categories": {k: list(v) for k, v in LOCATION_CATEGORIES.items()},
+            }
+        }, DEFAULT_MAP
+
+    with open(maps_file, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    configs = {}
+    for map_id, entry in data.get("maps", {}).items():
+        configs[map_id] = {
+            "name": entry.get("name", map_id),
+            "graph": str(maps_file.parent / entry["graph"]) if entry.get("graph") else None,
+            "tiles": str(maps_file.parent / entry["tiles"]) if entry.get("tiles") else None,
+            "image": str(maps_file.parent / entry["image"]) if entry.get("image") else None,
+            "meters_per_pixel": float(entry.get("meters_per_pixel", METERS_PER_PIXEL)),
+            "locations": dict(entry.get("locations", {})),
+            "categories": {k: list(v) for k, v in entry.get("categories", {}).items()},
+        }
+    default = data.get("default", next(iter(configs), None))
+    if default not in configs:
+        raise ValueError(f"Default map '{default}' is not defined in {maps_file}")
+    return configs, default
+
+
+class CampusMap:
+    """One loaded map: its navigator and the per-graph structures built on it"""
+
+    def __init__(self, map_id, config):
+        self.id = map_id
+        self.name = config["name"]
+        self.locations = config["locations"]
+        self.categories = config["categories"]
+        self.meters_per_pixel = config["meters_per_pixel"]
+        self.image_path = config["image"]
+        self.tiled = config["tiles"] is not None
+        self._renderer = None
+        self._renderer_lock = threading.Lock()
+
+        if self.tiled:
+            self.nav = TiledNavigator(config["tiles"], meters_per_pixel=self.meters_per_pixel)
+            self.spatial_index = self.reroute_cache = self.isochrone_cache = None
+            self.route_tracker = self.field_router = None
+            return
+
+        self.nav = CampusNavigator(config["graph"], meters_per_pixel=self.meters_per_pixel)
+        self.spatial_index = GraphSpatialIndex(self.nav)
+        self.reroute_cache = RerouteCache(self.nav)
+        self.isochrone_cache = IsochroneCache(self.nav)
+        self.route_tracker = RouteTracker(self.nav, self.meters_per_pixel, WALKING_SPEED_MPS)
+        self.field_router = DistanceFieldRouter(self.image_path, str(FIELD_DIR / map_id))
+
+    @property
+    def renderer(self):
+        """Route renderer, decoded on the first image request (the base map is the largest table)"""
+        if self._renderer is None:
+            with self._renderer_lock:
+                if self._renderer is None:
+                    self._renderer = RouteRenderer(self.nav, self.image_path)
+        return self._renderer
+
+    @property
+    def renderer_ready(self):
+        """Whether the base map has been decoded (renderer access will not block)"""
+        return self._renderer is not None
+
+    def resolve(self, name):
+        """Node ID for a building name from this map's locations, or name itself"""
+        return self.locations.get(name, name)
+
+    def estimate_bytes(self):
+        if self.tiled:
+            return self.nav.estimate_bytes()
+        size = BYTES_PER_NODE * len(self.nav.nodes) + BYTES_PER_EDGE * len(self.nav._dst)
+        size += self.reroute_cache.stats()["bytes"]
+        if self._renderer is not None:
+            size += self._renderer._map.nbytes * 2
+        if self.field_router._cost is not None:
+            size += self.field_router._cost.nbytes
+        return size
+
+
+class MapRegistry:
+    def __init__(self, maps_file=MAPS_FILE, max_bytes=MAX_MAP_BYTES):
+        self.configs, self.default = load_map_configs(maps_file)
+        self.max_bytes = max_bytes
+
+        self._maps = OrderedDict()  # map_id -> CampusMap, least recently used first
+        self._lock = threading.Lock()
+        self._loading = {}          # map_id -> Lock, so a map is only loaded once at a time
+        self._overrides = {}        # map_id -> edge overrides of an evicted map
+
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+
+    def __contains__(self, map_id):
+        return (map_id or self.default) in self.configs
+
+    def loaded(self, map_id=None):
+        """The map if it is resident (counted as a hit), else None; never loads"""
+        map_id = map_id or self.default
+        with self._lock:
+            campus = self._maps.get(map_id)
+            if campus is not None:
+                self._maps.move_to_end(map_id)
+                self.hits += 1
+            return campus
+
+    def get(self, map_id=None):
+        """Loaded map for map_id (default map if None), loading it if needed; None if unknown"""
+        map_id = map_id or self.default
+        if map_id not in self.configs:
+            return None
+        campus = self.loaded(map_id)
+        if campus is not None:
+            return campus
+
+        with self._lock:
+            loading = self._loading.setdefault(map_id, threading.Lock())
+        with loading:
+            # Another request may have loaded it while we waited
+            campus = self.loaded(map_id)
+            if campus is not None:
+                return campus
+
+            start = time.perf_counter()
+            campus = CampusMap(map_id, self.configs[map_id])
+            for (u, v), state in self._overrides.pop(map_id, {}).items():
+                changes, _ = campus.nav.set_edge_state(u, v, **state)
+                if changes:
+                    campus.reroute_cache.apply_edge_changes(changes)
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self.loads += 1
+                self.load_seconds += elapsed
+                self._maps[map_id] = campus
+                self._evict()
+        print(f"🗺️ Loaded map '{map_id}' ({len(campus.nav.nodes)} nodes) in {elapsed * 1000:.0f} ms")
+        return campus
+
+    def _evict(self):
+        """Drop least recently used maps over the budget, never the most recent one (lock held)"""
+        sizes = {map_id: campus.estimate_bytes() for map_id, campus in self._maps.items()}
+        total = sum(sizes.values())
+        while total > self.max_bytes and len(self._maps) > 1:
+            map_id, campus = self._maps.popitem(last=False)
+            total -= sizes[map_id]
+            if campus.nav.edge_overrides:
+                self._overrides[map_id] = dict(campus.nav.edge_overrides)
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            resident = {map_id: campus.estimate_bytes() for map_id, campus in self._maps.items()}
+            return {
+                "maps": len(self.configs),
+                "default": self.default,
+                "resident": list(resident),
+                "resident_bytes": sum(resident.values()),
+                "max_bytes": self.max_bytes,
+                "loads": self.loads,
+                "hits": self.hits,
+                "evictions": self.evictions,
+                "load_ms_total": round(self.load_seconds * 1000, 1),
+            }
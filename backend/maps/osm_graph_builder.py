@@ -0,0 +1,326 @@
+"""
+osm_graph_builder.py
+---------------------------------
+Streaming OSM XML -> routing graph (no osmnx / NetworkX)
+Writes the same nodes/edges schema as script_second.py,
+so CampusNavigator can load the result directly
+
+The .osm file is read twice with incremental parsing:
+  Pass 1 - keep walkable ways (node refs only)
+  Pass 2 - keep coordinates of the nodes those ways reference
+Only compact numpy arrays are held, never the whole document
+
+Chains of degree-2 shape nodes are then contracted into single
+edges carrying an encoded polyline "geometry" (--no-contract keeps
+every OSM node)
+
+An output path ending in .gbin writes the compact binary format
+from graph_binary.py instead of JSON (--compress to zlib it)
+
+Usage:
+    python osm_graph_builder.py [map.osm] [output.json|.gbin] [--no-contract] [--compress]
+"""
+
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from array import array
+
+import numpy as np
+
+from graph_binary import BINARY_EXT, write_graph_binary
+from graph_contraction import contract_degree2
+from polyline import encode_polyline
+
+# ================= CONFIGURATION =================
+OSM_FILE = r"C:\Users\r_haq\Downloads\map.osm"
+OUTPUT_DIR = r"C:\WOLF\Private\VS_CODE\FYP_TEST\TEST_Hybrid\maps"
+JSON_FILE = "giki_graph.json"
+
+# Same pixel space as script_second.py
+MAP_WIDTH = 2048
+
+# Pedestrian filter (mirrors osmnx's "walk" network)
+EXCLUDED_HIGHWAYS = {
+    "abandoned", "bus_guideway", "construction", "cycleway", "motor", "planned",
+    "platform", "proposed", "raceway", "motorway", "motorway_link",
+}
+PRIVATE_VALUES = {"private", "no"}
+
+# Nodes are filtered in batches of this many elements during pass 2
+NODE_BATCH = 1_000_000
+
+# Collapse degree-2 chains into polyline edges before writing
+CONTRACT_DEGREE2 = True
+
+
+# ================= FILTERS =================
+def is_walkable(tags):
+    highway = tags.get("highway")
+    if highway is None or highway in EXCLUDED_HIGHWAYS:
+        return False
+    if tags.get("area") == "yes":
+        return False
+    if tags.get("foot") == "no":
+        return False
+    if tags.get("access") in PRIVATE_VALUES and tags.get("foot") not in ("yes", "designated", "permissive"):
+        return False
+    if tags.get("service") == "private":
+        return False
+    return True
+
+
+# ================= STREAMING PASSES =================
+def _iter_elements(path):
+    """Yields finished top-level elements, clearing the tree behind us"""
+    context = ET.iterparse(path, events=("start", "end"))
+    _, root = next(context)
+    for event, elem in context:
+        if event == "end" and elem.tag in ("node", "way", "relation"):
+            yield elem
+            root.clear()
+
+
+def read_walkable_ways(path):
+    """
+    Pass 1: consecutive node-ref pairs of every walkable way
+    Returns (edge_from, edge_to) as int64 arrays and the element count
+    """
+    # Packed int64 buffers (8 bytes per ref, not a Python int each)
+    refs = array("q")       # Flat node refs of kept ways
+    way_ends = array("q")   # Offsets into refs where each kept way ends
+    count = 0
+
+    for elem in _iter_elements(path):
+        count += 1
+        if elem.tag != "way":
+            continue
+        tags = {t.get("k"): t.get("v") for t in elem.iter("tag")}
+        if not is_walkable(tags):
+            continue
+        nds = [int(nd.get("ref")) for nd in elem.iter("nd")]
+        if len(nds) >= 2:
+            refs.extend(nds)
+            way_ends.append(len(refs))
+
+    refs = np.frombuffer(refs, dtype=np.int64)
+    # A segment joins ref i to ref i+1 unless i is the last ref of its way
+    is_last = np.zeros(len(refs), dtype=bool)
+    is_last[np.frombuffer(way_ends, dtype=np.int64) - 1] = True
+    starts = np.flatnonzero(~is_last[:-1]) if len(refs) else np.empty(0, dtype=np.int64)
+    return refs[starts], refs[starts + 1], count
+
+
+def read_referenced_nodes(path, wanted):
+    """
+    Pass 2: id/lat/lon of nodes whose id is in the sorted array wanted
+    Stops at the first way, since OSM files list all nodes first
+    """
+    if len(wanted) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0), 0
+
+    ids, lats, lons = [], [], []
+    kept = []
+    count = 0
+
+    def flush():
+        if not ids:
+            return
+        batch = np.array(ids, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(wanted, batch), len(wanted) - 1)
+        mask = wanted[pos] == batch
+        kept.append((batch[mask], np.array(lats)[mask], np.array(lons)[mask]))
+        ids.clear(); lats.clear(); lons.clear()
+
+    for elem in _iter_elements(path):
+        count += 1
+        if elem.tag != "node":
+            break
+        ids.append(int(elem.get("id")))
+        lats.append(float(elem.get("lat")))
+        lons.append(float(elem.get("lon")))
+        if len(ids) >= NODE_BATCH:
+            flush()
+    flush()
+
+    if not kept:
+        return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0), count
+    return (
+        np.concatenate([k[0] for k in kept]),
+        np.concatenate([k[1] for k in kept]),
+        np.concatenate([k[2] for k in kept]),
+        count,
+    )
+
+
+# ================= PROJECTION =================
+def project_utm(lat, lon):
+    """
+    Vectorized WGS84 -> UTM (meters), zone picked from the mean longitude
+    Same projection family osmnx.project_graph uses for local extracts
+    """
+    a = 6378137.0
+    f = 1 / 298.257223563
+    k0 = 0.9996
+    e2 = f * (2 - f)
+    ep2 = e2 / (1 - e2)
+
+    zone = int((np.mean(lon) + 180) // 6) + 1
+    lon0 = np.radians((zone - 1) * 6 - 180 + 3)
+
+    phi = np.radians(lat)
+    sin_phi, cos_phi, tan_phi = np.sin(phi), np.cos(phi), np.tan(phi)
+    N = a / np.sqrt(1 - e2 * sin_phi ** 2)
+    T = tan_phi ** 2
+    C = ep2 * cos_phi ** 2
+    A = cos_phi * (np.radians(lon) - lon0)
+
+    M = a * (
+        (1 - e2 / 4 - 3 * e2 ** 2 / 64 - 5 * e2 ** 3 / 256) * phi
+        - (3 * e2 / 8 + 3 * e2 ** 2 / 32 + 45 * e2 ** 3 / 1024) * np.sin(2 * phi)
+        + (15 * e2 ** 2 / 256 + 45 * e2 ** 3 / 1024) * np.sin(4 * phi)
+        - (35 * e2 ** 3 / 3072) * np.sin(6 * phi)
+    )
+
+    x = k0 * N * (A + (1 - T + C) * A ** 3 / 6 + (5 - 18 * T + T ** 2 + 72 * C - 58 * ep2) * A ** 5 / 120) + 500000.0
+    y = k0 * (M + N * tan_phi * (
+        A ** 2 / 2 + (5 - T + 9 * C + 4 * C ** 2) * A ** 4 / 24
+        + (61 - 58 * T + T ** 2 + 600 * C - 330 * ep2) * A ** 6 / 720
+    ))
+    y = np.where(lat < 0, y + 10000000.0, y)
+    return x, y
+
+
+def to_pixels(x, y, map_width=MAP_WIDTH):
+    """Scale projected meters into the script_second.py pixel frame (Y flipped)"""
+    min_x, max_x = x.min(), x.max()
+    min_y, max_y = y.min(), y.max()
+    scale = map_width / max(max_x - min_x, 1e-9)
+    map_height = int((max_y - min_y) * scale)
+    px = ((x - min_x) * scale).astype(np.int64)
+    py = (map_height - (y - min_y) * scale).astype(np.int64)
+    return px, py, map_height
+
+
+# ================= BUILD =================
+def build_graph(osm_file):
+    """
+    Returns dict of arrays: node ids, px/py, lat/lon, edge endpoint indices, costs
+    """
+    t0 = time.perf_counter()
+    edge_from, edge_to, n_elements = read_walkable_ways(osm_file)
+    t1 = time.perf_counter()
+    print(f"🚶 Pass 1: {len(edge_from)} walkable segments from {n_elements} elements "
+          f"({n_elements / max(t1 - t0, 1e-9):,.0f} elements/s)")
+    if len(edge_from) == 0:
+        raise ValueError("No walkable ways found in OSM file")
+
+    wanted = np.unique(np.concatenate((edge_from, edge_to)))
+    ids, lat, lon, n_nodes = read_referenced_nodes(osm_file, wanted)
+    t2 = time.perf_counter()
+    print(f"📍 Pass 2: kept {len(ids)} of {n_nodes} nodes "
+          f"({n_nodes / max(t2 - t1, 1e-9):,.0f} elements/s)")
+
+    if len(ids) == 0:
+        raise ValueError("None of the walkable ways' nodes are in the OSM file")
+
+    # Map node ids -> row index, dropping segments that leave the extract
+    order = np.argsort(ids)
+    ids, lat, lon = ids[order], lat[order], lon[order]
+    u = np.searchsorted(ids, edge_from)
+    v = np.searchsorted(ids, edge_to)
+    u_c, v_c = np.minimum(u, len(ids) - 1), np.minimum(v, len(ids) - 1)
+    inside = (ids[u_c] == edge_from) & (ids[v_c] == edge_to) & (u_c != v_c)
+    u, v = u_c[inside], v_c[inside]
+
+    x, y = project_utm(lat, lon)
+    px, py, map_height = to_pixels(x, y)
+    cost = np.round(np.hypot(px[u] - px[v], py[u] - py[v]).astype(np.float64), 2)
+
+    print(f"📏 Map Dimensions: {MAP_WIDTH}x{map_height} pixels")
+    return {
+        "ids": ids, "px": px, "py": py, "lat": lat, "lon": lon,
+        "edge_u": u, "edge_v": v, "cost": cost,
+    }
+
+
+def contract_graph(graph):
+    """
+    Degree-2 contraction of a build_graph result
+    Surviving nodes keep their ids; contracted edges get their pixel
+    shape points (endpoints included) under "geometry"
+    """
+    xy = np.column_stack((graph["px"], graph["py"]))
+    kept, u, v, cost, geometry = contract_degree2(xy, graph["edge_u"], graph["edge_v"], graph["cost"])
+
+    contracted = {k: graph[k][kept] for k in ("ids", "px", "py", "lat", "lon")}
+    contracted.update({
+        "edge_u": u, "edge_v": v, "cost": np.round(cost, 2),
+        "geometry": geometry,
+    })
+    return contracted
+
+
+def write_graph_json(graph, json_path):
+    """
+    Streams the graph out in the script_second.py schema
+    (one undirected edge per way segment; CampusNavigator treats edges as two-way)
+    Edges from contract_graph also carry their "geometry" as an encoded polyline
+    """
+    ids = graph["ids"].tolist()
+    with open(json_path, "w") as f:
+        f.write('{"nodes": [\n')
+        rows = zip(ids, graph["px"].tolist(), graph["py"].tolist(), graph["lat"].tolist(), graph["lon"].tolist())
+        for i, (nid, x, y, la, lo) in enumerate(rows):
+            sep = ",\n" if i else ""
+            f.write(sep + json.dumps({"id": nid, "x": x, "y": y, "lat": la, "lon": lo}))
+        f.write('\n], "edges": [\n')
+        geometry = graph.get("geometry") or [None] * len(graph["edge_u"])
+        rows = zip(graph["edge_u"].tolist(), graph["edge_v"].tolist(), graph["cost"].tolist(), geometry)
+        for i, (u, v, c, g) in enumerate(rows):
+            sep = ",\n" if i else ""
+            edge = {"from": ids[u], "to": ids[v], "cost": c}
+            if g is not None:
+                edge["geometry"] = encode_polyline(g.tolist())
+            f.write(sep + json.dumps(edge))
+        f.write("\n]}\n")
+
+
+def write_graph(graph, path, compress=False):
+    """JSON or binary (.gbin) depending on the file extension"""
+    if path.endswith(BINARY_EXT):
+        write_graph_binary(
+            path, graph["ids"].tolist(),
+            np.column_stack((graph["px"], graph["py"])), np.column_stack((graph["lat"], graph["lon"])),
+            graph["edge_u"], graph["edge_v"], graph["cost"],
+            [None if g is None else g[1:-1] for g in graph.get("geometry") or ()], compress=compress
+        )
+    else:
+        write_graph_json(graph, path)
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    contract = CONTRACT_DEGREE2 and "--no-contract" not in sys.argv
+    osm_file = args[0] if len(args) > 0 else OSM_FILE
+    out_path = args[1] if len(args) > 1 else os.path.join(OUTPUT_DIR, JSON_FILE)
+
+    print(f"📦 Streaming {osm_file} ...")
+    start = time.perf_counter()
+    graph = build_graph(osm_file)
+
+    if contract:
+        before_nodes, before_edges = len(graph["ids"]), len(graph["edge_u"])
+        t0 = time.perf_counter()
+        graph = contract_graph(graph)
+        print(f"🔗 Contracted degree-2 chains in {time.perf_counter() - t0:.2f}s: "
+              f"{before_nodes} -> {len(graph['ids'])} nodes, {before_edges} -> {len(graph['edge_u'])} edges")
+
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    write_graph(graph, out_path, compress="--compress" in sys.argv)
+
+    print(f"\n🎉 Done in {time.perf_counter() - start:.2f}s: "
+          f"{len(graph['ids'])} nodes, {len(graph['edge_u'])} edges")
+    print(f"📄 Graph Data: {out_path}")
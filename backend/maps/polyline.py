@@ -0,0 +1,56 @@
+"""
+polyline.py
+---------------------------------
+Encoded polyline format (Google style): each coordinate is
+scaled, delta-encoded against the previous point, zigzagged
+and written as 5-bit varint chunks of printable ASCII
+
+precision = number of decimals kept (0 for whole pixels)
+"""
+
+
+def _encode_value(value, out):
+    value = ~(value << 1) if value < 0 else value << 1
+    while value >= 0x20:
+        out.append(chr((0x20 | (value & 0x1F)) + 63))
+        value >>= 5
+    out.append(chr(value + 63))
+
+
+def encode_polyline(points, precision=0):
+    """points: iterable of (x, y) -> encoded string"""
+    factor = 10 ** precision
+    out = []
+    prev_x = prev_y = 0
+    for x, y in points:
+        ix, iy = int(round(x * factor)), int(round(y * factor))
+        _encode_value(ix - prev_x, out)
+        _encode_value(iy - prev_y, out)
+        prev_x, prev_y = ix, iy
+    return "".join(out)
+
+
+def decode_polyline(encoded, precision=0):
+    """encoded string -> list of [x, y]"""
+    factor = 10 ** precision
+    points = []
+    index = 0
+    coord = [0, 0]
+    n = len(encoded)
+
+    while index < n:
+        for axis in (0, 1):
+            shift = result = 0
+            while True:
+                b = ord(encoded[index]) - 63
+                index += 1
+                result |= (b & 0x1F) << shift
+                shift += 5
+                if b < 0x20:
+                    break
+            coord[axis] += ~(result >> 1) if result & 1 else result >> 1
+        if factor == 1:
+            points.append([coord[0], coord[1]])
+        else:
+            points.append([coord[0] / factor, coord[1] / factor])
+    return points
@@ -0,0 +1,231 @@
+"""
+route_cache.py
+---------------------------------
+Cached reverse shortest-path trees for rerouting
+One Dijkstra tree is built per active destination; after that,
+rerouting from any node is just a parent-pointer walk (no search)
+
+Trees are keyed by (destination, graph version) and evicted
+least-recently-used when either the tree count or the
+estimated memory budget is exceeded
+
+When edge weights change at runtime, cached trees are repaired
+in place (only the affected subtree is re-settled) instead of
+being thrown away and rebuilt
+"""
+
+import heapq
+import math
+import sys
+import threading
+from collections import OrderedDict
+
+# Defaults for the server-wide cache
+MAX_TREES = 64
+MAX_BYTES = 64 * 1024 * 1024
+
+
+class RerouteCache:
+    def __init__(self, nav, max_trees=MAX_TREES, max_bytes=MAX_BYTES):
+        self.nav = nav
+        self.max_trees = max_trees
+        self.max_bytes = max_bytes
+
+        self._trees = OrderedDict()  # (dest, version) -> [dist, parent, children or None, size]
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.repairs = 0
+
+    @staticmethod
+    def _estimate_bytes(dist, parent):
+        # Dict tables plus one float object per distance (keys are shared node IDs)
+        return sys.getsizeof(dist) + sys.getsizeof(parent) + 24 * len(dist)
+
+    def get_tree(self, dest):
+        """
+        Returns (dist, parent, hit) for the tree rooted at dest
+        dist[n]   - cost from n to dest
+        parent[n] - next node from n towards dest
+        The graph is undirected, so the reverse tree is a forward Dijkstra from dest
+        """
+        key = (dest, self.nav.version)
+        with self._lock:
+            entry = self._trees.get(key)
+            if entry is not None:
+                self._trees.move_to_end(key)
+                self.hits += 1
+                return entry[0], entry[1], True
+            self.misses += 1
+
+        dist, parent = self.nav._dijkstra({dest: 0})
+        size = self._estimate_bytes(dist, parent)
+
+        with self._lock:
+            # Trees for an older graph version of this destination are dead weight
+            for old in [k for k in self._trees if k[0] == dest and k != key]:
+                self._drop(old)
+
+            if key not in self._trees:
+                self._trees[key] = [dist, parent, None, size]
+                self._bytes += size
+            self._trees.move_to_end(key)
+
+            while self._trees and (len(self._trees) > self.max_trees or self._bytes > self.max_bytes):
+                oldest = next(iter(self._trees))
+                if oldest == key:
+                    break
+                self._drop(oldest)
+                self.evictions += 1
+
+        return dist, parent, False
+
+    def _drop(self, key):
+        size = self._trees.pop(key)[3]
+        self._bytes -= size
+
+    def route(self, start, dest):
+        """
+        Path from start to dest by walking the cached tree
+        Returns (path, distance_px, hit); path is None if dest is unreachable
+        """
+        dist, parent, hit = self.get_tree(dest)
+
+        # Repairs mutate trees in place, so walk under the lock
+        with self._lock:
+            if start not in dist:
+                return None, None, hit
+
+            path = [start]
+            current = start
+            while current != dest:
+                current = parent[current]
+                path.append(current)
+            return path, dist[start], hit
+
+    # --- INCREMENTAL REPAIR ---
+    def apply_edge_changes(self, changes):
+        """
+        Bring cached trees up to the navigator's current version after
+        CampusNavigator.set_edge_state; changes is the list it returned
+        Trees from the previous version are repaired in place and re-keyed,
+        anything older is dropped. Returns the number of trees repaired.
+        """
+        version = self.nav.version
+        repaired = 0
+
+        # One record per undirected edge is enough, the repair looks at both ends
+        undirected = {}
+        for u, v, old_w, new_w in changes:
+            undirected.setdefault(self.nav._edge_key(u, v), (u, v, old_w, new_w))
+
+        with self._lock:
+            for key in list(self._trees):
+                dest, tree_version = key
+                entry = self._trees.pop(key)
+                self._bytes -= entry[3]
+                if tree_version != version - 1:
+                    continue
+
+                dist, parent, children, _ = entry
+                if children is None:
+                    children = {}
+                    for node, p in parent.items():
+                        children.setdefault(p, set()).add(node)
+
+                for u, v, old_w, new_w in undirected.values():
+                    if new_w > old_w:
+                        self._repair_increase(dist, parent, children, u, v)
+                    elif new_w < old_w:
+                        self._repair_decrease(dist, parent, children, u, v, new_w)
+
+                size = self._estimate_bytes(dist, parent)
+                self._trees[(dest, version)] = [dist, parent, children, size]
+                self._bytes += size
+                repaired += 1
+
+            self.repairs += repaired
+        return repaired
+
+    def _repair_increase(self, dist, parent, children, u, v):
+        """
+        Edge (u, v) got more expensive or closed: only nodes whose tree path
+        used it can change. Cut that subtree off and re-settle it from its
+        boundary with the rest of the tree.
+        """
+        if parent.get(u) == v:
+            root = u
+        elif parent.get(v) == u:
+            root = v
+        else:
+            return  # Not a tree edge, no distance changes
+
+        # Collect and detach the subtree under root
+        subtree = set()
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            subtree.add(node)
+            stack.extend(children.pop(node, ()))
+        children[parent[root]].discard(root)
+        for node in subtree:
+            del dist[node]
+            del parent[node]
+
+        # Best way into each cut node from the untouched part of the tree
+        pq = []
+        for node in subtree:
+            for neighbor, weight in self.nav.adj[node]:
+                if neighbor in dist:
+                    pq.append((dist[neighbor] + weight, node, neighbor))
+        heapq.heapify(pq)
+
+        # Dijkstra restricted to the cut nodes
+        while pq:
+            cost, node, via = heapq.heappop(pq)
+            if node in dist:
+                continue
+            dist[node] = cost
+            parent[node] = via
+            children.setdefault(via, set()).add(node)
+            for neighbor, weight in self.nav.adj[node]:
+                if neighbor in subtree and neighbor not in dist:
+                    heapq.heappush(pq, (cost + weight, neighbor, node))
+
+    def _repair_decrease(self, dist, parent, children, u, v, weight):
+        """
+        Edge (u, v) got cheaper or reopened: push the improvement outwards
+        from whichever end now gets a shorter path, stopping where nothing improves
+        """
+        pq = []
+        for a, b in ((u, v), (v, u)):
+            if b in dist and dist[b] + weight < dist.get(a, math.inf):
+                pq.append((dist[b] + weight, a, b))
+        heapq.heapify(pq)
+
+        while pq:
+            cost, node, via = heapq.heappop(pq)
+            if cost >= dist.get(node, math.inf):
+                continue
+            if node in parent:
+                children[parent[node]].discard(node)
+            dist[node] = cost
+            parent[node] = via
+            children.setdefault(via, set()).add(node)
+            for neighbor, w in self.nav.adj[node]:
+                if cost + w < dist.get(neighbor, math.inf):
+                    heapq.heappush(pq, (cost + w, neighbor, node))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "trees": len(self._trees),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "repairs": self.repairs,
+            }
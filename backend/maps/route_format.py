@@ -0,0 +1,70 @@
+"""
+route_format.py
+---------------------------------
+Compact route encoding for bandwidth-sensitive clients
+The expanded geometry goes out as an encoded polyline (deltas +
+varints, Google style), maneuvers as [type, path_index, distance_dm]
+records (node and towards are path[path_index] and the next record's
+node), and the body carries a content hash usable as an ETag
+
+    {
+        "format": "compact-v1",
+        "path": [...node IDs...],
+        "polyline": "...",
+        "precision": 1,
+        "maneuver_types": ["depart", "left", "right", "arrive"],
+        "maneuvers": [[0, 0, 1234], [2, 5, 560], ..., [3, 41, 4567]],
+        "distance_m": 456.7,
+        "hash": "..."
+    }
+"""
+
+import hashlib
+import json
+
+try:
+    from maps.polyline import encode_polyline
+except ImportError:  # Run as a script from inside maps/
+    from polyline import encode_polyline
+
+FORMAT_NAME = "compact-v1"
+MEDIA_TYPE = "application/vnd.mapmate.route+json"
+
+# Polyline decimal places (1 = 0.1 px, enough for snapped mid-edge points)
+PRECISION = 1
+
+MANEUVER_TYPES = ["depart", "left", "right", "arrive"]
+_TYPE_CODES = {name: code for code, name in enumerate(MANEUVER_TYPES)}
+
+
+def compact_maneuvers(maneuvers):
+    """get_maneuvers output as [type code, path_index, distance in decimeters]"""
+    return [
+        [_TYPE_CODES[m["type"]], m["path_index"], int(round(m["distance_m"] * 10))]
+        for m in maneuvers
+    ]
+
+
+def content_hash(body):
+    """Stable hash of a JSON-serializable body (key order and whitespace ignored)"""
+    data = json.dumps(body, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha1(data).hexdigest()[:16]
+
+
+def compact_route(path, geometry, maneuvers, distance_m, **extra):
+    """
+    Compact body for a route; extra keys (e.g. snapped) are included and hashed.
+    The hash covers everything except itself, so identical routes hash the same.
+    """
+    body = {
+        "format": FORMAT_NAME,
+        "path": list(path),
+        "polyline": encode_polyline(geometry, PRECISION),
+        "precision": PRECISION,
+        "maneuver_types": MANEUVER_TYPES,
+        "maneuvers": compact_maneuvers(maneuvers),
+        "distance_m": distance_m,
+    }
+    body.update(extra)
+    body["hash"] = content_hash(body)
+    return body
@@ -0,0 +1,148 @@
+"""
+route_renderer.py
+---------------------------------
+Server-side route images with OpenCV
+The decoded base map, with the walkway edge layer already
+rasterized onto it, stays in memory; a request only draws
+the route overlay (optionally on a crop around the route)
+
+Encoded images are cached per (route, graph version, format, crop)
+"""
+
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+# Colors (BGR)
+EDGE_COLOR = (255, 255, 0)       # Cyan
+CLOSED_EDGE_COLOR = (0, 0, 160)  # Dark red
+ROUTE_COLOR = (0, 0, 255)        # Red
+NODE_COLOR = (0, 255, 255)       # Yellow
+START_COLOR = (0, 255, 0)        # Lime
+END_COLOR = (0, 0, 255)          # Red
+EDGE_ALPHA = 0.3
+
+ROUTE_THICKNESS = 3
+CROP_PADDING = 60
+IMAGE_FORMATS = {"png": ".png", "webp": ".webp"}
+MAX_CACHED_IMAGES = 256
+
+
+class RouteRenderer:
+    def __init__(self, nav, img_path, max_cached=MAX_CACHED_IMAGES):
+        self.nav = nav
+        self.max_cached = max_cached
+
+        base = cv2.imread(str(img_path), cv2.IMREAD_COLOR) if img_path else None
+        if base is None:
+            # No map image: plain black canvas covering the graph
+            xs = [p[0] for p in nav.nodes.values()] or [0]
+            ys = [p[1] for p in nav.nodes.values()] or [0]
+            base = np.zeros((int(max(ys)) + CROP_PADDING, int(max(xs)) + CROP_PADDING, 3), dtype=np.uint8)
+        self._map = base
+
+        self._base = None
+        self._base_version = None
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _base_layer(self):
+        """Map with every edge pre-rasterized, rebuilt only when the graph version changes"""
+        version = self.nav.version
+        if self._base_version == version:
+            return self._base
+
+        overlay = self._map.copy()
+        edges = [
+            self._polyline(self.nav.edge_points(u, v))
+            for u, neighbors in self.nav.adj.items() for v, _ in neighbors if u < v
+        ]
+        if edges:
+            cv2.polylines(overlay, edges, False, EDGE_COLOR, 1, cv2.LINE_AA)
+        base = cv2.addWeighted(overlay, EDGE_ALPHA, self._map, 1 - EDGE_ALPHA, 0)
+
+        closed = [
+            self._polyline(self.nav.edge_points(u, v))
+            for (u, v), state in self.nav.edge_overrides.items() if state["closed"]
+        ]
+        if closed:
+            cv2.polylines(base, closed, False, CLOSED_EDGE_COLOR, 2, cv2.LINE_AA)
+
+        # Labelled with the version read before drawing: an update landing mid-build forces a rebuild
+        self._base, self._base_version = base, version
+        return base
+
+    def cached(self, path, fmt="png", crop=True, start_label=None, end_label=None):
+        """Cached image bytes for these render arguments, or None (never draws)"""
+        key = (tuple(path), self.nav.version, fmt, crop, start_label, end_label)
+        with self._lock:
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+            return data
+
+    def render(self, path, fmt="png", crop=True, start_label=None, end_label=None):
+        """
+        Encoded image bytes of the route drawn over the base map
+        fmt  - "png" or "webp"
+        crop - cut the image down to the route's bounding box (+ padding)
+        """
+        if fmt not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported image format '{fmt}'")
+
+        key = (tuple(path), self.nav.version, fmt, crop, start_label, end_label)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+            base = self._base_layer()
+
+        pts = np.array([self.nav.nodes[n] for n in path], dtype=np.float64).reshape(-1, 2)
+        line = np.array(self.nav.expand_geometry(path), dtype=np.float64).reshape(-1, 2)
+        h, w = base.shape[:2]
+        if crop and len(line):
+            x0 = int(max(0, line[:, 0].min() - CROP_PADDING))
+            y0 = int(max(0, line[:, 1].min() - CROP_PADDING))
+            x1 = int(min(w, line[:, 0].max() + CROP_PADDING))
+            y1 = int(min(h, line[:, 1].max() + CROP_PADDING))
+        else:
+            x0, y0, x1, y1 = 0, 0, w, h
+
+        # Only the region we return gets copied
+        img = base[y0:y1, x0:x1].copy()
+        pts = np.round(pts - (x0, y0)).astype(np.int32)
+        line = np.round(line - (x0, y0)).astype(np.int32)
+
+        if len(line) > 1:
+            cv2.polylines(img, [line.reshape(-1, 1, 2)], False, ROUTE_COLOR, ROUTE_THICKNESS, cv2.LINE_AA)
+        for x, y in pts:
+            cv2.circle(img, (int(x), int(y)), 3, NODE_COLOR, -1, cv2.LINE_AA)
+
+        if len(pts):
+            self._draw_label(img, pts[0], start_label or path[0], START_COLOR)
+            self._draw_label(img, pts[-1], end_label or path[-1], END_COLOR)
+
+        ok, buf = cv2.imencode(IMAGE_FORMATS[fmt], img)
+        if not ok:
+            raise ValueError(f"Could not encode {fmt} image")
+        data = buf.tobytes()
+
+        with self._lock:
+            self._cache[key] = data
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return data
+
+    @staticmethod
+    def _polyline(points):
+        return np.round(np.array(points, dtype=np.float64)).astype(np.int32).reshape(-1, 1, 2)
+
+    @staticmethod
+    def _draw_label(img, point, text, color):
+        x, y = int(point[0]), int(point[1])
+        (tw, th), baseline = cv2.getTextSize(str(text), cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
+        cv2.rectangle(img, (x + 6, y - th - 8), (x + tw + 12, y + baseline - 4), (0, 0, 0), -1)
+        cv2.putText(img, str(text), (x + 9, y - 6), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1, cv2.LINE_AA)
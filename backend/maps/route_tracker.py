@@ -0,0 +1,166 @@
+"""
+route_tracker.py
+---------------------------------
+Progress tracking along an active route
+An ActiveRoute keeps the route's expanded geometry as segments with
+cumulative-distance prefix sums, so every position update is a
+projection onto a few segments around the last match plus table
+lookups (distance done/remaining, next maneuver), not a new search
+
+The full route is only rescanned when the user is far from the
+segments near the last match (a jump, or walking off route)
+"""
+
+import math
+import threading
+import uuid
+from collections import OrderedDict
+
+# Segments checked around the last match on every update
+WINDOW_BEHIND = 2
+WINDOW_AHEAD = 8
+
+# Deviation (meters) beyond which the user counts as off route
+OFF_ROUTE_M = 15.0
+
+# Active routes kept server-wide (least recently updated dropped first)
+MAX_ACTIVE_ROUTES = 1000
+
+
+class ActiveRoute:
+    def __init__(self, nav, path, meters_per_pixel, walking_speed_mps):
+        self.path = list(path)
+        self.meters_per_pixel = meters_per_pixel
+        self.walking_speed_mps = walking_speed_mps
+        self.maneuvers = nav.get_maneuvers(self.path)
+
+        # Expanded geometry, remembering where each path node lands in it
+        points = [tuple(nav.nodes[self.path[0]])] if self.path else []
+        node_vertex = [0]
+        for u, v in zip(self.path, self.path[1:]):
+            points.extend(tuple(p) for p in nav.edge_points(u, v)[1:])
+            node_vertex.append(len(points) - 1)
+
+        self.points = points
+        self.seg_len = [math.hypot(b[0] - a[0], b[1] - a[1]) for a, b in zip(points, points[1:])]
+        # cumulative[i] = distance (px) from the start to vertex i
+        self.cumulative = [0.0]
+        for length in self.seg_len:
+            self.cumulative.append(self.cumulative[-1] + length)
+        self.total = self.cumulative[-1]
+
+        # Where along the route each maneuver happens
+        self.maneuver_at = [self.cumulative[node_vertex[m["path_index"]]] for m in self.maneuvers]
+        self.next_maneuver = 0
+
+        self.last_segment = 0
+
+    def _project(self, i, x, y):
+        """(squared distance, t, px, py) of (x, y) onto segment i"""
+        (x1, y1), (x2, y2) = self.points[i], self.points[i + 1]
+        dx, dy = x2 - x1, y2 - y1
+        seg2 = dx * dx + dy * dy
+        t = 0.0 if seg2 == 0 else min(1.0, max(0.0, ((x - x1) * dx + (y - y1) * dy) / seg2))
+        px, py = x1 + t * dx, y1 + t * dy
+        return (px - x) ** 2 + (py - y) ** 2, t, px, py
+
+    def _best_in(self, lo, hi, x, y):
+        best = None
+        for i in range(max(0, lo), min(len(self.seg_len), hi)):
+            d2, t, px, py = self._project(i, x, y)
+            if best is None or d2 < best[0]:
+                best = (d2, i, t, px, py)
+        return best
+
+    def update(self, x, y):
+        """
+        Project a map position onto the route
+        Returns progress/remaining distance, the snapped point, deviation,
+        off_route and the next maneuver with the distance to it
+        """
+        if not self.seg_len:
+            return self._report(0, 0.0, self.points[0] if self.points else (x, y), x, y)
+
+        lo, hi = self.last_segment - WINDOW_BEHIND, self.last_segment + WINDOW_AHEAD + 1
+        best = self._best_in(lo, hi, x, y)
+
+        # Walking faster than the window: keep sliding forward while it gets closer
+        while best[1] == min(len(self.seg_len), hi) - 1 and hi < len(self.seg_len):
+            ahead = self._best_in(hi, hi + WINDOW_AHEAD, x, y)
+            if ahead[0] >= best[0]:
+                break
+            best, hi = ahead, hi + WINDOW_AHEAD
+
+        # Far from everything nearby: rescan the whole route once
+        off_px = OFF_ROUTE_M / self.meters_per_pixel
+        if best[0] > off_px * off_px:
+            full = self._best_in(0, len(self.seg_len), x, y)
+            if full[0] < best[0]:
+                best = full
+
+        _, i, t, px, py = best
+        self.last_segment = i
+        return self._report(i, t, (px, py), x, y)
+
+    def _report(self, i, t, snapped, x, y):
+        mpp = self.meters_per_pixel
+        progress = self.cumulative[i] + t * (self.seg_len[i] if self.seg_len else 0.0)
+        remaining = self.total - progress
+        deviation = math.hypot(snapped[0] - x, snapped[1] - y) * mpp
+
+        # Maneuvers are in route order; progress rarely moves back, so this pointer barely moves
+        k = self.next_maneuver
+        while k < len(self.maneuver_at) and self.maneuver_at[k] <= progress:
+            k += 1
+        while k > 0 and self.maneuver_at[k - 1] > progress:
+            k -= 1
+        self.next_maneuver = k
+
+        next_maneuver = None
+        if k < len(self.maneuvers):
+            next_maneuver = dict(self.maneuvers[k], distance_to_m=round((self.maneuver_at[k] - progress) * mpp, 1))
+
+        return {
+            "progress_m": round(progress * mpp, 1),
+            "remaining_m": round(remaining * mpp, 1),
+            "fraction": round(progress / self.total, 4) if self.total else 1.0,
+            "eta_min": round(remaining * mpp / self.walking_speed_mps / 60, 1),
+            "snapped": {"x": snapped[0], "y": snapped[1]},
+            "deviation_m": round(deviation, 1),
+            "off_route": deviation > OFF_ROUTE_M,
+            "next_maneuver": next_maneuver,
+        }
+
+
+class RouteTracker:
+    """Server-side registry of active routes, keyed by an opaque route ID"""
+
+    def __init__(self, nav, meters_per_pixel, walking_speed_mps, max_routes=MAX_ACTIVE_ROUTES):
+        self.nav = nav
+        self.meters_per_pixel = meters_per_pixel
+        self.walking_speed_mps = walking_speed_mps
+        self.max_routes = max_routes
+        self._routes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, path):
+        route = ActiveRoute(self.nav, path, self.meters_per_pixel, self.walking_speed_mps)
+        route_id = uuid.uuid4().hex
+        with self._lock:
+            self._routes[route_id] = route
+            while len(self._routes) > self.max_routes:
+                self._routes.popitem(last=False)
+        return route_id, route
+
+    def update(self, route_id, x, y):
+        """Progress report for a position, or None for an unknown (or evicted) route"""
+        with self._lock:
+            route = self._routes.get(route_id)
+            if route is None:
+                return None
+            self._routes.move_to_end(route_id)
+            return route.update(x, y)
+
+    def stop(self, route_id):
+        with self._lock:
+            return self._routes.pop(route_id, None) is not None
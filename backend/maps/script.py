@@ -1,15 +1,41 @@
 import osmnx as ox
 import matplotlib.pyplot as plt
+import json
 import os
+from pathlib import Path
+
+from tile_renderer import render_pyramid
 
 # ================= CONFIGURATION =================
 # Path to your .osm file
 OSM_FILE = r"C:\Users\r_haq\Downloads\map.osm"
 
+# Artifacts the server loads live next to this script (backend/maps)
+MAPS_DIR = Path(__file__).resolve().parent
+
 # Output path
 OUTPUT_DIR = r"C:\WOLF\Private\VS_CODE\FYP_TEST\TEST_Hybrid\maps"
 OUTPUT_FILE = os.path.join(OUTPUT_DIR, "giki_map_fixed.png")
 
+# Tile pyramid (z/x/y PNGs served by routes/tiles.py)
+TILE_DIR = str(MAPS_DIR / "tiles")
+RENDER_TILES = True
+TILE_WORKERS = None  # None = one process per CPU
+
+# Single full-resolution image (still the pixel frame of the routing graph
+# and the backdrop for server-side route images)
+RENDER_FULL_IMAGE = True
+
+# Building footprints (lon/lat) for GPS-based localizer preselection (routes/localize.py)
+FOOTPRINTS_FILE = str(MAPS_DIR / "building_footprints.json")
+EXPORT_FOOTPRINTS = True
+
+# OSM building name -> localization bank that covers it
+BANK_NAMES = {
+    "Library": "library",
+    "Admin Block": "admin",
+}
+
 # Colors
 BG_COLOR = "black"
 BUILDING_COLOR = "#404040"  # Dark Gray
@@ -46,10 +72,65 @@ def generate_map():
 
     print(f"✅ Loaded Buildings: {len(buildings)} found")
 
+    # Footprints are exported in lon/lat, before projecting
+    if EXPORT_FOOTPRINTS:
+        export_footprints(buildings)
+
     # 4. Project Buildings to match the Graph
     if not buildings.empty:
         buildings = buildings.to_crs(G.graph['crs'])
 
+    if RENDER_TILES:
+        print("🧩 Rendering map tiles...")
+        render_tiles(G, buildings)
+
+    if RENDER_FULL_IMAGE:
+        plot_full_image(G, buildings)
+
+def export_footprints(buildings):
+    footprints = []
+    if not buildings.empty:
+        for key, row in buildings.iterrows():
+            # features_from_xml indexes by (element type, OSM id)
+            osm_id = "/".join(str(k) for k in key) if isinstance(key, tuple) else str(key)
+            name = row.get("name") if isinstance(row.get("name"), str) else None
+            for part in getattr(row.geometry, 'geoms', [row.geometry]):
+                if part.geom_type != 'Polygon':
+                    continue
+                footprints.append({
+                    "id": osm_id,
+                    "name": name,
+                    "bank": BANK_NAMES.get(name),
+                    "rings": [[list(p) for p in part.exterior.coords]] + [[list(p) for p in r.coords] for r in part.interiors],
+                })
+
+    os.makedirs(os.path.dirname(FOOTPRINTS_FILE), exist_ok=True)
+    with open(FOOTPRINTS_FILE, "w", encoding="utf-8") as f:
+        json.dump({"footprints": footprints}, f)
+    with_bank = sum(1 for fp in footprints if fp["bank"])
+    print(f"🏢 Exported {len(footprints)} footprints ({with_bank} with a localization bank): {FOOTPRINTS_FILE}")
+
+def render_tiles(G, buildings):
+    # Roads: shape points of simplified edges, else the straight segment
+    roads = []
+    for u, v, data in G.edges(data=True):
+        if 'geometry' in data:
+            roads.append(list(data['geometry'].coords))
+        else:
+            roads.append([(G.nodes[u]['x'], G.nodes[u]['y']), (G.nodes[v]['x'], G.nodes[v]['y'])])
+
+    # Buildings: outline + holes of every (multi)polygon
+    polygons = []
+    for geom in (buildings.geometry if not buildings.empty else []):
+        parts = getattr(geom, 'geoms', [geom])
+        for part in parts:
+            if part.geom_type == 'Polygon':
+                polygons.append([list(part.exterior.coords)] + [list(r.coords) for r in part.interiors])
+
+    render_pyramid(polygons, roads, TILE_DIR, workers=TILE_WORKERS, crs=str(G.graph['crs']))
+    print(f"📁 Tiles: {TILE_DIR}")
+
+def plot_full_image(G, buildings):
     # ================= PLOTTING =================
     print("🎨 Plotting map...")
     
@@ -4,12 +4,20 @@ import cv2
 import json
 import os
 
+from graph_binary import BINARY_EXT, write_graph_binary
+from polyline import encode_polyline
+
 # ================= CONFIGURATION =================
 OSM_FILE = r"C:\Users\r_haq\Downloads\map.osm"
 OUTPUT_DIR = r"C:\WOLF\Private\VS_CODE\FYP_TEST\TEST_Hybrid\maps"
 IMG_FILE = "giki_map.png"
 JSON_FILE = "giki_graph.json"
 
+# Graph export: indented JSON, and/or the compact binary format (graph_binary.py)
+WRITE_JSON = True
+WRITE_BINARY = True
+COMPRESS_BINARY = False
+
 # Map Visual Settings
 MAP_WIDTH = 2048  # High resolution width
 BG_COLOR = (0, 0, 0)      # Black (BGR)
@@ -58,16 +66,21 @@ def generate_robust_map():
     canvas = np.zeros((MAP_HEIGHT, MAP_WIDTH, 3), dtype=np.uint8)
     canvas[:] = BG_COLOR
     
+    # Edge shape in pixels: simplify=True already merged degree-2 chains,
+    # their shape points are kept in the edge's 'geometry' LineString
+    def edge_pixels(u, v, data):
+        if 'geometry' in data:
+            return [world_to_pixel(wx, wy) for wx, wy in data['geometry'].coords]
+        return [
+            world_to_pixel(G.nodes[u]['x'], G.nodes[u]['y']),
+            world_to_pixel(G.nodes[v]['x'], G.nodes[v]['y'])
+        ]
+
     # Draw Edges
     print("🎨 Drawing roads...")
     for u, v, data in G.edges(data=True):
-        ux, uy = G.nodes[u]['x'], G.nodes[u]['y']
-        vx, vy = G.nodes[v]['x'], G.nodes[v]['y']
-        
-        p1 = world_to_pixel(ux, uy)
-        p2 = world_to_pixel(vx, vy)
-        
-        cv2.line(canvas, p1, p2, ROAD_COLOR, ROAD_THICKNESS, lineType=cv2.LINE_AA)
+        pts = np.array(edge_pixels(u, v, data), dtype=np.int32)
+        cv2.polylines(canvas, [pts], False, ROAD_COLOR, ROAD_THICKNESS, lineType=cv2.LINE_AA)
 
     # 4. Generate JSON Data
     print("📝 Building Graph JSON...")
@@ -89,33 +102,55 @@ def generate_robust_map():
         node_lookup[node_id] = node_info
 
     json_edges = []
+    edge_shapes = [] # Interior pixel points per exported edge, for the binary file
     for u, v, data in G.edges(data=True):
         # Calculate pixel distance (Cost)
         if u in node_lookup and v in node_lookup:
-            p1 = node_lookup[u]
-            p2 = node_lookup[v]
-            
-            dist = np.sqrt((p1['x'] - p2['x'])**2 + (p1['y'] - p2['y'])**2)
+            # Cost follows the shape points, not the straight chord
+            pts = np.array(edge_pixels(u, v, data), dtype=np.float64)
+            dist = np.sum(np.sqrt(np.sum(np.diff(pts, axis=0)**2, axis=1)))
             
-            json_edges.append({
+            edge = {
                 "from": u,
                 "to": v,
-                "cost": round(dist, 2)
-            })
+                "cost": round(float(dist), 2)
+            }
+            if len(pts) > 2:
+                edge["geometry"] = encode_polyline(pts.tolist())
+            json_edges.append(edge)
+            edge_shapes.append(pts[1:-1] if len(pts) > 2 else None)
 
     # 5. Save Files
     img_path = os.path.join(OUTPUT_DIR, IMG_FILE)
     cv2.imwrite(img_path, canvas)
     
     json_path = os.path.join(OUTPUT_DIR, JSON_FILE)
-    export_data = {"nodes": json_nodes, "edges": json_edges}
-    
-    with open(json_path, "w") as f:
-        json.dump(export_data, f, indent=2)
+    if WRITE_JSON:
+        export_data = {"nodes": json_nodes, "edges": json_edges}
+        with open(json_path, "w") as f:
+            json.dump(export_data, f, indent=2)
+
+    bin_path = os.path.splitext(json_path)[0] + BINARY_EXT
+    if WRITE_BINARY:
+        index = {n["id"]: i for i, n in enumerate(json_nodes)}
+        write_graph_binary(
+            bin_path,
+            [n["id"] for n in json_nodes],
+            [(n["x"], n["y"]) for n in json_nodes],
+            [(np.nan if n["lat"] is None else n["lat"], np.nan if n["lon"] is None else n["lon"]) for n in json_nodes],
+            [index[e["from"]] for e in json_edges],
+            [index[e["to"]] for e in json_edges],
+            [e["cost"] for e in json_edges],
+            edge_shapes,
+            compress=COMPRESS_BINARY
+        )
         
     print("\n🎉 Done!")
     print(f"🖼️ Map Image: {img_path}")
-    print(f"📄 Graph Data: {json_path}")
+    if WRITE_JSON:
+        print(f"📄 Graph Data: {json_path}")
+    if WRITE_BINARY:
+        print(f"📦 Binary Graph: {bin_path}")
 
 if __name__ == "__main__":
     generate_robust_map()
\ No newline at end of file
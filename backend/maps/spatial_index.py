@@ -0,0 +1,183 @@
+"""
+spatial_index.py
+---------------------------------
+Uniform-grid spatial index over a CampusNavigator graph
+Used to snap localized map coordinates (map_x, map_y)
+onto the nearest node or edge before routing
+
+Queries touch only the few grid cells around the point,
+so cost does not grow with graph size
+"""
+
+import math
+
+
+class GraphSpatialIndex:
+    def __init__(self, nav, cell_size=None):
+        self.nav = nav
+
+        # Flat coordinate tables (faster than dict lookups in the hot loop)
+        self.node_ids = list(nav.nodes)
+        self.node_xy = [(float(x), float(y)) for _, (x, y) in nav.nodes.items()]
+
+        # Unique undirected edges as straight segments; contracted (polyline)
+        # edges contribute one segment per piece, with t0/t1 the fraction of
+        # the edge's length where the piece starts and ends
+        self.edges = []
+        seen = set()
+        for u, neighbors in nav.adj.items():
+            for v, _ in neighbors:
+                key = (u, v) if u <= v else (v, u)
+                if key in seen:
+                    continue
+                seen.add(key)
+                pts = nav.edge_points(u, v)
+                pieces = [math.hypot(q[0] - p[0], q[1] - p[1]) for p, q in zip(pts, pts[1:])]
+                total = sum(pieces) or 1.0
+                done = 0.0
+                for (x1, y1), (x2, y2), piece in zip(pts, pts[1:], pieces):
+                    self.edges.append((u, v, float(x1), float(y1), float(x2), float(y2),
+                                       done / total, (done + piece) / total))
+                    done += piece
+
+        self.cell = cell_size or self._pick_cell_size()
+
+        # Bucket nodes by cell
+        self.node_grid = {}
+        for i, (x, y) in enumerate(self.node_xy):
+            self.node_grid.setdefault(self._cell_of(x, y), []).append(i)
+
+        # Bucket edges into every cell their bounding box covers
+        self.edge_grid = {}
+        for i, (_, _, x1, y1, x2, y2, _, _) in enumerate(self.edges):
+            cx1, cy1 = self._cell_of(min(x1, x2), min(y1, y2))
+            cx2, cy2 = self._cell_of(max(x1, x2), max(y1, y2))
+            for cx in range(cx1, cx2 + 1):
+                for cy in range(cy1, cy2 + 1):
+                    self.edge_grid.setdefault((cx, cy), []).append(i)
+
+        # Occupied cell bounds, so ring search knows when every cell has been seen
+        # (edge cells too: polyline pieces can bend outside the nodes' extent)
+        occupied = self.node_grid.keys() | self.edge_grid.keys()
+        if occupied:
+            cxs = [c[0] for c in occupied]
+            cys = [c[1] for c in occupied]
+            self.bounds = (min(cxs), min(cys), max(cxs), max(cys))
+        else:
+            self.bounds = None
+
+    def _pick_cell_size(self):
+        """Aim for ~2 nodes per cell, never smaller than the median edge"""
+        if not self.node_xy:
+            return 1.0
+        xs = [p[0] for p in self.node_xy]
+        ys = [p[1] for p in self.node_xy]
+        area = max(max(xs) - min(xs), 1.0) * max(max(ys) - min(ys), 1.0)
+        cell = math.sqrt(2.0 * area / len(self.node_xy))
+
+        if self.edges:
+            lengths = sorted(math.hypot(e[4] - e[2], e[5] - e[3]) for e in self.edges)
+            cell = max(cell, lengths[len(lengths) // 2])
+        return max(cell, 1.0)
+
+    def _cell_of(self, x, y):
+        return int(math.floor(x / self.cell)), int(math.floor(y / self.cell))
+
+    def _max_ring(self, cx, cy):
+        if self.bounds is None:
+            return -1
+        min_cx, min_cy, max_cx, max_cy = self.bounds
+        return max(abs(cx - min_cx), abs(cx - max_cx), abs(cy - min_cy), abs(cy - max_cy))
+
+    def _ring_clearance(self, x, y, cx, cy, r):
+        """Distance from (x, y) to the nearest cell outside ring r"""
+        c = self.cell
+        return min(
+            x - (cx - r) * c, (cx + r + 1) * c - x,
+            y - (cy - r) * c, (cy + r + 1) * c - y,
+        )
+
+    def _ring(self, cx, cy, r):
+        """Cells on the square ring at Chebyshev distance r"""
+        if r == 0:
+            yield cx, cy
+            return
+        for dx in range(-r, r + 1):
+            yield cx + dx, cy - r
+            yield cx + dx, cy + r
+        for dy in range(-r + 1, r):
+            yield cx - r, cy + dy
+            yield cx + r, cy + dy
+
+    # --- NEAREST NODE ---
+    def nearest_node(self, x, y):
+        """Returns (node_id, distance_px) or (None, inf) for an empty graph"""
+        cx, cy = self._cell_of(x, y)
+        best_i, best_d2 = -1, math.inf
+
+        for r in range(self._max_ring(cx, cy) + 1):
+            for cell in self._ring(cx, cy, r):
+                for i in self.node_grid.get(cell, ()):
+                    nx, ny = self.node_xy[i]
+                    d2 = (nx - x) ** 2 + (ny - y) ** 2
+                    if d2 < best_d2:
+                        best_i, best_d2 = i, d2
+
+            # Anything beyond ring r is at least the ring clearance away
+            if best_i >= 0 and self._ring_clearance(x, y, cx, cy, r) ** 2 >= best_d2:
+                break
+
+        if best_i < 0:
+            return None, math.inf
+        return self.node_ids[best_i], math.sqrt(best_d2)
+
+    # --- NEAREST EDGE (mid-edge snapping) ---
+    def snap_to_edge(self, x, y):
+        """
+        Projects (x, y) onto the closest edge segment
+        Returns dict with:
+            edge     - (u, v) node IDs
+            t        - position along the edge (by length), 0 at u and 1 at v
+            x, y     - snapped point on the segment
+            distance - pixels from the query point to the snapped point
+        or None if the graph has no (open) edges
+        """
+        cx, cy = self._cell_of(x, y)
+        best, best_d2 = None, math.inf
+        visited = set()
+
+        for r in range(self._max_ring(cx, cy) + 1):
+            for cell in self._ring(cx, cy, r):
+                for i in self.edge_grid.get(cell, ()):
+                    if i in visited:
+                        continue
+                    visited.add(i)
+
+                    u, v, x1, y1, x2, y2, t0, t1 = self.edges[i]
+                    if self.nav.edge_overrides and self.nav.is_closed(u, v):
+                        continue
+                    dx, dy = x2 - x1, y2 - y1
+                    seg2 = dx * dx + dy * dy
+                    t = 0.0 if seg2 == 0 else ((x - x1) * dx + (y - y1) * dy) / seg2
+                    t = min(1.0, max(0.0, t))
+                    px, py = x1 + t * dx, y1 + t * dy
+                    d2 = (px - x) ** 2 + (py - y) ** 2
+
+                    if d2 < best_d2:
+                        best_d2 = d2
+                        best = (u, v, t0 + t * (t1 - t0), px, py)
+
+            if best is not None and self._ring_clearance(x, y, cx, cy, r) ** 2 >= best_d2:
+                break
+
+        if best is None:
+            return None
+
+        u, v, t, px, py = best
+        return {
+            "edge": (u, v),
+            "t": t,
+            "x": px,
+            "y": py,
+            "distance": math.sqrt(best_d2),
+        }
@@ -0,0 +1,236 @@
+"""
+tile_renderer.py
+---------------------------------
+Tiled, parallel rasterization of the campus map
+The projected extent is cut into a z/x/y pyramid of 256px tiles
+(zoom z has 2^z x 2^z tiles over a square extent, y growing south).
+Tiles are drawn with OpenCV in a process pool: buildings first,
+then roads, matching script.py's colors
+
+Every tile's inputs (style, grid, and the exact geometry touching it)
+are hashed into manifest.json, so a re-run only redraws tiles whose
+geometry changed; tiles with no geometry are not written at all
+(routes/tiles.py serves a blank tile for them). Geometry that grows
+the overall extent moves the grid, which redraws everything.
+
+Used by script.py; geometry comes in projected meters:
+    buildings - list of polygons, each a list of rings [(x, y), ...]
+                (first ring is the outline, the rest are holes)
+    roads     - list of polylines [(x, y), ...]
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+# ================= CONFIGURATION =================
+TILE_SIZE = 256
+MANIFEST_FILE = "manifest.json"
+
+# Deepest zoom is the first one at least this sharp (meters per pixel)
+TARGET_METERS_PER_PIXEL = 0.25
+MAX_ZOOM_LIMIT = 12
+
+# Colors (BGR), same as script.py
+BG_COLOR = (0, 0, 0)             # black
+BUILDING_COLOR = (64, 64, 64)    # #404040
+ROAD_COLOR = (224, 224, 224)     # #E0E0E0
+ROAD_WIDTH_M = 3.0               # Never thinner than 1px
+
+# Bump when drawing changes, so every tile is redrawn
+STYLE_VERSION = 1
+
+# Sub-pixel precision for OpenCV drawing (coordinates * 2^SHIFT)
+SHIFT = 4
+
+# Tiles per process-pool task
+CHUNK_SIZE = 64
+
+
+# ================= TILE GRID =================
+def tile_extent(buildings, roads):
+    """Square extent (origin_x, origin_y_top, side_m) covering all geometry"""
+    points = [np.asarray(r, dtype=np.float64).reshape(-1, 2) for poly in buildings for r in poly]
+    points += [np.asarray(line, dtype=np.float64).reshape(-1, 2) for line in roads]
+    points = np.vstack(points) if points else np.zeros((1, 2))
+    min_x, min_y = points.min(axis=0)
+    max_x, max_y = points.max(axis=0)
+    side = max(max_x - min_x, max_y - min_y, 1.0)
+    # Center the shorter axis inside the square
+    cx, cy = (min_x + max_x) / 2, (min_y + max_y) / 2
+    return float(cx - side / 2), float(cy + side / 2), float(side)
+
+
+def pick_max_zoom(side_m):
+    z = 0
+    while z < MAX_ZOOM_LIMIT and side_m / (TILE_SIZE << z) > TARGET_METERS_PER_PIXEL:
+        z += 1
+    return z
+
+
+def road_width_px(side_m, z):
+    return max(1, int(round(ROAD_WIDTH_M * (TILE_SIZE << z) / side_m)))
+
+
+def _bboxes(features):
+    boxes = np.empty((len(features), 4))
+    for i, pts in enumerate(features):
+        boxes[i, :2] = pts.min(axis=0)
+        boxes[i, 2:] = pts.max(axis=0)
+    return boxes
+
+
+def _digest(arrays):
+    h = hashlib.sha1()
+    for a in arrays:
+        h.update(np.ascontiguousarray(a, dtype=np.float64).tobytes())
+        h.update(b"|")
+    return h.digest()
+
+
+# ================= WORKER =================
+_LAYERS = None  # Set once per worker process by _init_worker
+
+
+def _init_worker(layers):
+    global _LAYERS
+    _LAYERS = layers
+
+
+def _render_chunk(jobs):
+    """jobs: list of (z, x, y, building ids, road ids, output path)"""
+    origin_x, origin_y, side = _LAYERS["extent"]
+    for z, x, y, b_ids, r_ids, out_path in jobs:
+        tile_m = side / (1 << z)
+        scale = TILE_SIZE / tile_m * (1 << SHIFT)
+        left, top = origin_x + x * tile_m, origin_y - y * tile_m
+
+        def to_px(pts):
+            px = np.empty_like(pts)
+            px[:, 0] = (pts[:, 0] - left) * scale
+            px[:, 1] = (top - pts[:, 1]) * scale
+            return np.round(px).astype(np.int32).reshape(-1, 1, 2)
+
+        img = np.empty((TILE_SIZE, TILE_SIZE, 3), dtype=np.uint8)
+        img[:] = BG_COLOR
+
+        for i in b_ids:
+            cv2.fillPoly(img, [to_px(r) for r in _LAYERS["buildings"][i]], BUILDING_COLOR, cv2.LINE_AA, SHIFT)
+        if r_ids:
+            lines = [to_px(_LAYERS["roads"][i]) for i in r_ids]
+            cv2.polylines(img, lines, False, ROAD_COLOR, road_width_px(side, z), cv2.LINE_AA, SHIFT)
+
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        cv2.imwrite(out_path, img)
+    return len(jobs)
+
+
+# ================= PYRAMID =================
+def load_manifest(tile_dir):
+    try:
+        with open(os.path.join(tile_dir, MANIFEST_FILE), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def render_pyramid(buildings, roads, tile_dir, min_zoom=0, max_zoom=None, workers=None, crs=None):
+    """
+    Render (or update) the tile pyramid under tile_dir/{z}/{x}/{y}.png
+    Returns counts of rendered, unchanged and removed tiles
+    """
+    buildings = [[np.asarray(r, dtype=np.float64).reshape(-1, 2) for r in poly] for poly in buildings]
+    buildings = [poly for poly in buildings if poly and len(poly[0]) >= 3]
+    roads = [np.asarray(line, dtype=np.float64).reshape(-1, 2) for line in roads]
+    roads = [line for line in roads if len(line) >= 2]
+
+    extent = tile_extent(buildings, roads)
+    origin_x, origin_y, side = extent
+    if max_zoom is None:
+        max_zoom = pick_max_zoom(side)
+
+    # Bounding boxes and content hashes, computed once for every zoom
+    b_boxes = _bboxes([poly[0] for poly in buildings])
+    r_boxes = _bboxes(roads)
+    b_hash = [_digest(poly) for poly in buildings]
+    r_hash = [_digest([line]) for line in roads]
+
+    start = time.perf_counter()
+    wanted = {}  # "z/x/y" -> (hash, building ids, road ids)
+    for z in range(min_zoom, max_zoom + 1):
+        n = 1 << z
+        tile_m = side / n
+        pad = road_width_px(side, z) * tile_m / TILE_SIZE
+        buckets = {}
+        for slot, boxes, grow in ((0, b_boxes, 0.0), (1, r_boxes, pad)):
+            if not len(boxes):
+                continue
+            x0 = np.clip(((boxes[:, 0] - grow - origin_x) // tile_m).astype(np.int64), 0, n - 1)
+            x1 = np.clip(((boxes[:, 2] + grow - origin_x) // tile_m).astype(np.int64), 0, n - 1)
+            y0 = np.clip(((origin_y - boxes[:, 3] - grow) // tile_m).astype(np.int64), 0, n - 1)
+            y1 = np.clip(((origin_y - boxes[:, 1] + grow) // tile_m).astype(np.int64), 0, n - 1)
+            for i, (a, b, c, d) in enumerate(zip(x0.tolist(), x1.tolist(), y0.tolist(), y1.tolist())):
+                for tx in range(a, b + 1):
+                    for ty in range(c, d + 1):
+                        buckets.setdefault((tx, ty), ([], []))[slot].append(i)
+
+        for (tx, ty), (b_ids, r_ids) in buckets.items():
+            h = hashlib.sha1(f"{STYLE_VERSION}:{z}/{tx}/{ty}:{side}:{origin_x}:{origin_y}".encode())
+            for i in b_ids:
+                h.update(b_hash[i])
+            h.update(b"#")
+            for i in r_ids:
+                h.update(r_hash[i])
+            wanted[f"{z}/{tx}/{ty}"] = (h.hexdigest(), b_ids, r_ids)
+
+    old = (load_manifest(tile_dir) or {}).get("tiles", {})
+    jobs = []
+    for key, (digest, b_ids, r_ids) in wanted.items():
+        path = os.path.join(tile_dir, *key.split("/")) + ".png"
+        if old.get(key) != digest or not os.path.exists(path):
+            z, x, y = map(int, key.split("/"))
+            jobs.append((z, x, y, b_ids, r_ids, path))
+
+    # Tiles that lost all their geometry
+    removed = 0
+    for key in old:
+        if key not in wanted:
+            try:
+                os.remove(os.path.join(tile_dir, *key.split("/")) + ".png")
+                removed += 1
+            except OSError:
+                pass
+
+    print(f"🧩 Zoom {min_zoom}-{max_zoom}: {len(wanted)} tiles with geometry, "
+          f"{len(jobs)} to render, {len(wanted) - len(jobs)} unchanged")
+
+    if jobs:
+        layers = {"extent": extent, "buildings": buildings, "roads": roads}
+        chunks = [jobs[i:i + CHUNK_SIZE] for i in range(0, len(jobs), CHUNK_SIZE)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(layers,)) as pool:
+            for _ in pool.map(_render_chunk, chunks):
+                pass
+
+    manifest = {
+        "tile_size": TILE_SIZE,
+        "min_zoom": min_zoom,
+        "max_zoom": max_zoom,
+        "origin": [origin_x, origin_y],
+        "extent_m": side,
+        "crs": crs,
+        "style_version": STYLE_VERSION,
+        "tiles": {key: value[0] for key, value in wanted.items()},
+    }
+    os.makedirs(tile_dir, exist_ok=True)
+    tmp_path = os.path.join(tile_dir, MANIFEST_FILE + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, os.path.join(tile_dir, MANIFEST_FILE))
+
+    print(f"✅ Rendered {len(jobs)} tiles in {time.perf_counter() - start:.2f}s ({removed} removed)")
+    return {"rendered": len(jobs), "unchanged": len(wanted) - len(jobs), "removed": removed}
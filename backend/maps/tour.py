@@ -0,0 +1,179 @@
+"""
+tour.py
+---------------------------------
+Best visiting order for several stops
+The stop-to-stop distance matrix takes one one-to-many search per
+stop (get_paths_to_many), then the order is solved on the matrix:
+    - exact Held-Karp DP for up to EXACT_MAX_STOPS stops
+    - nearest neighbour + 2-opt / Or-opt moves otherwise, improving
+      until no move helps or the time budget runs out
+
+The first stop is always the start; round_trip returns to it
+"""
+
+import math
+import time
+
+# Held-Karp is O(2^k * k^2): ~0.5M steps at 12 stops
+EXACT_MAX_STOPS = 12
+
+# Longest run of stops Or-opt moves as one block
+OR_OPT_MAX_SEGMENT = 3
+
+
+def distance_matrix(nav, stops):
+    """
+    matrix[i][j] = path cost (px) from stops[i] to stops[j], inf if unreachable
+    paths[(i, j)] = node path; one search per stop
+    """
+    matrix = [[0.0] * len(stops) for _ in stops]
+    paths = {}
+    for i, stop in enumerate(stops):
+        found = nav.get_paths_to_many(stop, set(stops) - {stop})
+        for j, other in enumerate(stops):
+            if i == j:
+                paths[(i, j)] = [stop]
+            elif other in found:
+                matrix[i][j], paths[(i, j)] = found[other]
+            else:
+                matrix[i][j] = math.inf
+    return matrix, paths
+
+
+def tour_cost(matrix, order, round_trip=False):
+    cost = sum(matrix[a][b] for a, b in zip(order, order[1:]))
+    if round_trip and len(order) > 1:
+        cost += matrix[order[-1]][order[0]]
+    return cost
+
+
+def _held_karp(matrix, round_trip):
+    """Optimal order starting at 0"""
+    n = len(matrix)
+    rest = n - 1
+    # best[mask][j]: cheapest path from 0 over the stops in mask, ending at stop j + 1
+    best = [[math.inf] * rest for _ in range(1 << rest)]
+    back = [[-1] * rest for _ in range(1 << rest)]
+    for j in range(rest):
+        best[1 << j][j] = matrix[0][j + 1]
+
+    for mask in range(1, 1 << rest):
+        row = best[mask]
+        for j in range(rest):
+            cost = row[j]
+            if cost == math.inf or not mask & (1 << j):
+                continue
+            for k in range(rest):
+                if mask & (1 << k):
+                    continue
+                new_cost = cost + matrix[j + 1][k + 1]
+                nxt = mask | (1 << k)
+                if new_cost < best[nxt][k]:
+                    best[nxt][k] = new_cost
+                    back[nxt][k] = j
+
+    full = (1 << rest) - 1
+    closing = [best[full][j] + (matrix[j + 1][0] if round_trip else 0.0) for j in range(rest)]
+    j = min(range(rest), key=closing.__getitem__)
+    order = []
+    mask = full
+    while j != -1:
+        order.append(j + 1)
+        mask, j = mask & ~(1 << j), back[mask][j]
+    return [0] + order[::-1]
+
+
+def _nearest_neighbour(matrix):
+    order = [0]
+    left = set(range(1, len(matrix)))
+    while left:
+        nxt = min(left, key=lambda j: matrix[order[-1]][j])
+        order.append(nxt)
+        left.remove(nxt)
+    return order
+
+
+def _improve(matrix, order, round_trip, deadline):
+    """2-opt and Or-opt passes (first improvement) until none helps or time runs out"""
+    best = tour_cost(matrix, order, round_trip)
+    n = len(order)
+    improved = True
+    while improved:
+        improved = False
+        # 2-opt: reverse order[i..j]; costs are recomputed in full since
+        # penalized edges can make the matrix asymmetric
+        for i in range(1, n - 1):
+            for j in range(i + 1, n):
+                candidate = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                cost = tour_cost(matrix, candidate, round_trip)
+                if cost < best - 1e-9:
+                    order, best, improved = candidate, cost, True
+            if time.perf_counter() > deadline:
+                return order, False
+
+        # Or-opt: move a run of 1-3 stops elsewhere
+        for length in range(1, OR_OPT_MAX_SEGMENT + 1):
+            for i in range(1, n - length + 1):
+                segment = order[i:i + length]
+                remainder = order[:i] + order[i + length:]
+                for k in range(1, len(remainder) + 1):
+                    if k == i:
+                        continue
+                    candidate = remainder[:k] + segment + remainder[k:]
+                    cost = tour_cost(matrix, candidate, round_trip)
+                    if cost < best - 1e-9:
+                        order, best, improved = candidate, cost, True
+                        break
+                if time.perf_counter() > deadline:
+                    return order, False
+    return order, True
+
+
+def solve_order(matrix, round_trip=False, time_budget_s=0.2):
+    """
+    Visiting order over matrix indices, starting at 0
+    Returns (order, method, converged); method is "exact" or "heuristic",
+    converged is False when the time budget cut the improvement short
+    """
+    n = len(matrix)
+    if n <= 2:
+        return list(range(n)), "exact", True
+    if n <= EXACT_MAX_STOPS:
+        return _held_karp(matrix, round_trip), "exact", True
+
+    deadline = time.perf_counter() + time_budget_s
+    order = _nearest_neighbour(matrix)
+    order, converged = _improve(matrix, order, round_trip, deadline)
+    return order, "heuristic", converged
+
+
+def plan_tour(nav, stops, round_trip=False, time_budget_s=0.2):
+    """
+    Order stops (node IDs, first one = start) and stitch the legs
+    Returns (result, error); result has order (indices into stops),
+    legs [(i, j, cost_px, path)], path, cost, method, converged, searches
+    """
+    matrix, paths = distance_matrix(nav, stops)
+    if any(matrix[0][j] == math.inf for j in range(1, len(stops))):
+        return None, "Some stops are not reachable from the start"
+
+    order, method, converged = solve_order(matrix, round_trip, time_budget_s)
+    sequence = order + [order[0]] if round_trip and len(order) > 1 else order
+
+    legs = []
+    path = [stops[order[0]]]
+    for i, j in zip(sequence, sequence[1:]):
+        if matrix[i][j] == math.inf:
+            return None, "Some stops cannot be reached from each other"
+        legs.append((i, j, matrix[i][j], paths[(i, j)]))
+        path.extend(paths[(i, j)][1:])
+
+    return {
+        "order": order,
+        "legs": legs,
+        "path": path,
+        "cost": sum(leg[2] for leg in legs),
+        "method": method,
+        "converged": converged,
+        "searches": len(stops),
+    }, None
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from . import localize, navigate
+from . import localize, navigate, tiles
 
 # Create main router that includes all route modules
 api_router = APIRouter()
@@ -7,5 +7,6 @@ api_router = APIRouter()
 # Include all route modules
 api_router.include_router(localize.router, prefix="/api", tags=["localization"])
 api_router.include_router(navigate.router, prefix="/api", tags=["navigation"])
+api_router.include_router(tiles.router, prefix="/api", tags=["tiles"])
 
 __all__ = ["api_router"]
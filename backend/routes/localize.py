@@ -1,12 +1,11 @@
 from fastapi import APIRouter, UploadFile, File
+from fastapi.responses import JSONResponse
 from typing import Optional
 import shutil
 import os
 from pathlib import Path
-
-# Import your building localizers
-from Localization.Admin.LC_Admin import localize_admin
-from Localization.Library.LC_Lib import localize_library
+from maps.footprint_index import FootprintIndex
+from building_registry import BuildingRegistry
 
 router = APIRouter()
 
@@ -14,29 +13,84 @@ router = APIRouter()
 UPLOAD_DIR = Path(r"C:\WOLF\Private\VS_CODE\FYP_TEST\TEST_Hybrid\temp_uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
-# Map building types to functions
-LOCALIZERS = {
-    "admin": localize_admin,
-    "library": localize_library,
-}
+# Building bundles discovered from the data directory; banks load on first use
+registry = BuildingRegistry()
+
+# Building footprints exported by maps/script.py, for picking banks from a GPS fix
+FOOTPRINTS_PATH = Path(__file__).resolve().parent.parent / "maps" / "building_footprints.json"
+footprint_index = FootprintIndex.from_file(FOOTPRINTS_PATH) if FOOTPRINTS_PATH.exists() else None
+
+# Banks tried per image when the building comes from GPS
+MAX_GPS_CANDIDATES = 3
+DEFAULT_ACCURACY_M = 20.0
+
+def _gps_candidates(lat, lon, accuracy_m, limit):
+    """Nearby buildings as dicts, nearest first"""
+    return [
+        dict(record, distance_m=dist, has_localizer=record["bank"] in registry)
+        for record, dist in footprint_index.candidates(lat, lon, accuracy_m, max_results=limit)
+    ]
+
+@router.get("/localize/buildings")
+async def localize_buildings():
+    """Discovered building bundles and bank cache metrics (loads, hits, evictions)"""
+    return {
+        "buildings": {name: b["aliases"] for name, b in registry.bundles.items()},
+        "stats": registry.stats()
+    }
+
+@router.get("/localize/candidates")
+async def localize_candidates(lat: float, lon: float, accuracy_m: float = DEFAULT_ACCURACY_M, limit: int = 5):
+    """
+    Buildings around a GPS fix (within accuracy_m plus a margin), nearest first,
+    so the client knows which building(s) to localize against
+    """
+    if footprint_index is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "No building footprints exported (run maps/script.py)"}
+        )
+    return {"candidates": _gps_candidates(lat, lon, accuracy_m, limit)}
 
 @router.post("/localize/")
-async def localize_building(building: str, image: UploadFile = File(...)):
+async def localize_building(
+    building: Optional[str] = None,
+    lat: Optional[float] = None,
+    lon: Optional[float] = None,
+    accuracy_m: float = DEFAULT_ACCURACY_M,
+    image: UploadFile = File(...),
+):
     """
     Receives a building name and image, returns 2D campus coordinates
+    Instead of a building, a GPS fix (lat, lon, accuracy_m) can be sent: the
+    nearest buildings that have a localizer are tried in order of distance
     """
-    building = building.lower()
-
-    if building not in LOCALIZERS:
-        return {"success": False, "reason": f"Unknown building '{building}'"}
+    if building is not None:
+        if building not in registry:
+            return {"success": False, "reason": f"Unknown building '{building}'"}
+        buildings = [registry.resolve(building)]
+    elif lat is not None and lon is not None:
+        if footprint_index is None:
+            return {"success": False, "reason": "No building footprints exported, send building instead"}
+        # A building split into several footprints still gets one attempt
+        nearby = [registry.resolve(c["bank"]) for c in _gps_candidates(lat, lon, accuracy_m, limit=20) if c["has_localizer"]]
+        buildings = list(dict.fromkeys(nearby))[:MAX_GPS_CANDIDATES]
+        if not buildings:
+            return {"success": False, "reason": "No localizable building near this position"}
+    else:
+        return {"success": False, "reason": "Send building, or lat and lon"}
 
     # Save uploaded image to disk
     img_path = UPLOAD_DIR / image.filename
     with open(img_path, "wb") as f:
         shutil.copyfileobj(image.file, f)
 
-    # Call the corresponding localization function
-    result = LOCALIZERS[building](str(img_path))
+    # Call the corresponding localization function(s), nearest building first
+    for name in buildings:
+        result = registry.localize(name, str(img_path))
+        if result.get("success"):
+            result.setdefault("building", name)
+            break
 
     # Optional: delete the temp file after processing
     try:
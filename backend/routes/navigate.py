@@ -1,31 +1,160 @@
 # routes/navigate.py
-from fastapi import APIRouter
-from fastapi.responses import JSONResponse
-from Navigation.Maps_campus import CampusNavigator
-from pathlib import Path
+from fastapi import APIRouter, Header
+from fastapi.responses import JSONResponse, Response
+from maps.Maps_campus import WALKING_SPEED_MPS, SEARCH_MODES
+from maps.map_registry import MapRegistry
+from maps.route_renderer import IMAGE_FORMATS
+from maps.tour import plan_tour
+from maps.alternatives import k_alternatives
+from maps.route_format import MEDIA_TYPE as COMPACT_MEDIA_TYPE, compact_route
+from concurrent.futures import ThreadPoolExecutor
+from pydantic import BaseModel
+from typing import List, Optional
+import asyncio
 import json
+import logging
+import math
+import os
+import time
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-GRAPH_PATH = Path("maps/campus_graph.json")
+# Named maps (maps/maps.json): each map's navigator, spatial index, reroute /
+# isochrone caches, route tracker, renderer and distance fields are built on
+# its first request and dropped least-recently-used under a memory budget.
+# Requests pick a map with map_id; without one they use the default map
+map_registry = MapRegistry()
 
-# Load campus navigator
-nav = CampusNavigator(str(GRAPH_PATH))
+MAX_ISOCHRONE_MINUTES = 60
 
-# Map building names to nodes (use same as LOCATIONS in Maps_campus)
-LOCATIONS = nav.nodes  # Or define a subset mapping building names to node IDs
+# Batch routing: limits and the pool that keeps large batches off the event loop
+MAX_BATCH_PAIRS = 1000
+BATCH_INLINE_SOURCES = 4
+batch_executor = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="navigate-batch")
+
+# Route response formats: ?fmt= wins, otherwise Accept: application/vnd.mapmate.route+json picks compact
+RESPONSE_FORMATS = ("json", "compact")
+
+def _response_format(fmt, accept):
+    """'json' or 'compact', or None for an unknown fmt"""
+    if fmt is None:
+        return "compact" if accept and COMPACT_MEDIA_TYPE in accept else "json"
+    return fmt if fmt in RESPONSE_FORMATS else None
+
+async def _campus(map_id, tiled=False):
+    """
+    (map, None) for a request's map_id (default map if None), or (None, error response)
+    First loads run on the worker pool. Tiled maps only serve endpoints passing tiled=True
+    """
+    if map_id not in map_registry:
+        return None, JSONResponse(
+            status_code=404,
+            content={"error": f"Unknown map '{map_id}', expected one of {list(map_registry.configs)}"}
+        )
+    campus = map_registry.loaded(map_id)
+    if campus is None:
+        loop = asyncio.get_running_loop()
+        campus = await loop.run_in_executor(batch_executor, map_registry.get, map_id)
+    if campus.tiled and not tiled:
+        return None, JSONResponse(
+            status_code=400,
+            content={"error": f"Map '{campus.id}' is tiled; only /navigate routes on it"}
+        )
+    return campus, None
+
+def _unknown_format(fmt):
+    return JSONResponse(
+        status_code=400,
+        content={"error": f"Unknown format '{fmt}', expected one of {list(RESPONSE_FORMATS)}"}
+    )
+
+def _route_detail(nav, path, maneuvers, detail):
+    """Per-node geometry and the structured maneuvers, only sent when the caller asks for detail"""
+    if not detail:
+        return {}
+    return {"geometry": nav.expand_geometry(path), "maneuvers": maneuvers}
+
+def _compact_response(body, if_none_match, **volatile):
+    """
+    Send a compact_route body with its hash as ETag (304 if the client has it).
+    volatile keys (stats, cache_hit) are added after hashing.
+    """
+    etag = f'"{body["hash"]}"'
+    headers = {"ETag": etag, "Vary": "Accept"}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    body.update(volatile)
+    return JSONResponse(content=body, media_type=COMPACT_MEDIA_TYPE, headers=headers)
+
+# Alternative routes: limits on k and the solver time budget
+MAX_ALTERNATIVES = 5
+ALTERNATIVES_TIME_BUDGET_MS = 200
+MAX_ALTERNATIVES_TIME_BUDGET_MS = 1000
+
+# Multi-stop tours: stop limit and the default / maximum solver time budget
+MAX_TOUR_STOPS = 50
+TOUR_TIME_BUDGET_MS = 200
+MAX_TOUR_TIME_BUDGET_MS = 2000
+
+class RoutePair(BaseModel):
+    start_node: str
+    destination_node: str
+
+class BatchNavigateRequest(BaseModel):
+    pairs: List[RoutePair]
+    detail: bool = False
+    map_id: Optional[str] = None
+
+class TourRequest(BaseModel):
+    stops: List[str]
+    round_trip: bool = False
+    time_budget_ms: int = TOUR_TIME_BUDGET_MS
+    detail: bool = False
+    map_id: Optional[str] = None
 
 @router.post("/navigate")
-async def navigate(start_node: str, destination_node: str):
+async def navigate(
+    start_node: str,
+    destination_node: str,
+    mode: str = "astar",
+    detail: bool = False,
+    fmt: Optional[str] = None,
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    map_id: Optional[str] = None,
+):
+    """
+    Route between two node IDs
+    fmt=compact (or Accept: application/vnd.mapmate.route+json) returns the
+    compact format from maps/route_format.py with an ETag
+    detail=true adds per-node geometry and structured maneuvers to the JSON form
+    """
+    response_format = _response_format(fmt, accept)
+    if response_format is None:
+        return _unknown_format(fmt)
+
+    campus, error = await _campus(map_id, tiled=True)
+    if error:
+        return error
+    nav = campus.nav
+
     # Validate nodes
     if start_node not in nav.nodes or destination_node not in nav.nodes:
         return JSONResponse(
             status_code=404,
             content={"error": "Invalid start or destination node"}
         )
+    if mode not in SEARCH_MODES:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"Unknown mode '{mode}', expected one of {list(SEARCH_MODES)}"}
+        )
 
     # Get path
-    path, status = nav.get_path(start_node, destination_node)
+    stats = {}
+    path, status = nav.get_path(start_node, destination_node, mode=mode, stats=stats)
+    logger.info("navigate %s -> %s mode=%s expanded=%d", start_node, destination_node, mode, stats["expanded"])
     if path is None:
         return JSONResponse(
             status_code=404,
@@ -33,9 +162,823 @@ async def navigate(start_node: str, destination_node: str):
         )
 
     # Generate instructions
-    instructions = nav.get_readable_instructions(path)
+    maneuvers = nav.get_maneuvers(path)
+    if response_format == "compact":
+        distance_m = maneuvers[-1]["distance_m"] if maneuvers else 0.0
+        body = compact_route(path, nav.expand_geometry(path), maneuvers, distance_m)
+        return _compact_response(body, if_none_match, stats=stats)
+    instructions = nav.format_instructions(maneuvers)
+
+    return {
+        "path": path,
+        "instructions": instructions,
+        **_route_detail(nav, path, maneuvers, detail),
+        "stats": stats
+    }
+
+@router.post("/navigate/from-point")
+async def navigate_from_point(
+    map_x: float,
+    map_y: float,
+    destination_node: str,
+    detail: bool = False,
+    fmt: Optional[str] = None,
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    map_id: Optional[str] = None,
+):
+    """
+    Same as /navigate, but starts from localized map coordinates
+    (map_x, map_y from /localize) instead of a node ID.
+    The point is snapped onto the nearest edge and the route enters the graph mid-edge.
+    destination_node may be a node ID or a building name from the map's locations.
+    In the compact format the polyline starts at the snapped point.
+    """
+    response_format = _response_format(fmt, accept)
+    if response_format is None:
+        return _unknown_format(fmt)
+
+    campus, error = await _campus(map_id)
+    if error:
+        return error
+    nav = campus.nav
+
+    destination_node = campus.resolve(destination_node)
+    if destination_node not in nav.nodes:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "Invalid destination node"}
+        )
+
+    snap = campus.spatial_index.snap_to_edge(map_x, map_y)
+    if snap is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "Campus graph has no edges to snap to"}
+        )
+
+    u, v = snap["edge"]
+    stats = {}
+    path, status = nav.get_path_from_edge(u, v, snap["t"], destination_node, stats=stats)
+    logger.info("navigate (%.1f, %.1f) -> %s expanded=%d", map_x, map_y, destination_node, stats["expanded"])
+    if path is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": status}
+        )
+
+    # Walk from the snapped point to the first node of the route
+    entry_dist = nav.edge_length(u, v) * (snap["t"] if path[0] == u else 1 - snap["t"])
+    maneuvers = nav.get_maneuvers(path)
+    snapped = {
+        "x": snap["x"],
+        "y": snap["y"],
+        "edge": [u, v],
+        "offset_m": snap["distance"] * campus.meters_per_pixel
+    }
+    if response_format == "compact":
+        entry_m = round(entry_dist * campus.meters_per_pixel, 1)
+        distance_m = round(entry_m + (maneuvers[-1]["distance_m"] if maneuvers else 0.0), 1)
+        geometry = [[snap["x"], snap["y"]]] + nav.expand_geometry(path)
+        body = compact_route(path, geometry, maneuvers, distance_m, entry_m=entry_m, snapped=snapped)
+        return _compact_response(body, if_none_match, stats=stats)
+    instructions = [f"• Join the path towards {path[0]} ({int(entry_dist * campus.meters_per_pixel)}m)"]
+    instructions += nav.format_instructions(maneuvers)
+
+    return {
+        "path": path,
+        "instructions": instructions,
+        **_route_detail(nav, path, maneuvers, detail),
+        "snapped": snapped,
+        "stats": stats
+    }
+
+@router.post("/navigate/nearest")
+async def navigate_nearest(
+    start_node: str,
+    category: Optional[str] = None,
+    max_distance_m: Optional[float] = None,
+    select: Optional[str] = None,
+    detail: bool = False,
+    map_id: Optional[str] = None,
+):
+    """
+    Distance/ETA list from start_node to every building in the map's locations
+    (or only those in its categories[category]), sorted nearest first.
+    One bounded Dijkstra pass covers all destinations; instructions are only
+    generated for the selected result (select=<name>, default the nearest).
+    """
+    campus, error = await _campus(map_id)
+    if error:
+        return error
+    nav = campus.nav
+
+    start_node = campus.resolve(start_node)
+    if start_node not in nav.nodes:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "Invalid start node"}
+        )
+
+    if category is None:
+        names = list(campus.locations)
+    elif category in campus.categories:
+        names = campus.categories[category]
+    else:
+        return JSONResponse(
+            status_code=404,
+            content={"error": f"Unknown category '{category}', expected one of {list(campus.categories)}"}
+        )
+
+    # Several names may share a node
+    targets = {}
+    for name in names:
+        targets.setdefault(campus.locations[name], []).append(name)
+
+    cutoff = math.inf if max_distance_m is None else max_distance_m / campus.meters_per_pixel
+    stats = {}
+    found = nav.get_paths_to_many(start_node, targets, cutoff=cutoff, stats=stats)
+    logger.info("navigate nearest %s category=%s expanded=%d", start_node, category, stats["expanded"])
+
+    # Ranked by route cost (penalties included), reported in walked meters
+    ranked = []
+    for node, (dist, path) in found.items():
+        meters = nav.path_length(path) * campus.meters_per_pixel
+        for name in targets[node]:
+            ranked.append((dist, {
+                "name": name,
+                "node": node,
+                "distance_m": round(meters, 1),
+                "eta_min": round(meters / WALKING_SPEED_MPS / 60, 1),
+            }))
+    ranked.sort(key=lambda r: r[0])
+    results = [r for _, r in ranked]
+
+    if not results:
+        return {"results": [], "selected": None, "stats": stats}
+
+    chosen = results[0] if select is None else next((r for r in results if r["name"] == select), None)
+    if chosen is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": f"'{select}' is not among the reachable results"}
+        )
+
+    path = found[chosen["node"]][1]
+    maneuvers = nav.get_maneuvers(path)
+    return {
+        "results": results,
+        "selected": {
+            "name": chosen["name"],
+            "path": path,
+            "instructions": nav.format_instructions(maneuvers),
+            **_route_detail(nav, path, maneuvers, detail)
+        },
+        "stats": stats
+    }
+
+@router.post("/navigate/isochrone")
+async def navigate_isochrone(
+    start_node: str,
+    minutes: float,
+    walking_speed_mps: float = WALKING_SPEED_MPS,
+    hull: bool = False,
+    map_id: Optional[str] = None,
+):
+    """
+    Everything reachable from start_node within `minutes` of walking:
+    reachable nodes, edges walkable end to end, edges cut off part way
+    (with the point where time runs out) and optionally a hull polygon.
+    One bounded Dijkstra, cached per (node, cutoff, graph version).
+    """
+    campus, error = await _campus(map_id)
+    if error:
+        return error
+    nav = campus.nav
+
+    start_node = campus.resolve(start_node)
+    if start_node not in nav.nodes:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "Invalid start node"}
+        )
+    if not 0 < minutes <= MAX_ISOCHRONE_MINUTES or walking_speed_mps <= 0:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"minutes must be in (0, {MAX_ISOCHRONE_MINUTES}] and walking_speed_mps positive"}
+        )
+
+    started = time.perf_counter()
+    cutoff = minutes * 60 * walking_speed_mps / campus.meters_per_pixel
+    result, hit = campus.isochrone_cache.get(start_node, cutoff, hull=hull)
+
+    response = {
+        "nodes": [
+            {
+                "node": node,
+                "distance_m": round(dist * campus.meters_per_pixel, 1),
+                "eta_min": round(dist * campus.meters_per_pixel / walking_speed_mps / 60, 2)
+            }
+            for node, dist in result["nodes"].items()
+        ],
+        "edges": [[u, v] for u, v in result["edges"]],
+        "partial_edges": [
+            {"from": u, "to": v, "fraction": round(f, 3), "end": end}
+            for u, v, f, end in result["partial"]
+        ],
+        "cutoff_m": round(cutoff * campus.meters_per_pixel, 1),
+        "cache_hit": hit,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+    if hull:
+        response["hull"] = result["hull"]
+    return response
+
+@router.post("/navigate/reroute")
+async def navigate_reroute(
+    destination_node: str,
+    current_node: Optional[str] = None,
+    map_x: Optional[float] = None,
+    map_y: Optional[float] = None,
+    detail: bool = False,
+    fmt: Optional[str] = None,
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    map_id: Optional[str] = None,
+):
+    """
+    Updated route to destination_node from the user's current position,
+    given either as current_node or as map_x/map_y (snapped onto the nearest edge).
+    Uses a cached reverse shortest-path tree for the destination, so after the
+    first request per destination no search is run at all.
+    Supports fmt=compact like /navigate; an unchanged route comes back as 304.
+    """
+    response_format = _response_format(fmt, accept)
+    if response_format is None:
+        return _unknown_format(fmt)
+
+    campus, error = await _campus(map_id)
+    if error:
+        return error
+    nav = campus.nav
+
+    destination_node = campus.resolve(destination_node)
+    if destination_node not in nav.nodes:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "Invalid destination node"}
+        )
+
+    snapped = None
+    if current_node is not None:
+        current_node = campus.resolve(current_node)
+        if current_node not in nav.nodes:
+            return JSONResponse(
+                status_code=404,
+                content={"error": "Invalid current node"}
+            )
+        path, dist, hit = campus.reroute_cache.route(current_node, destination_node)
+    elif map_x is not None and map_y is not None:
+        snap = campus.spatial_index.snap_to_edge(map_x, map_y)
+        if snap is None:
+            return JSONResponse(
+                status_code=404,
+                content={"error": "Campus graph has no edges to snap to"}
+            )
+
+        # Leave the edge by whichever endpoint is cheaper to the destination
+        # (penalized weight); the walk onto the path is reported in meters
+        u, v = snap["edge"]
+        weight = nav.edge_weight(u, v)
+        length = nav.edge_length(u, v)
+        path_u, dist_u, hit = campus.reroute_cache.route(u, destination_node)
+        path_v, dist_v, _ = campus.reroute_cache.route(v, destination_node)
+        options = [
+            (dist_u + snap["t"] * weight, snap["t"] * length, path_u) if path_u else None,
+            (dist_v + (1 - snap["t"]) * weight, (1 - snap["t"]) * length, path_v) if path_v else None,
+        ]
+        options = [o for o in options if o is not None]
+        if options:
+            _, entry_dist, path = min(options, key=lambda o: o[0])
+        else:
+            entry_dist, path = 0, None
+
+        snapped = {
+            "x": snap["x"],
+            "y": snap["y"],
+            "edge": [u, v],
+            "offset_m": snap["distance"] * campus.meters_per_pixel
+        }
+    else:
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Provide current_node or both map_x and map_y"}
+        )
+
+    if path is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "No path found (Start and Goal are not connected)"}
+        )
+
+    maneuvers = nav.get_maneuvers(path)
+    if snapped is None:
+        entry_dist = 0
+    distance_m = round((entry_dist + nav.path_length(path)) * campus.meters_per_pixel, 1)
+    if response_format == "compact":
+        geometry = nav.expand_geometry(path)
+        extra = {}
+        if snapped is not None:
+            geometry = [[snapped["x"], snapped["y"]]] + geometry
+            extra = {"entry_m": round(entry_dist * campus.meters_per_pixel, 1), "snapped": snapped}
+        body = compact_route(path, geometry, maneuvers, distance_m, **extra)
+        return _compact_response(body, if_none_match, cache_hit=hit)
+    instructions = nav.format_instructions(maneuvers)
+    if snapped is not None:
+        instructions.insert(0, f"• Join the path towards {path[0]} ({int(entry_dist * campus.meters_per_pixel)}m)")
+
+    response = {
+        "path": path,
+        "instructions": instructions,
+        **_route_detail(nav, path, maneuvers, detail),
+        "distance_m": distance_m,
+        "cache_hit": hit
+    }
+    if snapped is not None:
+        response["snapped"] = snapped
+    return response
+
+@router.post("/navigate/alternatives")
+async def navigate_alternatives(
+    start_node: str,
+    destination_node: str,
+    k: int = 3,
+    max_overlap: float = 0.8,
+    time_budget_ms: int = ALTERNATIVES_TIME_BUDGET_MS,
+    detail: bool = False,
+    map_id: Optional[str] = None,
+):
+    """
+    Up to k routes ranked by cost (Yen's k-shortest paths). Routes sharing more
+    than max_overlap of their length with an earlier route are skipped.
+    Spur searches reuse the destination's cached reverse tree (same cache as
+    /navigate/reroute), so repeated queries to one destination stay cheap.
+    """
+    campus, error = await _campus(map_id)
+    if error:
+        return error
+    nav = campus.nav
+
+    start_node = campus.resolve(start_node)
+    destination_node = campus.resolve(destination_node)
+    if start_node not in nav.nodes or destination_node not in nav.nodes:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "Invalid start or destination node"}
+        )
+    if not 1 <= k <= MAX_ALTERNATIVES:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"k must be between 1 and {MAX_ALTERNATIVES}"}
+        )
+    if not 0 <= max_overlap <= 1:
+        return JSONResponse(
+            status_code=400,
+            content={"error": "max_overlap must be between 0 and 1"}
+        )
+
+    start_time = time.perf_counter()
+    dist, parent, hit = campus.reroute_cache.get_tree(destination_node)
+    budget_s = min(max(time_budget_ms, 0), MAX_ALTERNATIVES_TIME_BUDGET_MS) / 1000
+    routes, stats = k_alternatives(nav, (dist, parent), start_node, destination_node, k, max_overlap, budget_s)
+    stats["cache_hit"] = hit
+    stats["elapsed_ms"] = round((time.perf_counter() - start_time) * 1000, 1)
+    logger.info(
+        "navigate alternatives %s -> %s k=%d found=%d spurs=%d in %.1fms",
+        start_node, destination_node, k, len(routes), stats["spur_searches"], stats["elapsed_ms"]
+    )
+    if not routes:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "No path found (Start and Goal are not connected)"}
+        )
+
+    results = []
+    for rank, (_, path, overlap) in enumerate(routes):
+        maneuvers = nav.get_maneuvers(path)
+        results.append({
+            "rank": rank,
+            "path": path,
+            "instructions": nav.format_instructions(maneuvers),
+            **_route_detail(nav, path, maneuvers, detail),
+            "distance_m": round(nav.path_length(path) * campus.meters_per_pixel, 1),
+            "overlap": round(overlap, 3)
+        })
+    return {"routes": results, "stats": stats}
+
+@router.post("/navigate/open-area")
+async def navigate_open_area(map_x: float, map_y: float, destination_node: str, map_id: Optional[str] = None):
+    """
+    Route from any map position (lawns, plazas) straight over the map image,
+    instead of snapping to the graph. Uses a distance field per destination:
+    built once (~0.5s), then every route is a descent on the memory-mapped field.
+    Edge closures from /navigate/edges do not apply here.
+    """
+    campus, error = await _campus(map_id)
+    if error:
+        return error
+    nav = campus.nav
+
+    name = destination_node
+    destination_node = campus.resolve(destination_node)
+    if destination_node not in nav.nodes:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "Invalid destination node"}
+        )
+
+    if campus.image_path is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": f"Map '{campus.id}' has no map image for open-area routing"}
+        )
+
+    x, y = nav.nodes[destination_node]
+    start_time = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        field, cached = await loop.run_in_executor(batch_executor, campus.field_router.field, destination_node, x, y)
+    except (OSError, ValueError) as e:
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"Distance field unavailable: {e}"}
+        )
 
+    result = campus.field_router.route(field, map_x, map_y)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    logger.info("navigate open-area (%.1f, %.1f) -> %s cached=%s in %.1fms", map_x, map_y, destination_node, cached, elapsed_ms)
+    if result is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "No walkable route from this position"}
+        )
+
+    points, dist = result
+    distance_m = round(float(dist) * campus.meters_per_pixel, 1)
     return {
+        "geometry": points,
+        "instructions": [
+            f"• Walk towards {name} ({int(distance_m)}m)",
+            f"🏁 Arrived! Total Distance: {int(distance_m)}m"
+        ],
+        "distance_m": distance_m,
+        "eta_min": round(distance_m / WALKING_SPEED_MPS / 60, 1),
+        "stats": {"field_cached": cached, "elapsed_ms": round(elapsed_ms, 1)}
+    }
+
+@router.post("/navigate/track")
+async def start_tracking(start_node: str, destination_node: str, mode: str = "astar", map_id: Optional[str] = None):
+    """
+    Route like /navigate, and keep it server-side as an active route so the
+    client can send position updates to /navigate/track/{route_id}/update
+    (with the same map_id: active routes belong to their map)
+    """
+    campus, error = await _campus(map_id)
+    if error:
+        return error
+    nav = campus.nav
+
+    start_node = campus.resolve(start_node)
+    destination_node = campus.resolve(destination_node)
+    if start_node not in nav.nodes or destination_node not in nav.nodes:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "Invalid start or destination node"}
+        )
+    if mode not in SEARCH_MODES:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"Unknown mode '{mode}', expected one of {list(SEARCH_MODES)}"}
+        )
+
+    path, status = nav.get_path(start_node, destination_node, mode=mode)
+    if path is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": status}
+        )
+
+    route_id, route = campus.route_tracker.start(path)
+    return {
+        "route_id": route_id,
+        "map_id": campus.id,
         "path": path,
-        "instructions": instructions
+        "geometry": route.points,
+        "instructions": nav.format_instructions(route.maneuvers),
+        "maneuvers": route.maneuvers,
+        "distance_m": round(route.total * campus.meters_per_pixel, 1)
+    }
+
+@router.post("/navigate/track/{route_id}/update")
+async def update_tracking(route_id: str, map_x: float, map_y: float, map_id: Optional[str] = None):
+    """
+    Project the current position onto the active route: progress_m,
+    remaining_m, eta_min, snapped point, deviation_m, off_route and the
+    next maneuver (with distance_to_m). On off_route, call /navigate/reroute
+    and start a new track.
+    """
+    campus, error = await _campus(map_id)
+    if error:
+        return error
+
+    report = campus.route_tracker.update(route_id, map_x, map_y)
+    if report is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "Unknown or expired route_id"}
+        )
+    return report
+
+@router.delete("/navigate/track/{route_id}")
+async def stop_tracking(route_id: str, map_id: Optional[str] = None):
+    """Forget an active route (arrived or cancelled)"""
+    campus, error = await _campus(map_id)
+    if error:
+        return error
+
+    return {"stopped": campus.route_tracker.stop(route_id)}
+
+@router.post("/navigate/edges")
+async def update_edge(u: str, v: str, penalty: float = 1.0, closed: bool = False, map_id: Optional[str] = None):
+    """
+    Close/reopen a walkway or penalize it (penalty multiplies the loaded weight, >= 1).
+    penalty=1 and closed=false restores the edge. Takes effect immediately:
+    cached reroute trees are repaired incrementally rather than rebuilt.
+    """
+    campus, error = await _campus(map_id)
+    if error:
+        return error
+    nav = campus.nav
+
+    if not penalty >= 1:
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Penalty must be >= 1"}
+        )
+
+    start = time.perf_counter()
+    changes, status = nav.set_edge_state(u, v, penalty=penalty, closed=closed)
+    if changes is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": status}
+        )
+
+    repaired = campus.reroute_cache.apply_edge_changes(changes)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info("edge %s-%s penalty=%s closed=%s repaired=%d in %.2fms", u, v, penalty, closed, repaired, elapsed_ms)
+
+    return {
+        "edge": [u, v],
+        "penalty": penalty,
+        "closed": closed,
+        "graph_version": nav.version,
+        "repaired_trees": repaired,
+        "elapsed_ms": round(elapsed_ms, 3)
+    }
+
+@router.get("/navigate/edges")
+async def list_edge_overrides(map_id: Optional[str] = None):
+    """Edges currently closed or penalized"""
+    campus, error = await _campus(map_id)
+    if error:
+        return error
+    nav = campus.nav
+
+    return {
+        "graph_version": nav.version,
+        "edges": [
+            {"edge": [u, v], **state} for (u, v), state in nav.edge_overrides.items()
+        ]
+    }
+
+def _routes_from_source(nav, start_node, destinations, detail=False):
+    """One search tree from start_node, shared by every destination requested for it"""
+    found = nav.get_paths_to_many(start_node, destinations)
+    results = {}
+    for dest in destinations:
+        if dest not in found:
+            results[dest] = {"error": "No path found (Start and Goal are not connected)"}
+            continue
+        path = found[dest][1]
+        maneuvers = nav.get_maneuvers(path)
+        results[dest] = {
+            "path": path,
+            "instructions": nav.format_instructions(maneuvers),
+            **_route_detail(nav, path, maneuvers, detail)
+        }
+    return results
+
+@router.post("/navigate/batch")
+async def navigate_batch(request: BatchNavigateRequest):
+    """
+    Routes for many (start_node, destination_node) pairs in one request.
+    Pairs are grouped by start node so each source runs a single search;
+    larger batches run on a worker pool so the event loop stays responsive.
+    Node IDs or building names from the map's locations are accepted. Results
+    come back in request order with the same path/instructions shape as /navigate.
+    """
+    campus, error = await _campus(request.map_id)
+    if error:
+        return error
+    nav = campus.nav
+
+    if len(request.pairs) > MAX_BATCH_PAIRS:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"Too many pairs ({len(request.pairs)}), limit is {MAX_BATCH_PAIRS}"}
+        )
+
+    resolved = [
+        (campus.resolve(p.start_node), campus.resolve(p.destination_node))
+        for p in request.pairs
+    ]
+
+    groups = {}
+    for start, dest in resolved:
+        if start in nav.nodes and dest in nav.nodes:
+            groups.setdefault(start, set()).add(dest)
+
+    start_time = time.perf_counter()
+    if len(groups) <= BATCH_INLINE_SOURCES:
+        routed = {start: _routes_from_source(nav, start, dests, request.detail) for start, dests in groups.items()}
+    else:
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(batch_executor, nav.consistent, _routes_from_source, nav, start, dests, request.detail)
+            for start, dests in groups.items()
+        ]
+        routed = dict(zip(groups, await asyncio.gather(*futures)))
+    logger.info(
+        "navigate batch pairs=%d sources=%d in %.1fms",
+        len(resolved), len(groups), (time.perf_counter() - start_time) * 1000
+    )
+
+    results = []
+    for pair, (start, dest) in zip(request.pairs, resolved):
+        entry = {"start_node": pair.start_node, "destination_node": pair.destination_node}
+        if start not in nav.nodes or dest not in nav.nodes:
+            entry["error"] = "Invalid start or destination node"
+        else:
+            entry.update(routed[start][dest])
+        results.append(entry)
+
+    return {"results": results, "sources": len(groups)}
+
+@router.post("/navigate/tour")
+async def navigate_tour(request: TourRequest):
+    """
+    Best order to visit several stops (node IDs or building names from the
+    map's locations). The first stop is the start; round_trip comes back to it.
+    Exact for small tours, nearest neighbour + 2-opt/Or-opt within
+    time_budget_ms otherwise.
+    """
+    campus, error = await _campus(request.map_id)
+    if error:
+        return error
+    nav = campus.nav
+
+    if not 2 <= len(request.stops) <= MAX_TOUR_STOPS:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"A tour needs between 2 and {MAX_TOUR_STOPS} stops"}
+        )
+    stops = [campus.resolve(s) for s in request.stops]
+    invalid = [name for name, node in zip(request.stops, stops) if node not in nav.nodes]
+    if invalid:
+        return JSONResponse(
+            status_code=404,
+            content={"error": f"Invalid stops: {invalid}"}
+        )
+    if len(set(stops)) != len(stops):
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Stops must be distinct"}
+        )
+
+    budget_s = min(max(request.time_budget_ms, 0), MAX_TOUR_TIME_BUDGET_MS) / 1000
+    start_time = time.perf_counter()
+    if len(stops) <= BATCH_INLINE_SOURCES:
+        tour, error = plan_tour(nav, stops, request.round_trip, budget_s)
+    else:
+        loop = asyncio.get_running_loop()
+        tour, error = await loop.run_in_executor(
+            batch_executor, nav.consistent, plan_tour, nav, stops, request.round_trip, budget_s
+        )
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    logger.info("navigate tour stops=%d method=%s in %.1fms", len(stops), tour and tour["method"], elapsed_ms)
+    if error:
+        return JSONResponse(
+            status_code=404,
+            content={"error": error}
+        )
+
+    # Directions per leg, so every stop gets its own arrival
+    legs, instructions = [], []
+    for i, j, _, path in tour["legs"]:
+        maneuvers = nav.get_maneuvers(path)
+        instructions.append(f"📍 {request.stops[i]} → {request.stops[j]}")
+        instructions += nav.format_instructions(maneuvers)
+        legs.append({
+            "from": request.stops[i],
+            "to": request.stops[j],
+            "path": path,
+            **_route_detail(nav, path, maneuvers, request.detail),
+            "distance_m": round(nav.path_length(path) * campus.meters_per_pixel, 1)
+        })
+
+    return {
+        "order": [request.stops[i] for i in tour["order"]],
+        "path": tour["path"],
+        "instructions": instructions,
+        "legs": legs,
+        "distance_m": round(nav.path_length(tour["path"]) * campus.meters_per_pixel, 1),
+        "stats": {
+            "method": tour["method"],
+            "converged": tour["converged"],
+            "searches": tour["searches"],
+            "elapsed_ms": round(elapsed_ms, 1)
+        }
+    }
+
+@router.get("/navigate/render")
+async def render_route(
+    start_node: str,
+    destination_node: str,
+    fmt: str = "png",
+    crop: bool = True,
+    map_id: Optional[str] = None,
+):
+    """
+    Route image over the map (PNG or WebP), optionally cropped to the
+    route's bounding box. Images are cached per route and graph version.
+    """
+    campus, error = await _campus(map_id)
+    if error:
+        return error
+    nav = campus.nav
+
+    start_name, dest_name = start_node, destination_node
+    start_node = campus.resolve(start_node)
+    destination_node = campus.resolve(destination_node)
+    if start_node not in nav.nodes or destination_node not in nav.nodes:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "Invalid start or destination node"}
+        )
+    if fmt not in IMAGE_FORMATS:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"Unknown format '{fmt}', expected one of {list(IMAGE_FORMATS)}"}
+        )
+
+    path, status = nav.get_path(start_node, destination_node)
+    if path is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": status}
+        )
+
+    # Drawing and encoding take tens of ms: only cache hits are served on the event loop
+    render_args = (path, fmt, crop, start_name, dest_name)
+    image = campus.renderer.cached(*render_args) if campus.renderer_ready else None
+    if image is None:
+        loop = asyncio.get_running_loop()
+        image = await loop.run_in_executor(
+            batch_executor, lambda: nav.consistent(campus.renderer.render, *render_args)
+        )
+    return Response(
+        content=image,
+        media_type=f"image/{fmt}",
+        headers={"Cache-Control": "public, max-age=60", "X-Graph-Version": str(nav.version)}
+    )
+
+@router.get("/navigate/maps")
+async def list_maps():
+    """Maps this server can route on (map_id values), which are loaded, and registry stats"""
+    stats = map_registry.stats()
+    return {
+        "default": map_registry.default,
+        "maps": [
+            {
+                "map_id": map_id,
+                "name": config["name"],
+                "locations": list(config["locations"]),
+                "categories": list(config["categories"]),
+                "tiled": config["tiles"] is not None,
+                "loaded": map_id in stats["resident"]
+            }
+            for map_id, config in map_registry.configs.items()
+        ],
+        "stats": stats
     }
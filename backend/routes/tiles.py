@@ -0,0 +1,93 @@
+# routes/tiles.py
+from fastapi import APIRouter, Header
+from fastapi.responses import JSONResponse, Response
+from maps.tile_renderer import TILE_SIZE, BG_COLOR, MANIFEST_FILE, load_manifest
+from pathlib import Path
+from typing import Optional
+import cv2
+import numpy as np
+import os
+
+router = APIRouter()
+
+# Written by maps/script.py (render_pyramid)
+TILE_DIR = Path(__file__).resolve().parent.parent / "maps" / "tiles"
+
+# Tiles only change when script.py is re-run; after max-age, clients
+# revalidate with the ETag and usually get a 304
+TILE_CACHE_CONTROL = "public, max-age=3600"
+
+# Manifest is re-read when script.py rewrites it, no restart needed
+_manifest = None
+_manifest_mtime = None
+_blank_tile = None
+
+def _current_manifest():
+    global _manifest, _manifest_mtime
+    try:
+        mtime = os.stat(TILE_DIR / MANIFEST_FILE).st_mtime_ns
+    except OSError:
+        return None
+    if mtime != _manifest_mtime:
+        _manifest, _manifest_mtime = load_manifest(str(TILE_DIR)), mtime
+    return _manifest
+
+def _blank_png():
+    global _blank_tile
+    if _blank_tile is None:
+        img = np.empty((TILE_SIZE, TILE_SIZE, 3), dtype=np.uint8)
+        img[:] = BG_COLOR
+        _blank_tile = cv2.imencode(".png", img)[1].tobytes()
+    return _blank_tile
+
+@router.get("/tiles/metadata")
+async def tile_metadata():
+    """
+    Grid description for the client: tile size, zoom range, and the projected
+    square extent (origin = top-left corner in meters, CRS of the projection)
+    """
+    manifest = _current_manifest()
+    if manifest is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "No map tiles rendered (run maps/script.py)"}
+        )
+    meta = {k: v for k, v in manifest.items() if k != "tiles"}
+    meta["tile_count"] = len(manifest["tiles"])
+    return meta
+
+@router.get("/tiles/{z}/{x}/{y}.png")
+async def get_tile(z: int, x: int, y: int, if_none_match: Optional[str] = Header(None)):
+    """
+    One 256px map tile. Tiles without geometry inside the grid come back as a
+    blank background tile. ETag is the tile's content hash from the manifest.
+    """
+    manifest = _current_manifest()
+    if manifest is None:
+        return JSONResponse(
+            status_code=404,
+            content={"error": "No map tiles rendered (run maps/script.py)"}
+        )
+    if not manifest["min_zoom"] <= z <= manifest["max_zoom"] or not (0 <= x < 1 << z and 0 <= y < 1 << z):
+        return JSONResponse(
+            status_code=404,
+            content={"error": f"Tile {z}/{x}/{y} is outside the map"}
+        )
+
+    digest = manifest["tiles"].get(f"{z}/{x}/{y}")
+    etag = f'"{digest}"' if digest else f'"blank-{manifest["style_version"]}"'
+    headers = {"Cache-Control": TILE_CACHE_CONTROL, "ETag": etag}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+
+    if digest is None:
+        return Response(content=_blank_png(), media_type="image/png", headers=headers)
+    try:
+        with open(TILE_DIR / str(z) / str(x) / f"{y}.png", "rb") as f:
+            content = f.read()
+    except OSError:
+        return JSONResponse(
+            status_code=404,
+            content={"error": f"Tile {z}/{x}/{y} is missing, re-run maps/script.py"}
+        )
+    return Response(content=content, media_type="image/png", headers=headers)
@@ -1,22 +1,181 @@
 #!/usr/bin/env python3
 """
 Startup script for MapMate Backend
+
+    python start_backend.py                          # development: one process, auto-reload
+    python start_backend.py --prod [--workers N]     # production
+
+Production mode loads the app, the default navigation map, the
+localization banks and the footprint index once in the parent, then
+forks the workers, so they share those pages copy-on-write instead of
+each loading its own copy. The reloader is off, and every worker's
+memory (RSS, shared, private) is reported once they are up.
+Forking needs Linux/macOS; elsewhere production mode runs one worker
 """
 
-import uvicorn
+import argparse
+import gc
 import os
+import signal
+import time
 from pathlib import Path
 
+import uvicorn
+
+HOST = "0.0.0.0"
+PORT = 8000
+
+# Production workers (override with --workers or MAPMATE_WORKERS)
+DEFAULT_WORKERS = int(os.environ.get("MAPMATE_WORKERS", os.cpu_count() or 1))
+
+# Seconds after forking before the per-worker memory report
+MEMORY_REPORT_DELAY_S = 3.0
+
+
+def preload():
+    """Import the app and load the shared data before any worker exists"""
+    start = time.perf_counter()
+
+    # Decoding the map and banks would start OpenCV's thread pool in the parent;
+    # forked workers inherit it without its threads and can hang in their first
+    # parallel cv2 call. Workers already fill the cores, so OpenCV stays serial
+    import cv2
+    cv2.setNumThreads(0)
+
+    from main import app
+    from routes import localize, navigate
+
+    campus = navigate.map_registry.get()
+    campus.renderer  # decoded base map
+    for name in localize.registry.bundles:
+        localize.registry.get(name)
+
+    # Same for navigate.batch_executor: its threads start on the first submit and
+    # would not exist in the workers, so nothing in the parent may submit to it
+    if navigate.batch_executor._threads:
+        raise RuntimeError("navigate.batch_executor started threads before fork")
+
+    # Keep the collector from touching (and so copying) every preloaded object in the workers
+    gc.collect()
+    gc.freeze()
+
+    banks = localize.registry.stats()
+    print(
+        f"📦 Preloaded map '{campus.id}' ({len(campus.nav.nodes)} nodes), "
+        f"{len(banks['resident'])} localization bank(s), "
+        f"{len(localize.footprint_index) if localize.footprint_index else 0} footprints "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    return app
+
+
+def memory_mb(pid):
+    """RSS / PSS / shared / private MB of a process from /proc/<pid>/smaps_rollup, or None"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            kb = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    kb[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        return None
+    return {
+        "rss": kb.get("Rss", 0) / 1024,
+        "pss": kb.get("Pss", 0) / 1024,
+        "shared": (kb.get("Shared_Clean", 0) + kb.get("Shared_Dirty", 0)) / 1024,
+        "private": (kb.get("Private_Clean", 0) + kb.get("Private_Dirty", 0)) / 1024,
+    }
+
+
+def report_memory(workers):
+    rows = [("parent", os.getpid())] + [(f"worker {i}", pid) for pid, i in sorted(workers.items(), key=lambda w: w[1])]
+    usage = [(label, pid, memory_mb(pid)) for label, pid in rows]
+    if any(mem is None for _, _, mem in usage):
+        print("⚠️ /proc/<pid>/smaps_rollup not available, skipping the memory report")
+        return
+    print("📊 Memory (MB)           RSS     PSS  shared  private")
+    for label, pid, mem in usage:
+        print(f"   {label:<10} {pid:>7} {mem['rss']:7.1f} {mem['pss']:7.1f} {mem['shared']:7.1f} {mem['private']:8.1f}")
+    print(f"   Total PSS (actual RAM of parent + workers): {sum(mem['pss'] for _, _, mem in usage):.1f} MB")
+
+
+def run_production(workers, host=HOST, port=PORT):
+    if not hasattr(os, "fork"):
+        print("⚠️ os.fork is not available here: running one production worker")
+        uvicorn.run("main:app", host=host, port=port, reload=False, log_level="info")
+        return
+
+    app = preload()
+    config = uvicorn.Config(app, host=host, port=port, log_level="info")
+    sock = config.bind_socket()
+
+    children = {}  # pid -> worker number
+
+    def spawn(i):
+        pid = os.fork()
+        if pid == 0:
+            # Own process group: Ctrl+C reaches only the parent, which stops each worker once
+            os.setpgid(0, 0)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                uvicorn.Server(config).run(sockets=[sock])
+            finally:
+                os._exit(0)
+        children[pid] = i
+
+    print(f"🚀 Forking {workers} worker(s) on http://{host}:{port}")
+    for i in range(workers):
+        spawn(i)
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    time.sleep(MEMORY_REPORT_DELAY_S)
+    if not stopping:
+        report_memory(children)
+
+    # Restart workers that die; they fork from the same preloaded parent
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        i = children.pop(pid, None)
+        if i is not None and not stopping:
+            print(f"⚠️ Worker {i} (pid {pid}) exited with status {status}, restarting")
+            spawn(i)
+    sock.close()
+    print("👋 All workers stopped")
+
+
 def main():
     """Start the FastAPI backend server"""
-    
+    parser = argparse.ArgumentParser(description="Start the MapMate backend")
+    parser.add_argument("--prod", action="store_true", help="production: preload, fork workers, no reload")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="worker processes in production mode")
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+
     # Change to backend directory
     backend_dir = Path(__file__).parent
     os.chdir(backend_dir)
-    
+
     print("🚀 Starting MapMate Backend...")
     print(f"📁 Working directory: {backend_dir}")
-    
+
     # Check if required files exist
     required_files = [
         "main.py",
@@ -26,25 +185,29 @@ def main():
         "maps/giki_graph.json",
         "transform_library.json"
     ]
-    
+
     missing_files = []
     for file_path in required_files:
         if not (backend_dir / file_path).exists():
             missing_files.append(file_path)
-    
+
     if missing_files:
         print("❌ Missing required files:")
         for file_path in missing_files:
             print(f"   - {file_path}")
         return
-    
+
     print("✅ All required files found")
-    
+
+    if args.prod:
+        run_production(max(1, args.workers), port=args.port)
+        return
+
     # Start the server
     uvicorn.run(
         "main:app",
-        host="0.0.0.0",
-        port=8000,
+        host=HOST,
+        port=args.port,
         reload=True,  # Enable auto-reload during development
         log_level="info"
     )
@@ -0,0 +1,203 @@
+"""
+Property tests for the routing graph on small random graphs:
+- reroute trees repaired after edge updates match a fresh Dijkstra
+- degree-2 contraction keeps distances between the nodes it keeps, and every removed node as a shape point
+- spatial index lookups match a brute-force scan
+"""
+
+import heapq
+import json
+import math
+import random
+
+import numpy as np
+import pytest
+
+from maps.Maps_campus import CampusNavigator
+from maps.graph_contraction import contract_degree2
+from maps.route_cache import RerouteCache
+from maps.spatial_index import GraphSpatialIndex
+
+SEEDS = range(20)
+
+
+def random_graph(rng, n=60, k=3, size=1000.0):
+    """Random points, each joined to its k nearest neighbours (a few components may form)"""
+    xy = [(rng.uniform(0, size), rng.uniform(0, size)) for _ in range(n)]
+    edges = set()
+    for i, (x, y) in enumerate(xy):
+        nearest = sorted(range(n), key=lambda j: (xy[j][0] - x) ** 2 + (xy[j][1] - y) ** 2)[1:k + 1]
+        edges.update((min(i, j), max(i, j)) for j in nearest)
+    return xy, sorted(edges)
+
+
+def make_navigator(tmp_path, xy, edges):
+    """CampusNavigator over a campus_graph.json written to tmp_path (weights = Euclidean length)"""
+    graph_file = tmp_path / "graph.json"
+    graph = {
+        "nodes": {f"N{i}": [x, y] for i, (x, y) in enumerate(xy)},
+        "edges": [[f"N{u}", f"N{v}"] for u, v in edges],
+    }
+    graph_file.write_text(json.dumps(graph))
+    return CampusNavigator(str(graph_file), num_landmarks=4)
+
+
+def dijkstra(n, edges, source):
+    """Reference single-source distances over an undirected (u, v, cost) list"""
+    adj = [[] for _ in range(n)]
+    for u, v, c in edges:
+        adj[u].append((v, c))
+        adj[v].append((u, c))
+    dist = {}
+    pq = [(0.0, source)]
+    while pq:
+        d, node = heapq.heappop(pq)
+        if node in dist:
+            continue
+        dist[node] = d
+        for neighbor, c in adj[node]:
+            if neighbor not in dist:
+                heapq.heappush(pq, (d + c, neighbor))
+    return dist
+
+
+# ===== REROUTE TREE REPAIR =====
+@pytest.mark.parametrize("seed", SEEDS)
+def test_repaired_tree_matches_fresh_dijkstra(tmp_path, seed):
+    rng = random.Random(seed)
+    xy, edges = random_graph(rng)
+    nav = make_navigator(tmp_path, xy, edges)
+    cache = RerouteCache(nav)
+
+    destinations = [f"N{i}" for i in rng.sample(range(len(xy)), 3)]
+    for dest in destinations:
+        cache.get_tree(dest)
+
+    for _ in range(15):
+        u, v = rng.choice(edges)
+        state = rng.choice([
+            {"penalty": rng.uniform(1, 5)},
+            {"closed": True},
+            {"penalty": 1.0},
+        ])
+        changes, status = nav.set_edge_state(f"N{u}", f"N{v}", **state)
+        assert status == "Success"
+        cache.apply_edge_changes(changes)
+
+        for dest in destinations:
+            dist, parent, hit = cache.get_tree(dest)
+            assert hit, "tree was rebuilt instead of repaired"
+            fresh, _ = nav._dijkstra({dest: 0})
+            assert dist.keys() == fresh.keys()
+            for node, d in fresh.items():
+                assert dist[node] == pytest.approx(d)
+            # Every parent pointer follows a live edge along the tree
+            for node, p in parent.items():
+                assert dist[node] == pytest.approx(dist[p] + nav.edge_weight(node, p))
+
+
+# ===== DEGREE-2 CONTRACTION =====
+def random_chain_graph(rng):
+    """
+    A small random multigraph of junctions (parallel edges and loops included)
+    with every edge subdivided into a chain of degree-2 shape nodes
+    """
+    junctions = rng.randint(3, 8)
+    xy = [(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(junctions)]
+    edges = []
+
+    def chain(a, b):
+        prev = a
+        for _ in range(rng.randint(0, 4)):
+            xy.append((rng.uniform(0, 100), rng.uniform(0, 100)))
+            edges.append((prev, len(xy) - 1, rng.uniform(1, 10)))
+            prev = len(xy) - 1
+        if prev != b:
+            edges.append((prev, b, rng.uniform(1, 10)))
+
+    for _ in range(rng.randint(junctions, 3 * junctions)):
+        a, b = rng.randrange(junctions), rng.randrange(junctions)
+        if a == b:
+            # A loop needs at least two shape nodes to be a simple cycle
+            mid = len(xy)
+            xy.extend([(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(2)])
+            edges += [(a, mid, rng.uniform(1, 10)), (mid, mid + 1, rng.uniform(1, 10)), (mid + 1, a, rng.uniform(1, 10))]
+        else:
+            chain(a, b)
+
+    # Sometimes a cycle of shape nodes alone, with no junction on it
+    if rng.random() < 0.3:
+        start = len(xy)
+        size = rng.randint(3, 5)
+        xy.extend([(rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(size)])
+        edges += [(start + i, start + (i + 1) % size, rng.uniform(1, 10)) for i in range(size)]
+
+    return np.array(xy), edges
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_contraction_preserves_distances_and_shape(seed):
+    rng = random.Random(seed)
+    xy, edges = random_chain_graph(rng)
+    edge_u = np.array([e[0] for e in edges], dtype=np.int64)
+    edge_v = np.array([e[1] for e in edges], dtype=np.int64)
+    cost = np.array([e[2] for e in edges], dtype=np.float64)
+
+    kept, new_u, new_v, new_cost, geometry = contract_degree2(xy, edge_u, edge_v, cost)
+    contracted = list(zip(new_u.tolist(), new_v.tolist(), new_cost.tolist()))
+
+    for i, source in enumerate(kept.tolist()):
+        original = dijkstra(len(xy), edges, source)
+        reduced = dijkstra(len(kept), contracted, i)
+        assert {kept[j] for j in reduced} == {n for n in original if n in set(kept.tolist())}
+        for j, d in reduced.items():
+            assert d == pytest.approx(original[int(kept[j])])
+
+    # Contracted edges run between their endpoints' coordinates, and every
+    # removed node survives as a shape point (no parallel chain or loop is lost)
+    shape = set()
+    for u, v, g in zip(new_u, new_v, geometry):
+        if g is not None:
+            assert np.allclose(g[0], xy[kept[u]]) and np.allclose(g[-1], xy[kept[v]])
+            shape.update(map(tuple, g.tolist()))
+    removed = set(range(len(xy))) - set(kept.tolist())
+    assert all(tuple(xy[n].tolist()) in shape for n in removed)
+
+
+# ===== SPATIAL INDEX =====
+def point_segment_distance(x, y, x1, y1, x2, y2):
+    dx, dy = x2 - x1, y2 - y1
+    seg2 = dx * dx + dy * dy
+    t = 0.0 if seg2 == 0 else min(1.0, max(0.0, ((x - x1) * dx + (y - y1) * dy) / seg2))
+    return math.hypot(x1 + t * dx - x, y1 + t * dy - y)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_spatial_index_matches_brute_force(tmp_path, seed):
+    rng = random.Random(seed)
+    xy, edges = random_graph(rng)
+    nav = make_navigator(tmp_path, xy, edges)
+    index = GraphSpatialIndex(nav)
+
+    # Closed edges must not be snapped to
+    closed = set(rng.sample(edges, 5))
+    for u, v in closed:
+        nav.set_edge_state(f"N{u}", f"N{v}", closed=True)
+    open_edges = [e for e in edges if e not in closed]
+
+    for _ in range(50):
+        # Queries inside and well outside the graph's extent
+        x, y = rng.uniform(-500, 1500), rng.uniform(-500, 1500)
+
+        node, dist = index.nearest_node(x, y)
+        best = min(math.hypot(px - x, py - y) for px, py in xy)
+        assert dist == pytest.approx(best)
+        nx, ny = nav.nodes[node]
+        assert math.hypot(nx - x, ny - y) == pytest.approx(best)
+
+        snap = index.snap_to_edge(x, y)
+        best = min(point_segment_distance(x, y, *xy[u], *xy[v]) for u, v in open_edges)
+        assert snap["distance"] == pytest.approx(best)
+        u, v = (int(n[1:]) for n in snap["edge"])
+        assert (min(u, v), max(u, v)) not in closed
+        assert point_segment_distance(x, y, *xy[u], *xy[v]) == pytest.approx(best)
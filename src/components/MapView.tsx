@@ -1,12 +1,33 @@
-import React, { useRef, useEffect } from 'react';
+import React, { useRef, useEffect, useState } from 'react';
 import { useLocalization } from '@/contexts/LocalizationContext';
 import { useNavigation } from '@/contexts/NavigationContext';
 
+// Backend serving the z/x/y tile pyramid (backend/routes/tiles.py)
+const TILE_SERVER = 'http://localhost:8000';
+
+interface TileMetadata {
+  tile_size: number;
+  min_zoom: number;
+  max_zoom: number;
+}
+
 export function MapView() {
   const canvasRef = useRef<HTMLCanvasElement>(null);
   const { currentPosition, localizationMode } = useLocalization();
   const { currentDestination, isNavigating } = useNavigation();
 
+  // undefined while loading, null when no tiles are rendered (full image fallback)
+  const [tileMeta, setTileMeta] = useState<TileMetadata | null | undefined>(undefined);
+  const [tilesLoaded, setTilesLoaded] = useState(0);
+  const tileCache = useRef(new Map<string, HTMLImageElement>());
+
+  useEffect(() => {
+    fetch(`${TILE_SERVER}/tiles/metadata`)
+      .then((response) => (response.ok ? response.json() : null))
+      .then((meta) => setTileMeta(meta))
+      .catch(() => setTileMeta(null));
+  }, []);
+
   useEffect(() => {
     console.log('MapView component mounted');
     const canvas = canvasRef.current;
@@ -37,37 +58,12 @@ export function MapView() {
     ctx.font = '16px IBM Plex Sans, sans-serif';
     ctx.fillText('Select a destination to begin navigation', canvas.width / 2, 90);
 
-    // Try to load map image
-    const mapImage = new Image();
-    mapImage.onload = () => {
-      console.log('Map image loaded successfully');
-      
-      // Clear and redraw
-      ctx.clearRect(0, 0, canvas.width, canvas.height);
-      ctx.fillStyle = gradient;
-      ctx.fillRect(0, 0, canvas.width, canvas.height);
-
-      // Calculate map scaling to fit screen
-      const scale = Math.min(
-        canvas.width / mapImage.width,
-        canvas.height / mapImage.height
-      ) * 0.7;
-
-      const mapWidth = mapImage.width * scale;
-      const mapHeight = mapImage.height * scale;
-      const mapX = (canvas.width - mapWidth) / 2;
-      const mapY = (canvas.height - mapHeight) / 2 + 40;
-
-      // Draw map with shadow
-      ctx.shadowColor = 'rgba(0, 229, 255, 0.3)';
-      ctx.shadowBlur = 20;
-      ctx.drawImage(mapImage, mapX, mapY, mapWidth, mapHeight);
-      ctx.shadowBlur = 0;
-
+    // Markers and mode indicator over a map drawn at (left, top) with the given size
+    const drawOverlays = (left: number, top: number, mapWidth: number, mapHeight: number) => {
       // Draw current position
       if (currentPosition) {
-        const mapX = (canvas.width - mapWidth) / 2 + (currentPosition.x / 1000) * mapWidth;
-        const mapY = (canvas.height - mapHeight) / 2 + 40 + (currentPosition.y / 1000) * mapHeight;
+        const mapX = left + (currentPosition.x / 1000) * mapWidth;
+        const mapY = top + (currentPosition.y / 1000) * mapHeight;
 
         // Position glow
         ctx.beginPath();
@@ -86,8 +82,8 @@ export function MapView() {
 
         // Draw direction arrow if navigating
         if (isNavigating && currentDestination) {
-          const destX = (canvas.width - mapWidth) / 2 + (currentDestination.coordinate.x / 1000) * mapWidth;
-          const destY = (canvas.height - mapHeight) / 2 + 40 + (currentDestination.coordinate.y / 1000) * mapHeight;
+          const destX = left + (currentDestination.coordinate.x / 1000) * mapWidth;
+          const destY = top + (currentDestination.coordinate.y / 1000) * mapHeight;
 
           // Calculate arrow direction
           const angle = Math.atan2(destY - mapY, destX - mapX);
@@ -133,13 +129,90 @@ export function MapView() {
       ctx.font = '14px JetBrains Mono, monospace';
       ctx.fillText(`Mode: ${localizationMode}`, 20, 32);
     };
+
+    // Still asking the backend whether tiles exist
+    if (tileMeta === undefined) return;
+
+    if (tileMeta) {
+      // The tile grid covers a square extent; fit it like the single image
+      const side = Math.min(canvas.width, canvas.height) * 0.7;
+      const mapX = (canvas.width - side) / 2;
+      const mapY = (canvas.height - side) / 2 + 40;
+
+      // Smallest zoom whose tiles are at least as sharp as the screen
+      const wanted = Math.ceil(Math.log2((side * window.devicePixelRatio) / tileMeta.tile_size));
+      const z = Math.min(tileMeta.max_zoom, Math.max(tileMeta.min_zoom, wanted));
+      const n = 1 << z;
+      const tilePx = side / n;
+
+      ctx.shadowColor = 'rgba(0, 229, 255, 0.3)';
+      ctx.shadowBlur = 20;
+      ctx.fillStyle = '#0a0e14';
+      ctx.fillRect(mapX, mapY, side, side);
+      ctx.shadowBlur = 0;
+
+      // Only the tiles inside the canvas are requested
+      const x0 = Math.max(0, Math.floor(-mapX / tilePx));
+      const x1 = Math.min(n - 1, Math.floor((canvas.width - mapX) / tilePx));
+      const y0 = Math.max(0, Math.floor(-mapY / tilePx));
+      const y1 = Math.min(n - 1, Math.floor((canvas.height - mapY) / tilePx));
+      for (let tx = x0; tx <= x1; tx++) {
+        for (let ty = y0; ty <= y1; ty++) {
+          const key = `${z}/${tx}/${ty}`;
+          let tile = tileCache.current.get(key);
+          if (!tile) {
+            tile = new Image();
+            tile.onload = () => setTilesLoaded((count) => count + 1);
+            tile.onerror = () => console.error(`Failed to load map tile ${key}`);
+            tile.src = `${TILE_SERVER}/tiles/${key}.png`;
+            tileCache.current.set(key, tile);
+          }
+          if (tile.complete && tile.naturalWidth) {
+            ctx.drawImage(tile, mapX + tx * tilePx, mapY + ty * tilePx, tilePx, tilePx);
+          }
+        }
+      }
+
+      drawOverlays(mapX, mapY, side, side);
+      return;
+    }
+
+    // No tile pyramid on the backend: load the whole map image
+    const mapImage = new Image();
+    mapImage.onload = () => {
+      console.log('Map image loaded successfully');
+      
+      // Clear and redraw
+      ctx.clearRect(0, 0, canvas.width, canvas.height);
+      ctx.fillStyle = gradient;
+      ctx.fillRect(0, 0, canvas.width, canvas.height);
+
+      // Calculate map scaling to fit screen
+      const scale = Math.min(
+        canvas.width / mapImage.width,
+        canvas.height / mapImage.height
+      ) * 0.7;
+
+      const mapWidth = mapImage.width * scale;
+      const mapHeight = mapImage.height * scale;
+      const mapX = (canvas.width - mapWidth) / 2;
+      const mapY = (canvas.height - mapHeight) / 2 + 40;
+
+      // Draw map with shadow
+      ctx.shadowColor = 'rgba(0, 229, 255, 0.3)';
+      ctx.shadowBlur = 20;
+      ctx.drawImage(mapImage, mapX, mapY, mapWidth, mapHeight);
+      ctx.shadowBlur = 0;
+
+      drawOverlays(mapX, mapY, mapWidth, mapHeight);
+    };
     mapImage.onerror = () => {
       console.error('Failed to load map image');
       ctx.fillStyle = '#FF6B6B';
       ctx.fillText('Map image failed to load', canvas.width / 2, canvas.height / 2);
     };
     mapImage.src = '/maps/campus_map.png';
-  }, [currentPosition, localizationMode, currentDestination, isNavigating]);
+  }, [currentPosition, localizationMode, currentDestination, isNavigating, tileMeta, tilesLoaded]);
 
   return (
     <canvas
@@ -215,13 +215,14 @@ export function LocalizationProvider({ children }: { children: React.ReactNode }
   const getDirectionsFromMIDAS = useCallback(async (from: Coordinate, to: Coordinate) => {
     try {
       // Send coordinates directly to backend (already in local coordinate system)
-      const response = await fetch('http://localhost:8000/navigate', {
+      // The backend snaps them onto the nearest walkway edge
+      const params = new URLSearchParams({
+        map_x: String(from.x),
+        map_y: String(from.y),
+        destination_node: 'FCSE', // Use building name
+      });
+      const response = await fetch(`http://localhost:8000/navigate/from-point?${params}`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ 
-          start_node: 'N64', // Use detected node from localization
-          destination_node: 'FCSE' // Use building name
-        }),
       });
 
       if (response.ok) {